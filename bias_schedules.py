@@ -0,0 +1,172 @@
+"""
+Bias Schedules
+==============
+
+Per-sample bias schedules for the sampling engines. A schedule is an
+(n_steps, n_nodes) array whose row t is the field applied while sample t
+is drawn, together with per-sample phase labels ('coherent' / 'effect')
+and epoch indices for the analysis.
+
+Schedules are assembled from segments. Each builder below returns a
+segment dict {'biases': (n, n_nodes or 1), 'phase': label} (or yields
+several), and build_schedule() concatenates any iterable of them, so a
+protocol can be written as a plain generator:
+
+    def protocol():
+        yield hold(40)
+        yield exp_decay(20, hub_pattern(100, hubs, 0.3), tau=5)
+
+    schedule = build_schedule(protocol(), n_nodes=100)
+
+Shapes covered: constant holds, linear ramps, exponential decays, the
+original coherent/effect square wave, and stochastic OR-timed pulses whose
+coherent intervals are Penrose collapse times (or_collapse_scaling.
+collapse_time) for randomly drawn tubulin ensemble sizes.
+
+The samplers run a whole schedule in one compiled scan
+(thrml_sampling.observe_schedule), so the shape costs nothing extra at run
+time.
+
+Pure NumPy - no THRML required.
+"""
+
+import itertools
+
+import numpy as np
+
+# =============================================================================
+# SEGMENTS
+# =============================================================================
+
+def _segment(amplitude, pattern, phase):
+    """Outer product amplitude[t] * pattern[i] as a segment dict."""
+    pattern = np.atleast_1d(np.asarray(pattern, dtype=float))
+    amplitude = np.asarray(amplitude, dtype=float).reshape(-1, 1)
+    return {'biases': amplitude * pattern[None, :], 'phase': phase}
+
+
+def hub_pattern(n_nodes, hubs, strength):
+    """(n_nodes,) field: strength on the hub nodes, 0 elsewhere."""
+    pattern = np.zeros(n_nodes)
+    pattern[np.asarray(hubs)] = strength
+    return pattern
+
+
+def hold(n_steps, pattern=0.0, phase='coherent'):
+    """Constant field for n_steps samples (default: no field, coherent)."""
+    return _segment(np.ones(n_steps), pattern, phase)
+
+
+def ramp(n_steps, pattern, start=0.0, stop=1.0, phase='effect'):
+    """Field pattern scaled linearly from start to stop."""
+    return _segment(np.linspace(start, stop, n_steps), pattern, phase)
+
+
+def exp_decay(n_steps, pattern, tau, phase='effect'):
+    """Field pattern scaled by exp(-t / tau), t in samples from 0."""
+    return _segment(np.exp(-np.arange(n_steps) / tau), pattern, phase)
+
+
+def square_wave(n_epochs, coherent_samples, effect_samples, patterns):
+    """
+    The original epoch protocol: coherent_samples without field, then
+    effect_samples of constant field, n_epochs times.
+
+    patterns: (n_nodes,) field used in every epoch, or (n_epochs, n_nodes)
+    with one field per epoch (as build_effect_biases returns).
+    """
+    patterns = np.asarray(patterns, dtype=float)
+    for epoch in range(n_epochs):
+        yield hold(coherent_samples)
+        yield hold(effect_samples, patterns[epoch] if patterns.ndim == 2 else patterns, 'effect')
+
+
+def or_pulses(pattern, n_tubulins=1e10, spread=0.5, sample_dt=0.004, pulse_samples=10,
+              pulse='square', tau=None, n_pulses=None, seed=None):
+    """
+    Stochastic OR-timed pulses: a coherent interval without field, then a
+    pulse of pattern, repeated.
+
+    Each coherent interval is the OR collapse time
+    collapse_time(n_tubulins * LogNormal(0, spread)) in units of
+    sample_dt seconds per sample (at least one sample). With the defaults
+    the median interval is ~0.16 s = 40 samples, the original
+    coherent_samples.
+
+    Parameters:
+    - pattern: scalar or (n_nodes,) pulse field
+    - n_tubulins, spread: median and log-normal spread of the ensemble size
+    - sample_dt: seconds per recorded sample
+    - pulse_samples: pulse length in samples
+    - pulse: 'square' (constant) or 'decay' (exp(-t / tau), tau defaults to
+      pulse_samples / 3)
+    - n_pulses: number of pulses (None = endless; build_schedule then
+      needs n_steps)
+    - seed: seed for the ensemble-size draws
+    """
+    from or_collapse_scaling import collapse_time
+
+    if pulse not in ('square', 'decay'):
+        raise ValueError(f"Unknown pulse shape: {pulse} (expected 'square' or 'decay')")
+    rng = np.random.default_rng(seed)
+    for _ in (range(n_pulses) if n_pulses is not None else itertools.count()):
+        interval = collapse_time(n_tubulins * rng.lognormal(0.0, spread))
+        yield hold(max(1, int(round(float(interval) / sample_dt))))
+        if pulse == 'square':
+            yield hold(pulse_samples, pattern, 'effect')
+        else:
+            yield exp_decay(pulse_samples, pattern, tau or pulse_samples / 3)
+
+
+# =============================================================================
+# ASSEMBLY
+# =============================================================================
+
+def build_schedule(segments, n_nodes, n_steps=None):
+    """
+    Concatenate segments into one schedule.
+
+    Parameters:
+    - segments: iterable of segment dicts (lists, generators or nested
+      generators such as square_wave() are all accepted)
+    - n_nodes: network size; scalar-pattern segments are broadcast
+    - n_steps: truncate (and stop consuming an endless generator) after
+      this many samples; the schedule must reach it
+
+    Returns dict with:
+    - 'biases': (n_steps, n_nodes) float array
+    - 'phases': (n_steps,) phase label per sample
+    - 'epochs': (n_steps,) epoch index per sample; a new epoch starts at
+      the first non-effect sample after an effect segment
+    """
+    biases, phases, epochs = [], [], []
+    total, epoch, prev_phase = 0, 0, None
+    for segment in _flatten(segments):
+        if n_steps is not None and total >= n_steps:
+            break
+        b = np.broadcast_to(segment['biases'], (len(segment['biases']), n_nodes))
+        if prev_phase == 'effect' and segment['phase'] != 'effect':
+            epoch += 1
+        prev_phase = segment['phase']
+        biases.append(b)
+        phases.append(np.full(len(b), segment['phase']))
+        epochs.append(np.full(len(b), epoch))
+        total += len(b)
+
+    if n_steps is not None and total < n_steps:
+        raise ValueError(f"Schedule has {total} samples, fewer than n_steps={n_steps}")
+    n = total if n_steps is None else n_steps
+    return {
+        'biases': np.concatenate(biases)[:n] if biases else np.zeros((0, n_nodes)),
+        'phases': np.concatenate(phases)[:n] if phases else np.zeros(0, dtype=str),
+        'epochs': np.concatenate(epochs)[:n] if epochs else np.zeros(0, dtype=int),
+    }
+
+
+def _flatten(segments):
+    """Yield segment dicts from arbitrarily nested iterables of them."""
+    if isinstance(segments, dict):
+        yield segments
+        return
+    for item in segments:
+        yield from _flatten(item)
@@ -12,10 +12,13 @@ import numpy as np
 import networkx as nx
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation, FFMpegWriter, PillowWriter
+from matplotlib.collections import LineCollection
 from matplotlib.patches import Circle
 import matplotlib.patches as mpatches
 import os
 import warnings
+
+from viz_layers import cache_static_layers, edge_segments
 warnings.filterwarnings('ignore')
 
 
@@ -184,13 +187,12 @@ def create_cascade_animation(save_path='data/brain_cascade.mp4', fps=10, dpi=120
     ax2.set_title('QUANTUM-BIASED\n(OR Collapse Nudge)', fontsize=14, fontweight='bold', 
                   color='#ff7043', pad=10)
     
-    # Draw edges (faint)
+    # Draw edges (faint), one collection per axis
     edge_alpha = 0.08
-    for u, v in G_classical.edges():
-        x = [pos[u][0], pos[v][0]]
-        y = [pos[u][1], pos[v][1]]
-        ax1.plot(x, y, color='#555555', alpha=edge_alpha, linewidth=0.3)
-        ax2.plot(x, y, color='#555555', alpha=edge_alpha, linewidth=0.3)
+    segments = edge_segments(pos, G_classical.edges())
+    for ax in [ax1, ax2]:
+        ax.add_collection(LineCollection(segments, colors='#555555', alpha=edge_alpha,
+                                         linewidths=0.3), autolim=False)
     
     # Initialize node scatter plots
     node_positions = np.array([pos[n] for n in nodes])
@@ -272,10 +274,12 @@ def create_cascade_animation(save_path='data/brain_cascade.mp4', fps=10, dpi=120
         
         return scatter1, scatter2, time_text, count1_text, count2_text
     
-    # Create animation
+    # Create animation; frames only redraw the node scatters and labels
     pause_frames = 15
     total_frames = pause_frames + max_steps + 30
     
+    cache_static_layers(fig, [scatter1, scatter2, time_text, count1_text, count2_text], dpi)
+    
     print(f"Creating {total_frames} frames...")
     anim = FuncAnimation(fig, animate, frames=total_frames, interval=1000//fps, blit=False)
     
@@ -332,6 +336,7 @@ def create_single_brain_cascade(save_path='data/brain_cascade_single.png', dpi=1
     axes = axes.flatten()
     
     node_positions = np.array([pos[n] for n in nodes])
+    segments = edge_segments(pos, G.edges())
     
     for i, (ax, idx) in enumerate(zip(axes, indices)):
         ax.set_facecolor('#1a1a2e')
@@ -341,10 +346,8 @@ def create_single_brain_cascade(save_path='data/brain_cascade_single.png', dpi=1
         ax.axis('off')
         
         # Draw edges
-        for u, v in G.edges():
-            x = [pos[u][0], pos[v][0]]
-            y = [pos[u][1], pos[v][1]]
-            ax.plot(x, y, color='#444444', alpha=0.1, linewidth=0.3)
+        ax.add_collection(LineCollection(segments, colors='#444444', alpha=0.1,
+                                         linewidths=0.3), autolim=False)
         
         # Color nodes
         cum_at_step = cumulative[idx]
@@ -403,6 +406,7 @@ def create_comparison_final_state(save_path='data/cascade_comparison_final.png',
     fig.patch.set_facecolor('#1a1a2e')
     
     node_positions = np.array([pos[n] for n in nodes])
+    segments = edge_segments(pos, G_classical.edges())
     
     for ax, final_set, title, color in [
         (ax1, final_c, f'CLASSICAL\n{len(final_c)} nodes activated', '#4fc3f7'),
@@ -415,10 +419,8 @@ def create_comparison_final_state(save_path='data/cascade_comparison_final.png',
         ax.axis('off')
         
         # Edges
-        for u, v in G_classical.edges():
-            x = [pos[u][0], pos[v][0]]
-            y = [pos[u][1], pos[v][1]]
-            ax.plot(x, y, color='#444444', alpha=0.08, linewidth=0.3)
+        ax.add_collection(LineCollection(segments, colors='#444444', alpha=0.08,
+                                         linewidths=0.3), autolim=False)
         
         # Nodes
         colors = []
@@ -0,0 +1,159 @@
+"""
+Cluster Statistics
+==================
+
+Bulk cluster statistics of spin histories, for the avalanche analyses.
+
+spin_runs() finds the runs of consecutive +1 spins (in node-index order)
+of every sample at once. Each row is padded with a -1 on both sides, so
+the boolean diff of up-spins is True exactly at run starts and run ends.
+np.flatnonzero returns them in row-major order, where starts and ends
+alternate, so entries 2k and 2k + 1 bound the k-th run. Rows are processed in chunks of about
+max_elements spins, so a 10^5 x 10^4 history only ever needs one
+chunk-sized temporary. Sizes and sample indices are stored in the
+smallest integer types that fit.
+
+graph_clusters() gives the connected clusters of up-spins over the
+network's actual edges, so rewired shortcuts join clusters that
+node-index runs would split. The up-up edges of a whole chunk of samples
+form one block-diagonal graph, with sample b's node i at b * N + i, and a
+single scipy connected_components call labels them. This is the same
+batching as the Swendsen-Wang labelling in cluster_sampler. Python never
+loops over samples.
+
+Pure NumPy (SciPy for graph_clusters) - no THRML required.
+"""
+
+import numpy as np
+
+# Spins per temporary (padded chunk) in spin_runs
+MAX_ELEMENTS = 1 << 24
+
+# =============================================================================
+# RUN-LENGTH CLUSTERS
+# =============================================================================
+
+def spin_runs(samples, per_sample_histogram=False, max_elements=MAX_ELEMENTS):
+    """
+    Runs of +1 spins along the node axis of every sample.
+
+    Parameters:
+    - samples: (n_samples, n_nodes) array of +1/-1 spins
+    - per_sample_histogram: also return the (n_samples, n_nodes + 1)
+      cluster-size histogram of every sample (n_samples * (n_nodes + 1)
+      int32, so only for moderate sizes)
+    - max_elements: spins per processed chunk of rows
+
+    Returns dict with:
+    - 'sizes': (n_clusters,) run lengths, in sample then node order (the
+      order of the original nested loop)
+    - 'sample_index': (n_clusters,) sample of each run
+    - 'counts': (n_samples,) number of runs per sample
+    - 'size_histogram': (n_nodes + 1,) number of runs of each size
+    - 'histograms': (n_samples, n_nodes + 1) per-sample size histograms
+      (with per_sample_histogram)
+    """
+    samples = np.asarray(samples)
+    n_samples, n_nodes = samples.shape
+    rows_per_chunk = max(1, max_elements // (n_nodes + 2))
+    # Compact signed dtypes: 6 bytes per run up to 32767 nodes
+    size_dtype = np.int16 if n_nodes < 2**15 else np.int32
+    index_dtype = np.int32 if n_samples < 2**31 else np.int64
+
+    sizes, sample_index = [], []
+    padded = np.zeros((min(rows_per_chunk, n_samples), n_nodes + 2), dtype=bool)
+    for lo in range(0, n_samples, rows_per_chunk):
+        chunk = samples[lo:lo + rows_per_chunk]
+        rows = padded[:len(chunk)]
+        np.greater(chunk, 0, out=rows[:, 1:-1])
+        # Boolean diff: True at every run start and every run end, which
+        # alternate; flat positions are much cheaper than 2-D nonzero
+        flat = np.flatnonzero(rows[:, 1:] != rows[:, :-1])
+        sizes.append((flat[1::2] - flat[0::2]).astype(size_dtype))
+        sample_index.append((flat[0::2] // (n_nodes + 1) + lo).astype(index_dtype))
+
+    sizes = np.concatenate(sizes) if sizes else np.zeros(0, dtype=size_dtype)
+    sample_index = np.concatenate(sample_index) if sample_index else np.zeros(0, dtype=index_dtype)
+    result = {
+        'sizes': sizes,
+        'sample_index': sample_index,
+        'counts': np.bincount(sample_index, minlength=n_samples),
+        'size_histogram': np.bincount(sizes, minlength=n_nodes + 1),
+    }
+    if per_sample_histogram:
+        flat = sample_index.astype(np.int64) * (n_nodes + 1) + sizes
+        result['histograms'] = np.bincount(flat, minlength=n_samples * (n_nodes + 1)) \
+            .astype(np.int32).reshape(n_samples, n_nodes + 1)
+    return result
+
+
+# =============================================================================
+# GRAPH-CONNECTED CLUSTERS
+# =============================================================================
+
+def graph_clusters(samples, edges, max_elements=MAX_ELEMENTS):
+    """
+    Connected clusters of +1 spins over the edge list, for every sample.
+
+    Parameters:
+    - samples: (n_samples, n_nodes) array of +1/-1 spins
+    - edges: list of (i, j) pairs or an (E, 2) index array
+    - max_elements: edge evaluations (samples x edges) per chunk
+
+    Returns dict with the spin_runs layout (the sizes are ready for
+    unified_quantum_test.fit_power_law):
+    - 'sizes': (n_clusters,) cluster sizes, grouped by sample
+    - 'sample_index': (n_clusters,) sample of each cluster
+    - 'counts': (n_samples,) number of clusters per sample
+    - 'largest': (n_samples,) size of the largest cluster (0 if no up-spin)
+    - 'size_histogram': (n_nodes + 1,) number of clusters of each size
+    """
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+
+    samples = np.asarray(samples)
+    n_samples, n_nodes = samples.shape
+    e = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    src, dst = e[:, 0], e[:, 1]
+    rows_per_chunk = max(1, max_elements // max(len(e), n_nodes, 1))
+    size_dtype = np.int16 if n_nodes < 2**15 else np.int32
+    index_dtype = np.int32 if n_samples < 2**31 else np.int64
+
+    sizes, sample_index = [], []
+    for lo in range(0, n_samples, rows_per_chunk):
+        up = samples[lo:lo + rows_per_chunk] > 0
+        n_chunk = len(up)
+        n_total = n_chunk * n_nodes
+
+        # Block-diagonal graph of the up-up edges of every sample in the chunk
+        offsets = (np.arange(n_chunk, dtype=np.int64) * n_nodes)[:, None]
+        bonded = up[:, src] & up[:, dst]
+        graph = coo_matrix(
+            (np.ones(np.count_nonzero(bonded), dtype=np.int8),
+             ((src + offsets)[bonded], (dst + offsets)[bonded])),
+            shape=(n_total, n_total)
+        )
+        n_labels, labels = connected_components(graph, directed=False)
+
+        # Components of up-spins only: down-spins are isolated nodes
+        up_nodes = np.flatnonzero(up.ravel())
+        up_labels = labels[up_nodes]
+        label_sizes = np.bincount(up_labels, minlength=n_labels)
+        owner = np.zeros(n_labels, dtype=np.int64)
+        owner[up_labels] = up_nodes // n_nodes
+        found = np.flatnonzero(label_sizes)
+        order = np.argsort(owner[found], kind='stable')
+        sizes.append(label_sizes[found][order].astype(size_dtype))
+        sample_index.append((owner[found][order] + lo).astype(index_dtype))
+
+    sizes = np.concatenate(sizes) if sizes else np.zeros(0, dtype=size_dtype)
+    sample_index = np.concatenate(sample_index) if sample_index else np.zeros(0, dtype=index_dtype)
+    largest = np.zeros(n_samples, dtype=size_dtype)
+    np.maximum.at(largest, sample_index, sizes)
+    return {
+        'sizes': sizes,
+        'sample_index': sample_index,
+        'counts': np.bincount(sample_index, minlength=n_samples),
+        'largest': largest,
+        'size_histogram': np.bincount(sizes, minlength=n_nodes + 1),
+    }
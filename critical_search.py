@@ -0,0 +1,336 @@
+"""
+Critical Beta Search
+====================
+
+Locates the critical inverse temperature of the small-world Ising model by
+maximising the magnetic susceptibility, chi = N * Var(m).
+
+Instead of sampling a fixed 8-10 point grid one beta at a time, every grid
+beta (times several independent chains) is sampled in one batched THRML
+call. The grid is then zoomed in around the susceptibility peak for a few
+rounds. Each round re-uses the same compiled sampler.
+
+Reported per beta: chi (mean over chains, with standard error) and the
+Binder cumulant U4 = 1 - <m^4> / (3 <m^2>^2). beta_c is the vertex of a
+parabola through the peak and its neighbours; its uncertainty comes from
+bootstrapping over chains.
+
+Warmup is adaptive by default: the n_chains chains at each beta are run
+until split-R-hat says they agree (capped), so easy temperatures stop
+early and near-critical ones get the sweeps they need.
+
+Results can be memoised on disk (cache_dir): the key is a hash of the edge
+list, the beta grid and every sampling setting, so any change to the
+network or schedule is a cache miss.
+
+The initial grid can come from the mean-field screen (beta_range='screen':
+a bracket around the loopy-BP estimate of beta_c, see mean_field), which
+puts the grid points where the peak is instead of across the ordered
+phase.
+
+backend='numpy' runs the same searches on the NumPy block Gibbs engine
+(numpy_gibbs) when THRML is not installed; JAX and THRML are only imported
+for backend='thrml'.
+
+Install: pip install thrml jax jaxlib
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+
+# =============================================================================
+# PEAK ESTIMATION
+# =============================================================================
+
+def _peak_beta(betas, chi):
+    """Sub-grid peak location: parabola through the argmax and its neighbours."""
+    i = int(np.argmax(chi))
+    if i == 0 or i == len(betas) - 1:
+        return betas[i]
+
+    x = betas[i - 1:i + 2]
+    y = chi[i - 1:i + 2]
+    a, b, _ = np.polyfit(x, y, 2)
+    if a >= 0:
+        return betas[i]
+    return float(np.clip(-b / (2 * a), x[0], x[2]))
+
+
+# =============================================================================
+# PERSISTENT CACHE
+# =============================================================================
+
+# Bump when the search algorithm changes, to invalidate old entries
+_CACHE_VERSION = 1
+
+
+def _cache_key(n_nodes, edges, beta_range, settings):
+    """sha256 over the network, the initial grid and the sampling settings."""
+    h = hashlib.sha256()
+    h.update(json.dumps({'version': _CACHE_VERSION, 'n_nodes': n_nodes,
+                         **settings}, sort_keys=True).encode())
+    h.update(np.asarray(edges, dtype=np.int64).reshape(-1, 2).tobytes())
+    h.update(np.asarray(beta_range, dtype=np.float64).tobytes())
+    return h.hexdigest()[:24]
+
+
+def _load_cached(path):
+    with np.load(path) as data:
+        result = {k: data[k] for k in data.files if k != 'settings'}
+        result['settings'] = json.loads(str(data['settings']))
+    for k in ('critical_beta', 'critical_beta_err'):
+        result[k] = float(result[k])
+    result['n_warmup_used'] = result['n_warmup_used'].tolist()
+    return result
+
+
+def _save_cached(path, result, settings):
+    """Write via a temporary file so an interrupted save leaves no entry."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + '.tmp.npz'
+    np.savez(tmp, settings=json.dumps(settings), **result)
+    os.replace(tmp, path)
+
+
+# =============================================================================
+# BATCHED SAMPLING
+# =============================================================================
+
+def _build_graph(n_nodes, edges, backend):
+    if backend == 'numpy':
+        from numpy_gibbs import build_gibbs_graph
+        return build_gibbs_graph(n_nodes, edges)
+    from thrml_sampling import build_spin_graph
+    return build_spin_graph(n_nodes, edges)
+
+
+def _round_keys(seed, backend):
+    """Endless per-call sampling keys: split JAX PRNG keys, or NumPy seeds."""
+    if backend == 'numpy':
+        rng = np.random.default_rng(seed)
+        while True:
+            yield int(rng.integers(2**31))
+    import jax.random as jr
+    key = jr.PRNGKey(seed)
+    while True:
+        key, subkey = jr.split(key)
+        yield subkey
+
+
+def _observe(graph, betas, n_samples, n_warmup, steps_per_sample, key, observables, backend):
+    """
+    One chain per entry of betas, zero field, in one batched call.
+
+    Returns (observed, n_warmup_used) with observed[name] a (B, n_samples)
+    float64 array for each requested observable.
+    """
+    batch = len(betas)
+    biases = np.zeros((batch, 1, graph['n_nodes']))
+
+    if backend == 'numpy':
+        from numpy_gibbs import sample_gibbs_phases, spin_energy, warmup_gibbs_chains
+
+        rng = np.random.default_rng(key)
+        spins, n_warmup_used = None, n_warmup
+        if n_warmup == 'adaptive':
+            spins, warmup = warmup_gibbs_chains(
+                graph['n_nodes'], graph['edge_index'], biases[:, 0], betas,
+                seed=int(rng.integers(2**31)), graph=graph
+            )
+            n_warmup, n_warmup_used = steps_per_sample, warmup['n_warmup'] + steps_per_sample
+        history, _ = sample_gibbs_phases(
+            graph['n_nodes'], graph['edge_index'], [n_samples], biases, betas,
+            n_warmup=n_warmup, steps_per_sample=steps_per_sample,
+            seed=int(rng.integers(2**31)), spins=spins, graph=graph
+        )
+        values = {'magnetization': lambda: history.mean(axis=2),
+                  'energy': lambda: spin_energy(graph, history, 0.0)}
+        return {name: values[name]().astype(np.float64) for name in observables}, n_warmup_used
+
+    import jax.random as jr
+    from thrml_sampling import observe_phases
+
+    observed, _, _ = observe_phases(
+        graph, jr.split(key, batch), [n_samples], biases, betas,
+        n_warmup=n_warmup, steps_per_sample=steps_per_sample,
+        observables=observables
+    )
+    return ({name: observed[name].astype(np.float64) for name in observables},
+            observed['warmup']['n_warmup'])
+
+
+def _sample_betas(graph, betas, n_chains, n_samples, n_warmup, steps_per_sample, key,
+                  backend='thrml'):
+    """
+    Sample n_chains independent chains at every beta in one batched call.
+
+    Returns per-chain moments with shape (n_betas, n_chains):
+    chi (N * Var(m) within the chain), <m^2> and <m^4>; and the warmup
+    sweeps used.
+    """
+    n_betas = len(betas)
+    observed, n_warmup_used = _observe(
+        graph, np.repeat(betas, n_chains), n_samples, n_warmup, steps_per_sample, key,
+        ('magnetization',), backend
+    )
+    mags = observed['magnetization'].reshape(n_betas, n_chains, n_samples)
+
+    chi = np.var(mags, axis=2) * graph['n_nodes']
+    m2 = np.mean(mags ** 2, axis=2)
+    m4 = np.mean(mags ** 4, axis=2)
+    return chi, m2, m4, n_warmup_used
+
+
+def sample_energy_magnetization(n_nodes, edges, betas, n_samples=1000, n_warmup=200,
+                                steps_per_sample=2, seed=42, graph=None, backend='thrml'):
+    """
+    One chain per beta, all in one batched call, recording the per-sample
+    energy and magnetization series needed for multi-histogram reweighting.
+
+    backend: 'thrml' or 'numpy' (graph, if given, must be that backend's).
+
+    Returns (energies, magnetizations): lists with one series per beta.
+    """
+    if graph is None:
+        graph = _build_graph(n_nodes, edges, backend)
+
+    betas = np.asarray(betas, dtype=float)
+    if backend == 'numpy':
+        key = seed
+    else:
+        import jax.random as jr
+        key = jr.PRNGKey(seed)
+    observed, _ = _observe(graph, betas, n_samples, n_warmup, steps_per_sample, key,
+                           ('magnetization', 'energy'), backend)
+    return list(observed['energy']), list(observed['magnetization'])
+
+
+def search_critical_beta(n_nodes, edges, beta_range=None, n_chains=4,
+                         n_refine=2, n_samples=200, n_warmup='adaptive',
+                         steps_per_sample=2, n_bootstrap=200, seed=42,
+                         graph=None, verbose=True, cache_dir=None, backend='thrml'):
+    """
+    Batched, adaptively refined susceptibility-peak search.
+
+    Parameters:
+    - n_nodes, edges: network
+    - beta_range: initial grid (default: linspace(0.1, 2.0, 10)), or
+      'screen' for 10 points around the loopy-BP (Bethe) estimate of
+      beta_c (mean_field.screening_beta_grid)
+    - n_chains: independent chains per beta (for error bars)
+    - n_refine: zoom rounds around the peak; each round samples a grid of
+      the same size spanning one spacing either side of the current peak
+    - n_samples, n_warmup, steps_per_sample: sampling schedule per chain
+      (n_warmup='adaptive': R-hat controlled, see thrml_sampling.warmup_chains)
+    - n_bootstrap: bootstrap resamples over chains for the beta_c error
+    - seed: PRNG seed (deterministic for a fixed network and schedule)
+    - graph: optional build_spin_graph output to re-use
+    - cache_dir: directory for memoised results (None = no cache)
+    - backend: 'thrml' or 'numpy' block Gibbs (graph, if given, must be
+      that backend's)
+
+    Returns dict with:
+    - 'critical_beta', 'critical_beta_err'
+    - 'betas': every distinct sampled beta, sorted
+    - 'susceptibility', 'susceptibility_err', 'binder': per beta
+    - 'n_warmup_used': warmup sweeps of each round
+    """
+    if beta_range is None:
+        beta_range = np.linspace(0.1, 2.0, 10)
+    elif isinstance(beta_range, str) and beta_range == 'screen':
+        from mean_field import screening_beta_grid
+        beta_range = screening_beta_grid(n_nodes, edges, n_points=10)
+        if verbose:
+            print(f"Screening grid (Bethe): beta = {beta_range[0]:.3f} ... {beta_range[-1]:.3f}")
+
+    cache_path = None
+    if cache_dir is not None:
+        settings = {'n_chains': n_chains, 'n_refine': n_refine, 'n_samples': n_samples,
+                    'n_warmup': n_warmup, 'steps_per_sample': steps_per_sample,
+                    'n_bootstrap': n_bootstrap, 'seed': seed}
+        if backend != 'thrml':
+            # Only non-default backends enter the key, so THRML entries stay valid
+            settings['backend'] = backend
+        cache_path = os.path.join(
+            cache_dir, f"critical_beta_{_cache_key(n_nodes, edges, beta_range, settings)}.npz"
+        )
+        if os.path.exists(cache_path):
+            result = _load_cached(cache_path)
+            if verbose:
+                print(f"Critical beta: {result['critical_beta']:.3f} "
+                      f"+/- {result['critical_beta_err']:.3f} (cached: {cache_path})")
+            return result
+
+    if graph is None:
+        graph = _build_graph(n_nodes, edges, backend)
+
+    keys = _round_keys(seed, backend)
+    grid = np.asarray(beta_range, dtype=float)
+    n_grid = len(grid)
+
+    all_betas, all_chi, all_m2, all_m4, warmups = [], [], [], [], []
+    for round_idx in range(n_refine + 1):
+        chi, m2, m4, warmup_used = _sample_betas(
+            graph, grid, n_chains, n_samples, n_warmup, steps_per_sample, next(keys), backend
+        )
+        warmups.append(warmup_used)
+        all_betas.append(grid)
+        all_chi.append(chi)
+        all_m2.append(m2)
+        all_m4.append(m4)
+
+        if verbose:
+            print(f"  (warmup: {warmup_used} sweeps)")
+            for beta, c in zip(grid, chi.mean(axis=1)):
+                print(f"  beta={beta:.3f}: chi={c:.4f}")
+
+        # Zoom: new grid spans one spacing either side of the current peak
+        betas = np.concatenate(all_betas)
+        chi_mean = np.concatenate(all_chi).mean(axis=1)
+        peak = betas[np.argmax(chi_mean)]
+        spacing = np.min(np.diff(np.unique(grid))) if n_grid > 1 else 0.1
+        grid = np.linspace(max(peak - spacing, 1e-3), peak + spacing, n_grid)
+
+    betas = np.concatenate(all_betas)
+    chi = np.concatenate(all_chi)
+    m2 = np.concatenate(all_m2)
+    m4 = np.concatenate(all_m4)
+
+    # Sorted, keeping the first sample of any beta that a zoom grid revisited
+    _, order = np.unique(np.round(betas, 9), return_index=True)
+    betas, chi, m2, m4 = betas[order], chi[order], m2[order], m4[order]
+
+    chi_mean = chi.mean(axis=1)
+    chi_err = chi.std(axis=1, ddof=1) / np.sqrt(n_chains) if n_chains > 1 else np.zeros_like(chi_mean)
+    binder = 1 - m4.mean(axis=1) / (3 * m2.mean(axis=1) ** 2)
+
+    critical_beta = _peak_beta(betas, chi_mean)
+
+    # Bootstrap over chains: resample chains per beta, re-locate the peak
+    rng = np.random.default_rng(seed)
+    boot = []
+    for _ in range(n_bootstrap if n_chains > 1 else 0):
+        idx = rng.integers(0, n_chains, size=chi.shape)
+        boot.append(_peak_beta(betas, np.take_along_axis(chi, idx, axis=1).mean(axis=1)))
+    critical_beta_err = float(np.std(boot)) if boot else np.nan
+
+    if verbose:
+        i = int(np.argmax(chi_mean))
+        print(f"Critical beta: {critical_beta:.3f} +/- {critical_beta_err:.3f} "
+              f"(chi={chi_mean[i]:.3f}, U4={binder[i]:.3f})")
+
+    result = {
+        'critical_beta': float(critical_beta),
+        'critical_beta_err': critical_beta_err,
+        'betas': betas,
+        'susceptibility': chi_mean,
+        'susceptibility_err': chi_err,
+        'binder': binder,
+        'n_warmup_used': warmups,
+    }
+    if cache_path is not None:
+        _save_cached(cache_path, result, settings)
+    return result
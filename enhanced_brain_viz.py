@@ -15,11 +15,15 @@ import networkx as nx
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation, PillowWriter
 from matplotlib.patches import Polygon, Circle, Ellipse
-from matplotlib.collections import PatchCollection
+from matplotlib.collections import LineCollection, PatchCollection
+from matplotlib.colors import to_rgba_array
 import matplotlib.patches as mpatches
 from mpl_toolkits.mplot3d import Axes3D
+from mpl_toolkits.mplot3d.art3d import Line3DCollection
 import os
 import warnings
+
+from viz_layers import cache_static_layers, edge_segments
 warnings.filterwarnings('ignore')
 
 # =============================================================================
@@ -251,12 +255,12 @@ def create_2d_brain_cascade_with_pulse(save_path='data/brain_2d_pulse.gif', fps=
         ax.axis('off')
         ax.set_title(title, fontsize=16, fontweight='bold', color=color, pad=15)
     
-    # Draw faint edges
+    # Draw faint edges, one collection per axis
     node_positions = np.array([pos[n] for n in nodes])
-    for u, v in G_classical.edges():
-        for ax in [ax1, ax2]:
-            ax.plot([pos[u][0], pos[v][0]], [pos[u][1], pos[v][1]], 
-                   color='#2a2a4a', alpha=0.15, linewidth=0.3, zorder=1)
+    segments = edge_segments(pos, G_classical.edges())
+    for ax in [ax1, ax2]:
+        ax.add_collection(LineCollection(segments, colors='#2a2a4a', alpha=0.15,
+                                         linewidths=0.3, zorder=1), autolim=False)
     
     # Initialize scatter plots
     scatter1 = ax1.scatter([], [], s=[], c=[], zorder=5)
@@ -352,6 +356,8 @@ def create_2d_brain_cascade_with_pulse(save_path='data/brain_2d_pulse.gif', fps=
     total_frames = 10 + max_steps + 25
     print(f"  Creating {total_frames} frames...")
     
+    # Outline, edges and titles are rendered once; frames redraw nodes and labels
+    cache_static_layers(fig, [scatter1, scatter2, count1, count2, time_text], dpi)
     anim = FuncAnimation(fig, animate, frames=total_frames, interval=1000//fps, blit=False)
     
     os.makedirs('data', exist_ok=True)
@@ -369,6 +375,8 @@ def create_3d_brain_cascade(save_path='data/brain_3d_rotate.gif', fps=12, dpi=80
     """
     3D brain with rotating view during cascade.
     Uses frame-by-frame rendering to avoid matplotlib 3D scatter animation issues.
+    The figure, edge collection and node scatter are built once and restyled
+    per frame (the rotating view rules out a cached background).
     """
     print("\nCreating 3D rotating brain...")
     
@@ -397,45 +405,50 @@ def create_3d_brain_cascade(save_path='data/brain_3d_rotate.gif', fps=12, dpi=80
         cum.append(activated.copy())
     
     node_coords = np.array([pos[n] for n in nodes])
+    node_index = {n: i for i, n in enumerate(nodes)}
     
-    # Pre-compute edge data
-    edge_data = []
-    for u, v in G.edges():
-        edge_data.append(([pos[u][0], pos[v][0]], [pos[u][1], pos[v][1]], [pos[u][2], pos[v][2]]))
+    # Node style per category: inactive, active, fresh, seed (alpha in the RGBA)
+    style_colors = to_rgba_array(['#2a2a4a', '#ff7043', '#ffffff', '#00ff00'],
+                                 alpha=[0.5, 0.9, 1.0, 1.0])
+    style_sizes = np.array([20, 50, 100, 150])
     
     pause = 15
     total_frames = pause + max_steps + 60
     print(f"  Creating {total_frames} frames...")
     
-    # Generate frames manually
-    frames = []
+    # One figure, one edge collection and one scatter for every frame;
+    # frames only rotate the view and restyle the nodes
+    fig = plt.figure(figsize=(10, 10))
+    ax = fig.add_subplot(111, projection='3d')
+    fig.patch.set_facecolor('#0d1117')
+    ax.set_facecolor('#0d1117')
+    
+    ax.set_xticks([])
+    ax.set_yticks([])
+    ax.set_zticks([])
+    ax.xaxis.pane.fill = False
+    ax.yaxis.pane.fill = False
+    ax.zaxis.pane.fill = False
+    ax.xaxis.pane.set_edgecolor('#0d1117')
+    ax.yaxis.pane.set_edgecolor('#0d1117')
+    ax.zaxis.pane.set_edgecolor('#0d1117')
+    
+    ax.add_collection3d(Line3DCollection(edge_segments(pos, G.edges()), colors='#3a3a5a',
+                                         alpha=0.08, linewidths=0.3))
+    scatter = ax.scatter(node_coords[:, 0], node_coords[:, 1], node_coords[:, 2],
+                         c=style_colors[np.zeros(len(nodes), dtype=int)], s=style_sizes[0])
+    
+    from io import BytesIO
+    from PIL import Image
     
+    frames = []
     for frame in range(total_frames):
         if frame % 10 == 0:
             print(f"    Frame {frame}/{total_frames}...")
         
-        fig = plt.figure(figsize=(10, 10))
-        ax = fig.add_subplot(111, projection='3d')
-        fig.patch.set_facecolor('#0d1117')
-        ax.set_facecolor('#0d1117')
-        
-        ax.set_xticks([])
-        ax.set_yticks([])
-        ax.set_zticks([])
-        ax.xaxis.pane.fill = False
-        ax.yaxis.pane.fill = False
-        ax.zaxis.pane.fill = False
-        ax.xaxis.pane.set_edgecolor('#0d1117')
-        ax.yaxis.pane.set_edgecolor('#0d1117')
-        ax.zaxis.pane.set_edgecolor('#0d1117')
-        
         # Rotation
         ax.view_init(elev=20, azim=frame * 3)
         
-        # Draw edges
-        for xs, ys, zs in edge_data:
-            ax.plot(xs, ys, zs, color='#3a3a5a', alpha=0.08, linewidth=0.3)
-        
         # Get state
         if frame < pause:
             step_idx = 0
@@ -445,32 +458,19 @@ def create_3d_brain_cascade(save_path='data/brain_3d_rotate.gif', fps=12, dpi=80
         cum_now = cum[step_idx] if step_idx < len(cum) else cum[-1]
         fresh = steps[step_idx] if step_idx < len(steps) else set()
         
-        # Draw nodes by category (to handle sizes properly)
-        inactive_idx = [i for i, n in enumerate(nodes) if n not in cum_now and n != center_node]
-        active_idx = [i for i, n in enumerate(nodes) if n in cum_now and n not in fresh and n != center_node]
-        fresh_idx = [i for i, n in enumerate(nodes) if n in fresh]
-        center_idx = [i for i, n in enumerate(nodes) if n == center_node]
-        
-        if inactive_idx:
-            ax.scatter(node_coords[inactive_idx, 0], node_coords[inactive_idx, 1], 
-                      node_coords[inactive_idx, 2], c='#2a2a4a', s=20, alpha=0.5)
-        if active_idx:
-            ax.scatter(node_coords[active_idx, 0], node_coords[active_idx, 1],
-                      node_coords[active_idx, 2], c='#ff7043', s=50, alpha=0.9)
-        if fresh_idx:
-            ax.scatter(node_coords[fresh_idx, 0], node_coords[fresh_idx, 1],
-                      node_coords[fresh_idx, 2], c='#ffffff', s=100, alpha=1.0)
-        if center_idx:
-            ax.scatter(node_coords[center_idx, 0], node_coords[center_idx, 1],
-                      node_coords[center_idx, 2], c='#00ff00', s=150, alpha=1.0)
+        # Node categories (later ones win, as in the old draw order)
+        category = np.zeros(len(nodes), dtype=int)
+        category[[node_index[n] for n in cum_now]] = 1
+        category[[node_index[n] for n in fresh]] = 2
+        category[node_index[center_node]] = 3
+        scatter.set_facecolor(style_colors[category])
+        scatter.set_edgecolor(style_colors[category])
+        scatter.set_sizes(style_sizes[category])
         
         ax.set_title(f'QUANTUM CASCADE - {len(cum_now)} nodes active',
                     fontsize=14, fontweight='bold', color='#ff7043', pad=20)
         
         # Save frame to buffer using BytesIO
-        from io import BytesIO
-        from PIL import Image
-        
         buf = BytesIO()
         fig.savefig(buf, format='png', dpi=dpi, facecolor=fig.get_facecolor(), 
                    bbox_inches='tight', pad_inches=0.1)
@@ -478,10 +478,9 @@ def create_3d_brain_cascade(save_path='data/brain_3d_rotate.gif', fps=12, dpi=80
         img = Image.open(buf).convert('RGB')
         frames.append(img.copy())
         buf.close()
-        plt.close(fig)
+    plt.close(fig)
     
     # Save as GIF
-    from PIL import Image
     frames[0].save(save_path, save_all=True, append_images=frames[1:], 
                    duration=1000//fps, loop=0, optimize=True)
     
@@ -636,9 +635,8 @@ def create_master_summary(save_path='data/master_summary.png', dpi=150):
         ax.fill(brain_x, brain_y, facecolor='#1a1a2e', edgecolor='#3a3a5e', linewidth=1.5)
         
         # Draw edges
-        for u, v in G_c.edges():
-            ax.plot([pos[u][0], pos[v][0]], [pos[u][1], pos[v][1]],
-                   color='#2a2a4a', alpha=0.1, linewidth=0.3)
+        ax.add_collection(LineCollection(edge_segments(pos, G_c.edges()), colors='#2a2a4a',
+                                         alpha=0.1, linewidths=0.3), autolim=False)
         
         # Draw nodes
         colors = []
@@ -752,9 +750,8 @@ def create_brain_comparison_hq(save_path='data/brain_comparison_hq.png', dpi=200
         ax.fill(brain_x, brain_y, facecolor='#1a1a2e', edgecolor=color, linewidth=1.5, alpha=0.9)
         
         # Edges
-        for u, v in G_c.edges():
-            ax.plot([pos[u][0], pos[v][0]], [pos[u][1], pos[v][1]],
-                   color='#2a2a4a', alpha=0.08, linewidth=0.2)
+        ax.add_collection(LineCollection(edge_segments(pos, G_c.edges()), colors='#2a2a4a',
+                                         alpha=0.08, linewidths=0.2), autolim=False)
         
         # Nodes
         colors = []
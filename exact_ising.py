@@ -0,0 +1,246 @@
+"""
+Exact Ising Enumeration
+=======================
+
+Exact reference results for small networks (up to ~28 spins): partition
+function, energy, magnetization moments and distribution, susceptibility
+and Binder cumulant of
+
+    E(s) = -(sum_edges J s_i s_j + sum_i h_i s_i),   uniform J = 0.5
+
+for any beta grid and bias vector, by summing over all 2^N states. This is
+the ground truth the samplers are checked against (validate_sampler_series;
+thrml_brain_sim.validate_against_exact, unified_quantum_test.
+validate_samplers).
+
+Enumeration: the spins are split into chunk_bits "low" spins and the
+remaining "high" spins. The 2^L low states are tabulated once (energy,
+magnetization). The high states are visited in Gray-code order, so each
+step flips one high spin and updates the high-spin energy and the field
+it exerts on the low spins incrementally, in O(N). Each high state then
+contributes one vectorized chunk of 2^L energies,
+E = E_low + E_high - S_low . f_high, to running sums. The sums are kept
+relative to a running maximum of -beta E, so nothing overflows at large
+beta.
+
+Magnetization conventions follow the samplers: m = sum(s) / N, and
+susceptibility chi = N Var(m) (critical_search).
+
+Pure NumPy - no THRML required.
+"""
+
+import numpy as np
+
+from mcmc_diagnostics import integrated_autocorr_time
+
+# Enumeration beyond this is impractical (2^28 states, ~ minutes)
+MAX_EXACT_NODES = 28
+
+# =============================================================================
+# ENUMERATION
+# =============================================================================
+
+def coupling_matrix(n_nodes, edges, coupling=0.5):
+    """
+    Dense symmetric coupling matrix W with E = -(s W s / 2 + h s).
+
+    Listed edges are summed, so an edge that appears in both directions
+    counts twice, as in the samplers (ising_graph.to_weighted_csr).
+    Self-loops are dropped.
+    """
+    e = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    e = e[e[:, 0] != e[:, 1]]
+    W = np.zeros((n_nodes, n_nodes))
+    np.add.at(W, (e[:, 0], e[:, 1]), coupling)
+    np.add.at(W, (e[:, 1], e[:, 0]), coupling)
+    return W
+
+
+def _low_states(n_bits):
+    """(2^n_bits, n_bits) spins of all states, bit 1 -> +1."""
+    codes = np.arange(2 ** n_bits, dtype=np.int64)
+    return (2 * ((codes[:, None] >> np.arange(n_bits)) & 1) - 1).astype(np.float64)
+
+
+def exact_ising(n_nodes, edges, betas, biases=None, coupling=0.5, hubs=None, chunk_bits=16):
+    """
+    Exact thermodynamics by enumeration of all 2^n_nodes states.
+
+    Parameters:
+    - n_nodes: number of spins (at most MAX_EXACT_NODES)
+    - edges: list of (i, j) pairs or an (E, 2) index array
+    - betas: inverse temperature or array of them
+    - biases: (n_nodes,) external field (default: none)
+    - coupling: uniform ferromagnetic weight on every edge
+    - hubs: optional node indices; adds the hub magnetization moments
+    - chunk_bits: low spins per vectorized chunk (2^chunk_bits states)
+
+    Returns dict with, per beta:
+    - 'betas', 'log_z'
+    - 'mean_energy', 'specific_heat' (beta^2 Var(E) / N)
+    - 'mean_mag', 'mean_abs_mag', 'm2', 'm4'
+    - 'susceptibility': N Var(m); 'susceptibility_abs': N (<m^2> - <|m|>^2)
+    - 'binder': 1 - <m^4> / (3 <m^2>^2)
+    - 'mag_values': (N+1,) magnetizations m = M / N, M = -N, -N+2, ..., N
+    - 'mag_distribution': (n_betas, N+1) exact P(m)
+    - 'mean_hub_mag', 'hub_m2' (with hubs)
+    """
+    if n_nodes > MAX_EXACT_NODES:
+        raise ValueError(f"Exact enumeration needs n_nodes <= {MAX_EXACT_NODES}, got {n_nodes}")
+    betas = np.atleast_1d(np.asarray(betas, dtype=float))
+    h = np.zeros(n_nodes) if biases is None else np.asarray(biases, dtype=float)
+    W = coupling_matrix(n_nodes, edges, coupling)
+    hub_mask = np.zeros(n_nodes, dtype=bool)
+    if hubs is not None:
+        hub_mask[np.asarray(hubs)] = True
+
+    # Low spins are the first n_low nodes, high spins the rest
+    n_low = min(chunk_bits, n_nodes)
+    low = slice(0, n_low)
+    high = slice(n_low, n_nodes)
+    S_low = _low_states(n_low)
+    E_low = -(0.5 * np.sum((S_low @ W[low, low]) * S_low, axis=1) + S_low @ h[low])
+    M_low = S_low.sum(axis=1)
+    H_low = S_low[:, hub_mask[low]].sum(axis=1)
+    n_hubs = max(int(hub_mask.sum()), 1)
+
+    # Per-chunk observables multiplied by the weights: w @ table
+    m_low = M_low / n_nodes
+    M_index_low = ((M_low + n_low) // 2).astype(np.int64)
+    hist_low = np.zeros((len(S_low), n_low + 1))
+    hist_low[np.arange(len(S_low)), M_index_low] = 1.0
+
+    W_hh = W[high, high]
+    W_lh = W[low, high]
+    h_high = h[high]
+    hub_high = hub_mask[high]
+    n_high = n_nodes - n_low
+
+    s_high = -np.ones(n_high)
+    E_high = -(0.5 * s_high @ W_hh @ s_high + h_high @ s_high)
+    f_high = W_lh @ s_high
+
+    n_b = len(betas)
+    log_ref = np.full(n_b, -np.inf)
+    sums = {k: np.zeros(n_b) for k in ('z', 'e', 'e2', 'm', 'm2', 'abs_m', 'm4', 'hub', 'hub2')}
+    hist = np.zeros((n_b, n_nodes + 1))
+
+    for step in range(2 ** n_high):
+        if step:
+            # Gray code: step k flips the bit at the trailing-zero position of k
+            j = (step & -step).bit_length() - 1
+            E_high += 2 * s_high[j] * (W_hh[j] @ s_high + h_high[j])
+            s_high[j] = -s_high[j]
+            f_high += 2 * s_high[j] * W_lh[:, j]
+
+        energy = E_low + E_high - S_low @ f_high
+        M_high = s_high.sum()
+        m = m_low + M_high / n_nodes
+
+        log_w = -betas[:, None] * energy[None, :]
+        chunk_ref = log_w.max(axis=1)
+        new_ref = np.maximum(log_ref, chunk_ref)
+        old_scale = np.exp(log_ref - new_ref)
+        w = np.exp(log_w - new_ref[:, None])
+
+        m2 = m * m
+        chunk = {
+            'z': w.sum(axis=1),
+            'e': w @ energy,
+            'e2': w @ (energy * energy),
+            'm': w @ m,
+            'm2': w @ m2,
+            'abs_m': w @ np.abs(m),
+            'm4': w @ (m2 * m2),
+        }
+        if hubs is not None:
+            hub_m = (H_low + s_high[hub_high].sum()) / n_hubs
+            chunk['hub'] = w @ hub_m
+            chunk['hub2'] = w @ (hub_m * hub_m)
+        for k, v in chunk.items():
+            sums[k] = sums[k] * old_scale + v
+        offset = int((M_high + n_high) // 2)
+        hist *= old_scale[:, None]
+        hist[:, offset:offset + n_low + 1] += w @ hist_low
+        log_ref = new_ref
+
+    z = sums['z']
+    mean = {k: sums[k] / z for k in sums if k != 'z'}
+    result = {
+        'betas': betas,
+        'log_z': np.log(z) + log_ref,
+        'mean_energy': mean['e'],
+        'specific_heat': betas ** 2 * (mean['e2'] - mean['e'] ** 2) / n_nodes,
+        'mean_mag': mean['m'],
+        'mean_abs_mag': mean['abs_m'],
+        'm2': mean['m2'],
+        'm4': mean['m4'],
+        'susceptibility': n_nodes * (mean['m2'] - mean['m'] ** 2),
+        'susceptibility_abs': n_nodes * (mean['m2'] - mean['abs_m'] ** 2),
+        'binder': 1 - mean['m4'] / (3 * mean['m2'] ** 2),
+        'mag_values': np.arange(-n_nodes, n_nodes + 1, 2) / n_nodes,
+        'mag_distribution': hist / z[:, None],
+    }
+    if hubs is not None:
+        result['mean_hub_mag'] = mean['hub']
+        result['hub_m2'] = mean['hub2']
+    return result
+
+
+# =============================================================================
+# VALIDATION ORACLE
+# =============================================================================
+
+# Sampled series name -> exact_ising key of its expectation value
+_SERIES = {
+    'magnetization': 'mean_mag',
+    'abs_magnetization': 'mean_abs_mag',
+    'm2': 'm2',
+    'energy': 'mean_energy',
+    'hub_magnetization': 'mean_hub_mag',
+}
+
+
+def validate_sampler_series(exact, series, beta_index=0, z_threshold=4.0):
+    """
+    Compare sampled expectation values with the exact ones.
+
+    The error of each sampled mean is std * sqrt(tau_int / n), with the
+    integrated autocorrelation time over all chains (mcmc_diagnostics), so
+    correlated samples are not over-trusted.
+
+    Parameters:
+    - exact: exact_ising output
+    - series: dict name -> (T,) or (n_chains, T) samples; names are
+      'magnetization', 'abs_magnetization', 'm2', 'energy' and
+      'hub_magnetization' (the last needs exact_ising(..., hubs=...));
+      'abs_magnetization' and 'm2' are derived from 'magnetization' when
+      not given
+    - beta_index: which exact beta the samples were drawn at
+    - z_threshold: |z| above this fails the check
+
+    Returns dict with:
+    - 'observables': name -> {'exact', 'sampled', 'err', 'z'}
+    - 'max_abs_z', 'passed'
+    """
+    series = {k: np.atleast_2d(np.asarray(v, dtype=float)) for k, v in series.items()}
+    if 'magnetization' in series:
+        series.setdefault('abs_magnetization', np.abs(series['magnetization']))
+        series.setdefault('m2', series['magnetization'] ** 2)
+
+    observables = {}
+    for name, x in series.items():
+        key = _SERIES.get(name)
+        if key not in exact:
+            continue
+        tau = integrated_autocorr_time(x)
+        tau = max(tau, 1.0) if np.isfinite(tau) else 1.0
+        err = x.std() * np.sqrt(tau / x.size)
+        target = float(np.atleast_1d(exact[key])[beta_index])
+        sampled = float(x.mean())
+        z = (sampled - target) / err if err > 0 else (0.0 if sampled == target else np.inf)
+        observables[name] = {'exact': target, 'sampled': sampled, 'err': float(err), 'z': float(z)}
+
+    max_abs_z = max((abs(o['z']) for o in observables.values()), default=0.0)
+    return {'observables': observables, 'max_abs_z': max_abs_z,
+            'passed': bool(max_abs_z <= z_threshold)}
@@ -0,0 +1,218 @@
+"""
+MCMC Diagnostics
+================
+
+How correlated are consecutive samples? Shared estimators for the
+sampling scripts:
+
+- integrated autocorrelation time tau_int, from the FFT autocorrelation
+  with Sokal's automatic window (smallest M with M >= c * tau(M))
+- effective sample size ESS = n_chains * T / tau_int
+- auto-tuning of steps_per_sample (thinning) from short pilot runs, by
+  ESS per wall-clock second
+- split-R-hat across chains and an adaptive warmup controller that stops
+  once every monitored series has converged (with a hard cap)
+
+tau_int is in units of recorded samples, so tau ~ 1 means the samples are
+effectively independent and tau >> 1 means steps_per_sample / n_samples
+are buying mostly redundant samples.
+
+Pure NumPy - no THRML required.
+"""
+
+import time
+
+import numpy as np
+
+# =============================================================================
+# AUTOCORRELATION
+# =============================================================================
+
+def autocorrelation(x):
+    """
+    Normalised autocorrelation function along the last axis, via FFT.
+
+    x: (..., T) series. Returns (..., T) with rho[..., 0] = 1 (0 for a
+    constant series).
+    """
+    x = np.asarray(x, dtype=float)
+    n = x.shape[-1]
+    x = x - x.mean(axis=-1, keepdims=True)
+
+    # Zero-pad to avoid circular wrap-around
+    n_fft = 1 << (2 * n - 1).bit_length()
+    f = np.fft.rfft(x, n=n_fft, axis=-1)
+    acov = np.fft.irfft(f * np.conj(f), n=n_fft, axis=-1)[..., :n]
+
+    var = acov[..., :1]
+    return np.divide(acov, var, out=np.zeros_like(acov), where=var > 0)
+
+
+def integrated_autocorr_time(x, c=5.0):
+    """
+    Integrated autocorrelation time tau_int = 1 + 2 sum_t rho(t).
+
+    x: (T,) series or (n_chains, T) chains of the same process; the
+    autocorrelation is averaged over chains before windowing.
+    c: Sokal window constant.
+
+    Returns tau_int in units of recorded samples (>= 1 is not enforced;
+    anti-correlated series can give tau < 1).
+    """
+    x = np.atleast_2d(np.asarray(x, dtype=float))
+    if x.shape[-1] < 2:
+        return np.nan
+    rho = autocorrelation(x).mean(axis=0)
+
+    taus = 2.0 * np.cumsum(rho) - 1.0
+    window = np.arange(len(taus)) >= c * taus
+    m = np.argmax(window) if window.any() else len(taus) - 1
+    return float(taus[m])
+
+
+def effective_sample_size(x, c=5.0):
+    """ESS = total samples / tau_int for a (T,) or (n_chains, T) series."""
+    x = np.atleast_2d(np.asarray(x, dtype=float))
+    tau = integrated_autocorr_time(x, c)
+    if not np.isfinite(tau) or tau <= 0:
+        return float(x.size)
+    return float(x.size / max(tau, 1.0))
+
+
+def mixing_report(series):
+    """
+    tau_int and ESS for several series at once.
+
+    series: dict name -> (T,) or (n_chains, T) array.
+    Returns dict with 'tau_<name>' and 'ess_<name>' for each entry.
+    """
+    report = {}
+    for name, x in series.items():
+        report[f'tau_{name}'] = integrated_autocorr_time(x)
+        report[f'ess_{name}'] = effective_sample_size(x)
+    return report
+
+
+# =============================================================================
+# THINNING AUTO-TUNE
+# =============================================================================
+
+def tune_steps_per_sample(run_pilot, candidates=(1, 2, 4, 8), n_pilot=200,
+                          target_ess_rate=None, verbose=True):
+    """
+    Pick steps_per_sample by effective samples per wall-clock second.
+
+    Parameters:
+    - run_pilot: callable (steps_per_sample, n_samples) -> (n_chains, T)
+      magnetization series. It is called twice per candidate and only the
+      second call is timed, so one-off JIT compilation is not counted.
+    - candidates: steps_per_sample values to try
+    - n_pilot: samples per pilot run
+    - target_ess_rate: optional ESS per second to reach; the smallest
+      candidate that reaches it is chosen (fewer sweeps per sample means
+      finer time resolution for the avalanche analysis). Without a
+      target, or if none reaches it, the fastest candidate wins.
+
+    Returns dict with 'steps_per_sample', 'ess_per_second', 'tau' and
+    a per-candidate 'table' of (steps_per_sample, tau, ess_per_second).
+    """
+    table = []
+    for k in candidates:
+        run_pilot(k, n_pilot)
+        start = time.perf_counter()
+        series = run_pilot(k, n_pilot)
+        elapsed = time.perf_counter() - start
+        ess = effective_sample_size(series)
+        table.append((k, integrated_autocorr_time(series), ess / max(elapsed, 1e-9)))
+        if verbose:
+            print(f"  steps_per_sample={k}: tau={table[-1][1]:.1f}, "
+                  f"ESS/s={table[-1][2]:.0f}")
+
+    rates = np.array([row[2] for row in table])
+    best = int(np.argmax(rates))
+    if target_ess_rate is not None:
+        reached = np.flatnonzero(rates >= target_ess_rate)
+        if len(reached):
+            best = int(reached[0])
+        elif verbose:
+            print(f"  No candidate reaches {target_ess_rate:.0f} ESS/s; using the fastest")
+
+    k, tau, rate = table[best]
+    return {'steps_per_sample': k, 'ess_per_second': rate, 'tau': tau, 'table': table}
+
+
+# =============================================================================
+# CONVERGENCE (WARMUP)
+# =============================================================================
+
+def split_rhat(x):
+    """
+    Split-R-hat (Gelman et al.) for (n_chains, T) draws of one quantity.
+
+    Each chain is cut in half so that a trend within a chain shows up as
+    between-chain disagreement. Values near 1 indicate convergence.
+    """
+    x = np.atleast_2d(np.asarray(x, dtype=float))
+    half = x.shape[-1] // 2
+    if half < 2:
+        return np.inf
+    chains = np.concatenate([x[:, :half], x[:, -half:]], axis=0)
+
+    within = chains.var(axis=1, ddof=1).mean()
+    between = half * chains.mean(axis=1).var(ddof=1)
+    if within == 0:
+        return 1.0 if between == 0 else np.inf
+    var_plus = (half - 1) / half * within + between / half
+    return float(np.sqrt(var_plus / within))
+
+
+def adaptive_warmup(advance, chunk=50, max_warmup=1000, threshold=1.1,
+                    groups=None, verbose=False):
+    """
+    Run warmup in chunks until split-R-hat converges.
+
+    Parameters:
+    - advance: callable (n_sweeps) -> dict name -> (B, n_sweeps) series,
+      advancing all B chains by n_sweeps and recording each sweep
+    - chunk: sweeps per check
+    - max_warmup: hard cap on warmup sweeps
+    - threshold: stop once every series has split-R-hat below this
+    - groups: (B,) labels of chains sharing a configuration (same beta and
+      biases); R-hat is computed within each group and the worst group
+      counts. Default: all chains are one group.
+
+    After each chunk R-hat is computed on the second half of the warmup so
+    far, the usual practice of discarding the early transient.
+
+    Returns dict with 'n_warmup' (sweeps used), 'rhat' (worst group per
+    series) and 'converged'.
+    """
+    history = {}
+    n_done = 0
+    rhat = {}
+    converged = False
+    while n_done < max_warmup:
+        # Last chunk is cut short, so max_warmup is never exceeded
+        n_sweeps = min(chunk, max_warmup - n_done)
+        series = advance(n_sweeps)
+        n_done += n_sweeps
+        for name, x in series.items():
+            history.setdefault(name, []).append(np.asarray(x, dtype=float))
+
+        if groups is None:
+            groups = np.zeros(len(next(iter(series.values()))), dtype=int)
+        labels = np.unique(groups)
+
+        rhat = {}
+        for name, chunks in history.items():
+            x = np.concatenate(chunks, axis=1)
+            x = x[:, x.shape[1] // 2:]
+            rhat[name] = max(split_rhat(x[groups == g]) for g in labels)
+
+        if verbose:
+            print(f"  warmup {n_done}: " + ", ".join(f"R-hat({k})={v:.3f}" for k, v in rhat.items()))
+        if max(rhat.values()) < threshold:
+            converged = True
+            break
+
+    return {'n_warmup': n_done, 'rhat': rhat, 'converged': converged}
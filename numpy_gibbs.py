@@ -0,0 +1,263 @@
+"""
+NumPy Gibbs Sampler
+===================
+
+Dependency-free block Gibbs engine for the small-world Ising model, the
+NumPy counterpart of thrml_sampling. Same model and schedule as the THRML
+path:
+
+- energy E(s) = -(sum_ij J_ij s_i s_j + sum_i h_i s_i), uniform J = 0.5
+- heat-bath update P(s_i = +1) = sigmoid(2 beta (h_i + sum_j J_ij s_j))
+- Gibbs blocks from ising_graph.color_blocks, so every block is
+  conflict-free and a block update is exact
+- start states drawn with P(s_i = +1) = sigmoid(beta h_i) (THRML's
+  hinton_init)
+- n_warmup sweeps before the first recorded sample, steps_per_sample
+  sweeps between samples
+
+Couplings are stored in CSR form (ising_graph.to_weighted_csr). For each
+colour block the neighbour lists of its nodes are gathered once, so one
+block update of all B chains is a gather, a segment sum (np.add.reduceat)
+and one vectorized Bernoulli draw.
+
+Selected with backend='numpy' in the experiment scripts, either because
+THRML is not installed or to benchmark THRML against a plain baseline on
+the same seeds and schedules. The random streams differ (NumPy vs JAX
+PRNG), so the two engines agree in distribution, not sample by sample.
+
+Pure NumPy - no THRML required.
+"""
+
+import importlib.util
+
+import numpy as np
+
+from ising_graph import color_blocks, edge_array, to_weighted_csr
+from mcmc_diagnostics import adaptive_warmup
+
+# Sampling backends for block Gibbs
+BACKENDS = ('thrml', 'numpy')
+
+
+def resolve_backend(backend='auto'):
+    """'auto' -> 'thrml' if JAX and THRML are installed, else 'numpy'."""
+    if backend == 'auto':
+        installed = all(importlib.util.find_spec(m) is not None for m in ('jax', 'thrml'))
+        return 'thrml' if installed else 'numpy'
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend: {backend} (expected 'auto' or one of {BACKENDS})")
+    return backend
+
+
+def spawn_seeds(n, seed=None):
+    """
+    n independent 31-bit seeds (valid for jr.PRNGKey and NumPy) spawned from
+    np.random.SeedSequence(seed). seed=None draws fresh OS entropy, so
+    back-to-back calls never share seeds the way clock-based seeds do.
+    """
+    return [int(child.generate_state(1)[0] % 2**31)
+            for child in np.random.SeedSequence(seed).spawn(n)]
+
+
+# =============================================================================
+# MODEL CONSTRUCTION
+# =============================================================================
+
+def build_gibbs_graph(n_nodes, edges, block_indices=None, coupling=0.5):
+    """
+    Precompute the CSR couplings and per-block neighbour gathers.
+
+    Parameters:
+    - n_nodes: number of spins
+    - edges: list of (i, j) pairs or an (E, 2) index array
+    - block_indices: list of node-index arrays, one per Gibbs block
+      (default: ising_graph.color_blocks)
+    - coupling: uniform ferromagnetic weight on every edge
+
+    Returns a dict that is passed to the samplers below; re-use it for
+    repeated calls on the same network.
+    """
+    if block_indices is None:
+        block_indices = color_blocks(n_nodes, edges)
+    indptr, indices, data = to_weighted_csr(n_nodes, edges, coupling)
+
+    blocks = []
+    for idx in block_indices:
+        idx = np.asarray(idx, dtype=np.int64)
+        degree = indptr[idx + 1] - indptr[idx]
+        rows = np.concatenate([np.arange(indptr[i], indptr[i + 1]) for i in idx]) \
+            if len(idx) else np.zeros(0, dtype=np.int64)
+        has_nbr = degree > 0
+        blocks.append({
+            'nodes': idx,
+            'nbr': indices[rows],
+            'weights': data[rows].astype(np.float32),
+            # reduceat segment starts; nodes without neighbours are skipped
+            'starts': (np.cumsum(degree) - degree)[has_nbr],
+            'has_nbr': has_nbr,
+        })
+
+    return {
+        'n_nodes': n_nodes,
+        'edge_index': edge_array(edges),
+        'coupling': coupling,
+        'blocks': blocks,
+    }
+
+
+def spin_energy(graph, spins, biases):
+    """
+    E(s) = -(J sum_edges s_i s_j + sum_i h_i s_i) for (..., n_nodes) spins
+    and broadcastable biases (the same energy as SpinObservables).
+    """
+    s = np.asarray(spins, dtype=np.float32)
+    e = graph['edge_index']
+    bonds = np.sum(s[..., e[:, 0]] * s[..., e[:, 1]], axis=-1)
+    return -(graph['coupling'] * bonds + np.sum(s * biases, axis=-1))
+
+
+# =============================================================================
+# GIBBS UPDATES
+# =============================================================================
+
+def gibbs_sweep(graph, spins, betas, biases, rng):
+    """
+    One heat-bath sweep (every block once, in order) of all chains, in place.
+
+    Parameters:
+    - spins: (B, N) float32 array of +1/-1
+    - betas: (B,) inverse temperatures
+    - biases: (B, N) external fields
+    """
+    betas = np.asarray(betas, dtype=np.float32).reshape(-1, 1)
+    for block in graph['blocks']:
+        field = biases[:, block['nodes']].astype(np.float32)
+        if len(block['starts']):
+            field[:, block['has_nbr']] += np.add.reduceat(
+                spins[:, block['nbr']] * block['weights'], block['starts'], axis=1
+            )
+        # sigmoid(2x) = (1 + tanh(x)) / 2, without exp overflow
+        p_up = 0.5 * (1.0 + np.tanh(betas * field))
+        spins[:, block['nodes']] = np.where(
+            rng.random(field.shape, dtype=np.float32) < p_up, 1.0, -1.0
+        )
+    return spins
+
+
+def init_spins(biases, betas, rng):
+    """Start states with P(s_i = +1) = sigmoid(beta h_i), as (B, N) float32."""
+    biases = np.asarray(biases, dtype=np.float32)
+    betas = np.asarray(betas, dtype=np.float32).reshape(-1, 1)
+    p_up = 0.5 * (1.0 + np.tanh(0.5 * betas * biases))
+    return np.where(rng.random(biases.shape, dtype=np.float32) < p_up, 1.0, -1.0).astype(np.float32)
+
+
+# =============================================================================
+# SAMPLING DRIVERS
+# =============================================================================
+
+def sample_gibbs_phases(n_nodes, edges, phase_lengths, phase_biases, betas,
+                        n_warmup=50, steps_per_sample=2, seed=None, coupling=0.5,
+                        spins=None, graph=None):
+    """
+    NumPy counterpart of thrml_sampling.sample_phases, with the
+    cluster_sampler.sample_cluster_phases calling convention.
+
+    Parameters:
+    - phase_lengths: samples to record in each phase
+    - phase_biases: (B, n_phases, n_nodes) bias applied during each phase
+    - betas: (B,) inverse temperature per chain
+    - n_warmup: sweeps before the first recorded sample
+    - steps_per_sample: sweeps between recorded samples
+    - seed: seed (or seed list) for the batch's NumPy generator
+    - spins: optional (B, N) start configuration (default: sigmoid(beta h))
+    - graph: optional build_gibbs_graph output to re-use
+
+    Returns:
+    - spins: (B, sum(phase_lengths), n_nodes) int8 array of +1/-1
+    - state: (B, n_nodes) final configuration, usable to continue
+    """
+    if graph is None:
+        graph = build_gibbs_graph(n_nodes, edges, coupling=coupling)
+    rng = np.random.default_rng(seed)
+    phase_biases = np.asarray(phase_biases, dtype=np.float32)
+    betas = np.asarray(betas, dtype=np.float32)
+    n_chains = phase_biases.shape[0]
+
+    if spins is None:
+        spins = init_spins(phase_biases[:, 0], betas, rng)
+    else:
+        spins = np.array(spins, dtype=np.float32)
+
+    history = np.empty((n_chains, sum(phase_lengths), n_nodes), dtype=np.int8)
+    t = 0
+    for p, n_samples in enumerate(phase_lengths):
+        biases = phase_biases[:, p]
+        first_steps = n_warmup if p == 0 else steps_per_sample
+        for i in range(n_samples):
+            for _ in range(first_steps if i == 0 else steps_per_sample):
+                gibbs_sweep(graph, spins, betas, biases, rng)
+            history[:, t] = spins
+            t += 1
+
+    return history, spins.astype(np.int8)
+
+
+def warmup_gibbs_chains(n_nodes, edges, biases, betas, spins=None, seed=None,
+                        chunk=50, max_warmup=1000, rhat_threshold=1.1, groups=None,
+                        coupling=0.5, graph=None, verbose=False):
+    """
+    Adaptive warmup, as thrml_sampling.warmup_chains: advance B chains in
+    chunks of single sweeps until split-R-hat of |m| and energy is below
+    rhat_threshold in every group of identically configured chains, or
+    max_warmup sweeps have run.
+
+    Parameters:
+    - biases: (B, n_nodes) field during warmup
+    - betas: (B,) inverse temperatures
+    - spins: optional (B, N) start configuration
+    - groups: (B,) configuration labels (default: chains with identical
+      beta and biases form one group)
+
+    Returns (spins, info): the (B, N) int8 warm state, and info as in
+    mcmc_diagnostics.adaptive_warmup.
+    """
+    if graph is None:
+        graph = build_gibbs_graph(n_nodes, edges, coupling=coupling)
+    rng = np.random.default_rng(seed)
+    biases = np.asarray(biases, dtype=np.float32)
+    betas = np.asarray(betas, dtype=np.float32)
+    if groups is None:
+        _, groups = np.unique(np.column_stack([betas, biases]), axis=0, return_inverse=True)
+        groups = groups.ravel()
+    chains = {'spins': init_spins(biases, betas, rng) if spins is None
+              else np.array(spins, dtype=np.float32)}
+
+    def advance(n_sweeps):
+        history, chains['spins'] = sample_gibbs_phases(
+            n_nodes, edges, [n_sweeps], biases[:, None], betas,
+            n_warmup=1, steps_per_sample=1, seed=int(rng.integers(2**31)),
+            spins=chains['spins'], graph=graph
+        )
+        return {'abs_magnetization': np.abs(history.mean(axis=2)),
+                'energy': spin_energy(graph, history, biases[:, None])}
+
+    info = adaptive_warmup(advance, chunk=chunk, max_warmup=max_warmup,
+                           threshold=rhat_threshold, groups=groups, verbose=verbose)
+    return chains['spins'].astype(np.int8), info
+
+
+def run_gibbs_simulation(n_nodes, edges, beta, biases, n_samples=500, n_warmup=200,
+                         steps_per_sample=2, seed=None, graph=None):
+    """
+    Single-chain NumPy block Gibbs with the run_ising_simulation interface.
+
+    Returns:
+    - samples: (n_samples, n_nodes) int8 array of +1/-1 spins
+    """
+    history, _ = sample_gibbs_phases(
+        n_nodes, edges, [n_samples], np.asarray(biases, dtype=float)[None, None, :],
+        np.array([beta]), n_warmup=n_warmup, steps_per_sample=steps_per_sample,
+        seed=seed, graph=graph
+    )
+    return history[0]
@@ -12,7 +12,6 @@ Based on: Penrose OR theory, Hameroff-Penrose Orch-OR
 """
 
 import numpy as np
-import matplotlib.pyplot as plt
 import os
 
 # Physical constants
@@ -60,6 +59,7 @@ def collapse_time(N):
 
 def main():
     """Run the simulation and generate plots."""
+    import matplotlib.pyplot as plt
     
     print("="*60)
     print("OR COLLAPSE TIME SCALING SIMULATION")
@@ -166,6 +166,8 @@ def main():
 
 
 if __name__ == "__main__":
+    import matplotlib.pyplot as plt
+
     main()
     plt.show()
 
@@ -0,0 +1,224 @@
+"""
+Parallel Tempering
+==================
+
+Replica-exchange sampling for near-critical Ising runs. At beta_c single
+spin Gibbs suffers critical slowing down, so consecutive samples are
+strongly correlated. Here a ladder of R betas around the target beta is
+sampled side by side (THRML block Gibbs on every rung) and configurations
+of neighbouring rungs are swapped with the Metropolis rule
+
+    P(swap r <-> r+1) = min(1, exp((beta_r - beta_{r+1}) (E_r - E_{r+1})))
+
+alternating even and odd pairs. Hot rungs decorrelate quickly and feed
+fresh configurations down to the target temperature.
+
+The ladder is auto-tuned during warmup: the gap between neighbouring
+rungs is shrunk where swap acceptance is below target and widened where
+it is above, with the target beta held fixed at the middle rung. Only
+samples from the target rung are returned.
+
+Gibbs sweeps and swaps run inside one compiled scan, so a whole
+production run is a single device call.
+
+Install: pip install thrml jax jaxlib
+"""
+
+import jax
+import jax.numpy as jnp
+import jax.random as jr
+import numpy as np
+
+from thrml import SamplingSchedule
+from thrml_sampling import (build_spin_graph, init_chains, initial_carry,
+                            make_chain_sampler, OBSERVABLES)
+
+# =============================================================================
+# LADDER
+# =============================================================================
+
+def build_ladder(target_beta, gaps, target_index):
+    """Betas with target_beta at rung target_index and the given neighbour gaps."""
+    gaps = np.asarray(gaps, dtype=float)
+    offsets = np.concatenate(([0.0], np.cumsum(gaps)))
+    betas = target_beta + offsets - offsets[target_index]
+    return np.maximum(betas, 1e-4)
+
+
+def _tune_gaps(gaps, acceptance, target_acceptance, gain=1.0):
+    """Shrink gaps with low swap acceptance, widen gaps with high acceptance."""
+    return gaps * np.exp(gain * (np.asarray(acceptance) - target_acceptance))
+
+
+# =============================================================================
+# COMPILED REPLICA-EXCHANGE LOOP
+# =============================================================================
+
+def _make_pt_runner(graph, n_chains, n_replicas, n_rounds, swap_interval,
+                    steps_per_sample, hubs, observables, capture_states):
+    """
+    Compiled function running n_rounds of (swap_interval samples, one swap).
+
+    (key, betas[R], biases[N], state, carry, target_index)
+        -> (target_observed, state, carry, acceptance[R-1])
+    """
+    cache_key = ('tempering', n_chains, n_replicas, n_rounds, swap_interval,
+                 steps_per_sample, None if hubs is None else tuple(int(h) for h in hubs),
+                 tuple(observables), capture_states)
+    if cache_key in graph['samplers']:
+        return graph['samplers'][cache_key]
+
+    schedule = SamplingSchedule(
+        n_warmup=steps_per_sample, n_samples=swap_interval, steps_per_sample=steps_per_sample
+    )
+    sample_all = jax.vmap(make_chain_sampler(graph, schedule, hubs, observables, capture_states))
+    batch = n_chains * n_replicas
+    rungs = jnp.arange(n_replicas - 1)
+
+    def permute(x, perm):
+        """Reorder the replica axis of a (C*R, ...) array by perm[C, R]."""
+        x = x.reshape(n_chains, n_replicas, *x.shape[1:])
+        idx = perm.reshape(n_chains, n_replicas, *([1] * (x.ndim - 2)))
+        return jnp.take_along_axis(x, idx, axis=1).reshape(batch, *x.shape[2:])
+
+    def run(key, betas, biases, state, carry, target_index):
+        chain_betas = jnp.tile(betas, n_chains)
+        chain_biases = jnp.broadcast_to(biases, (batch, biases.shape[-1]))
+
+        def round_fn(loop, inputs):
+            state, carry = loop
+            round_key, parity = inputs
+            k_samp, k_swap = jr.split(round_key)
+
+            observed, state, carry = sample_all(
+                jr.split(k_samp, batch), chain_biases, chain_betas, state, carry
+            )
+
+            # Metropolis swaps between rungs r and r+1 with r % 2 == parity
+            energy = observed['energy'][:, -1].reshape(n_chains, n_replicas)
+            log_acc = (betas[:-1] - betas[1:]) * (energy[:, :-1] - energy[:, 1:])
+            u = jr.uniform(k_swap, log_acc.shape)
+            accept = (jnp.log(u) < log_acc) & (rungs % 2 == parity)
+
+            perm = jnp.broadcast_to(jnp.arange(n_replicas), (n_chains, n_replicas))
+            up = jnp.pad(accept, ((0, 0), (0, 1)))     # rung r takes r+1
+            down = jnp.pad(accept, ((0, 0), (1, 0)))   # rung r+1 takes r
+            perm = jnp.where(up, perm + 1, jnp.where(down, perm - 1, perm))
+
+            # Configurations move between rungs; running sums stay per rung
+            state = [permute(s, perm) for s in state]
+            carry = {'prev': permute(carry['prev'], perm), 'sums': carry['sums']}
+
+            target = jax.tree.map(
+                lambda x: x.reshape(n_chains, n_replicas, *x.shape[1:])[:, target_index],
+                observed
+            )
+            attempted = (rungs % 2 == parity).astype(jnp.float32)
+            return (state, carry), (target, accept.mean(axis=0), attempted)
+
+        keys = jr.split(key, n_rounds)
+        parities = jnp.arange(n_rounds) % 2
+        (state, carry), (target, accepted, attempted) = jax.lax.scan(
+            round_fn, (state, carry), (keys, parities)
+        )
+        acceptance = accepted.sum(axis=0) / jnp.maximum(attempted.sum(axis=0), 1)
+
+        # (rounds, C, swap_interval, ...) -> (C, rounds * swap_interval, ...)
+        target = jax.tree.map(
+            lambda x: jnp.swapaxes(x, 0, 1).reshape(n_chains, n_rounds * swap_interval, *x.shape[3:]),
+            target
+        )
+        return target, state, carry, acceptance
+
+    graph['samplers'][cache_key] = jax.jit(run, static_argnums=5)
+    return graph['samplers'][cache_key]
+
+
+# =============================================================================
+# DRIVER
+# =============================================================================
+
+def run_parallel_tempering(n_nodes, edges, target_beta, biases=None, n_samples=500,
+                           n_replicas=8, n_chains=1, swap_interval=1, steps_per_sample=2,
+                           target_acceptance=0.3, initial_spacing=0.05,
+                           n_tune=5, tune_rounds=50, hubs=None,
+                           observables=OBSERVABLES, capture_states=True,
+                           seed=None, graph=None):
+    """
+    Replica-exchange sampling, returning samples from target_beta only.
+
+    Parameters:
+    - n_nodes, edges: network
+    - target_beta: beta to sample (held fixed at the middle rung)
+    - biases: external field on each node (same on every rung)
+    - n_samples: samples to record per chain at the target rung
+    - n_replicas: rungs in the beta ladder
+    - n_chains: independent replica ensembles
+    - swap_interval: samples between swap attempts
+    - steps_per_sample: Gibbs sweeps between samples
+    - target_acceptance: swap acceptance the ladder is tuned towards
+    - initial_spacing: starting gap between neighbouring betas
+    - n_tune, tune_rounds: ladder-tuning iterations and swap rounds per
+      iteration; these double as warmup and are discarded
+    - hubs, observables, capture_states: as in thrml_sampling.observe_phases
+
+    Returns dict with per-chain target-rung observables (C, n_samples),
+    'spins' as a (C, n_samples, n_nodes) int8 array if capture_states,
+    the tuned 'betas' ladder, 'target_index', swap 'acceptance' per
+    neighbouring pair and 'n_warmup_sweeps'.
+    """
+    if graph is None:
+        graph = build_spin_graph(n_nodes, edges)
+    if biases is None:
+        biases = np.zeros(n_nodes)
+    if seed is None:
+        seed = int(np.random.SeedSequence().entropy % 2**31)
+
+    observables = tuple(observables)
+    if 'energy' not in observables:
+        observables = observables + ('energy',)
+
+    target_index = n_replicas // 2
+    gaps = np.full(n_replicas - 1, initial_spacing)
+    betas = build_ladder(target_beta, gaps, target_index)
+    biases = jnp.asarray(biases, dtype=jnp.float32)
+    batch = n_chains * n_replicas
+
+    key = jr.PRNGKey(seed)
+    key, k_init = jr.split(key)
+    state = init_chains(graph, jr.split(k_init, batch),
+                        jnp.broadcast_to(biases, (batch, n_nodes)),
+                        jnp.tile(jnp.asarray(betas, dtype=jnp.float32), n_chains))
+    carry = initial_carry(graph, state)
+
+    # Warmup doubles as ladder tuning
+    tune = _make_pt_runner(graph, n_chains, n_replicas, tune_rounds, swap_interval,
+                           steps_per_sample, hubs, ('energy',), False)
+    for _ in range(n_tune):
+        key, subkey = jr.split(key)
+        _, state, carry, acceptance = tune(
+            subkey, jnp.asarray(betas, dtype=jnp.float32), biases, state, carry, target_index
+        )
+        gaps = _tune_gaps(gaps, np.asarray(acceptance), target_acceptance)
+        betas = build_ladder(target_beta, gaps, target_index)
+
+    # Production: fresh running sums, same chain configurations
+    carry = {'prev': carry['prev'], 'sums': initial_carry(graph, state)['sums']}
+    n_rounds = -(-n_samples // swap_interval)
+    run = _make_pt_runner(graph, n_chains, n_replicas, n_rounds, swap_interval,
+                          steps_per_sample, hubs, observables, capture_states)
+    key, subkey = jr.split(key)
+    target, state, carry, acceptance = run(
+        subkey, jnp.asarray(betas, dtype=jnp.float32), biases, state, carry, target_index
+    )
+
+    result = {name: np.asarray(target[name])[:, :n_samples] for name in observables}
+    if capture_states:
+        result['spins'] = np.asarray(target['spins'])[:, :n_samples].astype(np.int8) * 2 - 1
+    result.update({
+        'betas': betas,
+        'target_index': target_index,
+        'acceptance': np.asarray(acceptance),
+        'n_warmup_sweeps': n_tune * tune_rounds * swap_interval * steps_per_sample,
+    })
+    return result
@@ -638,20 +638,61 @@ Real data source: {real_source}
     return fig
 
 
+# Per-condition summary columns of analyze(), as stored / exported
+STAT_COLUMNS = ['mean', 'mean_std', 'skew', 'skew_std', 'alpha_mle', 'alpha_mle_err']
+
+
+def save_results(results, analysis, config, root='data/results_store'):
+    """
+    Store one simulation in the columnar result store (see result_store).
+    
+    Tables under a fresh experiment ID, keyed by the config hash:
+    - 'avalanches': one row per condition, ragged 'sizes' of all its runs
+    - 'runs': one row per (condition, run) with the run's mean and skew
+    - 'conditions': one row per condition with the analyze() statistics
+    
+    Returns the experiment ID.
+    """
+    from result_store import hash_config, new_experiment_id, write_table
+    
+    experiment_id = new_experiment_id('quantum_avalanche_v3')
+    key = hash_config(config)
+    conds = list(results)
+    
+    write_table(root, experiment_id, 'avalanches', {
+        'condition': conds,
+        'sizes': [np.asarray(results[c]['sizes']) for c in conds],
+    }, config_hash=key, metadata={'config': config}, ragged=('sizes',))
+    write_table(root, experiment_id, 'runs', {
+        'condition': [c for c in conds for _ in results[c]['means']],
+        'run': np.concatenate([np.arange(len(results[c]['means'])) for c in conds]),
+        'mean': np.concatenate([results[c]['means'] for c in conds]),
+        'skew': np.concatenate([results[c]['skews'] for c in conds]),
+    }, config_hash=key)
+    write_table(root, experiment_id, 'conditions', {
+        'condition': conds,
+        **{name: np.array([analysis[c][name] for c in conds], dtype=float)
+           for name in STAT_COLUMNS},
+    }, config_hash=key)
+    print(f"  Stored: {root} (experiment {experiment_id})")
+    
+    return experiment_id
+
+
 def export_csv(results, analysis, filename='avalanche_v3_data.csv'):
-    """Export all sizes with condition labels."""
+    """Export all sizes with condition labels (CSV copy of save_results' tables)."""
     
     os.makedirs('data/quantum_avalanche_v3', exist_ok=True)
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     
-    # All sizes
+    # All sizes, one bulk write per condition
     sizes_file = f'data/quantum_avalanche_v3/avalanche_sizes_{timestamp}.csv'
     with open(sizes_file, 'w', newline='') as f:
         writer = csv.writer(f)
         writer.writerow(['condition', 'size'])
         for cond in results:
-            for size in results[cond]['sizes']:
-                writer.writerow([cond, size])
+            sizes = np.asarray(results[cond]['sizes'])
+            writer.writerows(zip([cond] * len(sizes), sizes.tolist()))
     print(f"  Exported: {sizes_file}")
     
     # Summary stats
@@ -660,10 +701,8 @@ def export_csv(results, analysis, filename='avalanche_v3_data.csv'):
         writer = csv.writer(f)
         writer.writerow(['condition', 'mean', 'mean_std', 'skew', 'skew_std', 
                         'alpha_mle', 'alpha_err'])
-        for cond in results:
-            a = analysis[cond]
-            writer.writerow([cond, a['mean'], a['mean_std'], a['skew'], 
-                           a['skew_std'], a['alpha_mle'], a['alpha_mle_err']])
+        writer.writerows([cond] + [analysis[cond][name] for name in STAT_COLUMNS]
+                         for cond in results)
     print(f"  Exported: {stats_file}")
     
     return sizes_file, stats_file
@@ -806,9 +845,15 @@ def main():
         print("      -> OR can both amplify (free will) and suppress (veto)")
         print("      -> Bidirectional agency mechanism confirmed")
     
-    # Export
-    print("\nExporting CSV data...")
-    export_csv(results, analysis)
+    # Store (SIM_EXPORT_CSV=1 also writes the old CSV files)
+    print("\nStoring results...")
+    config = {'bin_ms': BIN_MS, 'n_nodes': N_NODES, 'n_runs': N_RUNS, 'n_bins': N_BINS,
+              'k': K_SWEEP, 'prob_fire': PROB_FIRE, 'base_threshold': BASE_THRESHOLD,
+              'bias_fraction': BIAS_FRACTION, 'bias_strength': BIAS_STRENGTH,
+              'refractory': REFRACTORY, 'real_source': real_source}
+    save_results(results, analysis, config)
+    if os.environ.get("SIM_EXPORT_CSV", "0") == "1":
+        export_csv(results, analysis)
     
     # Plot
     print("\nGenerating plots...")
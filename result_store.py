@@ -0,0 +1,274 @@
+"""
+Result Store
+============
+
+Append-only columnar store for experiment results, replacing the
+timestamped CSV dumps, so runs can be re-analysed without re-simulating.
+
+Layout under the store root:
+
+    index.jsonl                            one line per written chunk
+    <experiment_id>/<table>_<nnnnn>.npz    one file per chunk, one array per column
+
+A chunk is one bulk write of a table: any number of rows and named
+columns. Scalar columns are (n_rows,) arrays. Ragged columns, such as the
+per-sample magnetizations or avalanche sizes of each run, are lists of
+1-D arrays (or named in ragged=), stored flat as '<name>.values' plus
+'<name>.offsets'. Index
+lines record the experiment ID, config hash, table, file, row count,
+columns and free metadata. They are appended and fsync'd like the
+checkpoint store in unified_quantum_test, so a crash loses at most the
+chunk in flight.
+
+Reads are selective. The index picks the chunks (experiment, config hash,
+table) without opening any data file. npz members are loaded lazily, so
+only the requested columns are read. where= filters rows by column value.
+
+Typical tables: 'runs' (one row of summary statistics per run) and
+'samples' (ragged per-sample series per run).
+
+Pure NumPy - no THRML required.
+"""
+
+import hashlib
+import json
+import os
+import re
+from datetime import datetime
+
+import numpy as np
+
+INDEX_NAME = "index.jsonl"
+
+# =============================================================================
+# KEYS
+# =============================================================================
+
+def _json_value(v):
+    """NumPy scalars/arrays -> plain JSON types."""
+    if isinstance(v, np.ndarray):
+        return v.tolist()
+    if isinstance(v, np.generic):
+        return v.item()
+    return v
+
+
+def hash_config(config):
+    """Stable 16-hex-digit hash of a JSON-serialisable config dict."""
+    blob = json.dumps(config, sort_keys=True, default=_json_value)
+    return hashlib.sha256(blob.encode()).hexdigest()[:16]
+
+
+def new_experiment_id(prefix):
+    """'<prefix>_<YYYYmmdd_HHMMSS_ffffff>', unique per call within a process."""
+    return f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+
+
+# =============================================================================
+# WRITING
+# =============================================================================
+
+def _encode(columns, ragged=()):
+    """
+    Column dict -> (arrays for np.savez, n_rows, {name: 'scalar'|'ragged'}).
+
+    A list/tuple column is ragged if any of its entries is an array
+    (scalar entries then become length-1 rows) or if its name is in ragged;
+    anything else, including an empty list, is a scalar column.
+    """
+    arrays, kinds, n_rows = {}, {}, None
+    for name, col in columns.items():
+        if name in ragged or (isinstance(col, (list, tuple))
+                              and any(np.ndim(c) >= 1 for c in col)):
+            parts = [np.asarray(c).ravel() for c in col]
+            lengths = np.array([len(p) for p in parts], dtype=np.int64)
+            arrays[f"{name}.values"] = np.concatenate(parts) if parts else np.zeros(0)
+            arrays[f"{name}.offsets"] = np.concatenate([[0], np.cumsum(lengths)])
+            kinds[name] = 'ragged'
+            rows = len(parts)
+        else:
+            arr = np.asarray(col)
+            if arr.dtype == object:
+                arr = arr.astype(str)
+            arrays[name] = arr
+            kinds[name] = 'scalar'
+            rows = len(arr)
+        if n_rows is not None and rows != n_rows:
+            raise ValueError(f"Column '{name}' has {rows} rows, expected {n_rows}")
+        n_rows = rows
+    return arrays, n_rows or 0, kinds
+
+
+def write_table(root, experiment_id, table, columns, config_hash=None, metadata=None,
+                ragged=()):
+    """
+    Append one chunk of rows to a table.
+
+    Parameters:
+    - root: store directory (created if missing)
+    - experiment_id: experiment key (see new_experiment_id)
+    - table: table name, e.g. 'runs' or 'samples'
+    - columns: dict name -> (n_rows,) array / list of scalars, or a list of
+      n_rows 1-D arrays (ragged column)
+    - config_hash: config key (see hash_config)
+    - metadata: JSON-serialisable dict stored in the index line
+    - ragged: column names to store as ragged even when no row is an array
+      (e.g. a chunk with zero rows)
+
+    Returns the path of the written chunk.
+    """
+    arrays, n_rows, kinds = _encode(columns, ragged)
+    directory = os.path.join(root, experiment_id)
+    os.makedirs(directory, exist_ok=True)
+
+    # Next chunk number after the highest existing one (never reuses a
+    # number, even if an earlier chunk file was deleted)
+    pattern = re.compile(rf"{re.escape(table)}_(\d+)\.npz")
+    numbers = [int(m.group(1)) for m in map(pattern.fullmatch, os.listdir(directory)) if m]
+    path = os.path.join(directory, f"{table}_{max(numbers, default=-1) + 1:05d}.npz")
+
+    # Write to a temporary file and rename, so a crash never leaves a torn chunk
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, **arrays)
+    os.replace(tmp_path, path)
+
+    record = {
+        'experiment_id': experiment_id,
+        'config_hash': config_hash,
+        'table': table,
+        'file': os.path.relpath(path, root),
+        'n_rows': n_rows,
+        'columns': kinds,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'metadata': metadata or {},
+    }
+    with open(os.path.join(root, INDEX_NAME), 'a') as f:
+        f.write(json.dumps(record, default=_json_value) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    return path
+
+
+# =============================================================================
+# READING
+# =============================================================================
+
+def read_index(root, experiment_id=None, config_hash=None, table=None):
+    """Index lines matching every given key, in write order (torn lines skipped)."""
+    path = os.path.join(root, INDEX_NAME)
+    if not os.path.exists(path):
+        return []
+    entries = []
+    with open(path) as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if ((experiment_id is None or entry['experiment_id'] == experiment_id)
+                    and (config_hash is None or entry['config_hash'] == config_hash)
+                    and (table is None or entry['table'] == table)):
+                entries.append(entry)
+    return entries
+
+
+def list_experiments(root):
+    """
+    One summary per experiment: dict experiment_id -> {'config_hash',
+    'tables' (table -> rows), 'metadata' (merged over chunks), 'created'}.
+    """
+    experiments = {}
+    for entry in read_index(root):
+        exp = experiments.setdefault(entry['experiment_id'], {
+            'config_hash': entry['config_hash'], 'tables': {}, 'metadata': {},
+            'created': entry['created'],
+        })
+        exp['tables'][entry['table']] = exp['tables'].get(entry['table'], 0) + entry['n_rows']
+        exp['metadata'].update(entry['metadata'])
+    return experiments
+
+
+def read_table(root, table, columns=None, experiment_id=None, config_hash=None, where=None):
+    """
+    Read selected columns and rows of a table across chunks.
+
+    Parameters:
+    - table: table name
+    - columns: names to load (default: the columns every matched chunk
+      has). A requested column that a chunk lacks is filled with NaN
+      (scalar) or empty arrays (ragged), so rows stay aligned.
+    - experiment_id, config_hash: restrict to matching chunks (index only)
+    - where: dict column -> value or collection of values; rows must
+      match every entry (scalar columns only)
+
+    Returns dict name -> array for scalar columns and list of arrays for
+    ragged columns, plus 'experiment_id' per row.
+    """
+    entries = read_index(root, experiment_id, config_hash, table)
+    where = where or {}
+    out = {}
+
+    # Column kinds over all chunks; a column must keep its kind
+    all_kinds = {}
+    for entry in entries:
+        for name, kind in entry['columns'].items():
+            if all_kinds.setdefault(name, kind) != kind:
+                raise ValueError(f"Column '{name}' is {all_kinds[name]} in some chunks "
+                                 f"and {kind} in others")
+    if columns is None:
+        names = [c for c in all_kinds if all(c in e['columns'] for e in entries)]
+    else:
+        missing = [c for c in columns if c not in all_kinds]
+        if entries and missing:
+            raise KeyError(f"Columns not in table '{table}': {missing}")
+        names = [c for c in columns if c in all_kinds]
+
+    for entry in entries:
+        kinds = entry['columns']
+        with np.load(os.path.join(root, entry['file'])) as data:
+            mask = np.ones(entry['n_rows'], dtype=bool)
+            for col, value in where.items():
+                if kinds.get(col) != 'scalar':
+                    mask[:] = False
+                    break
+                values = value if isinstance(value, (list, tuple, set, np.ndarray)) else [value]
+                mask &= np.isin(data[col], list(values))
+            rows = np.flatnonzero(mask)
+
+            for name in names:
+                if name not in kinds:
+                    # Column absent from this chunk: fill, keeping rows aligned
+                    out.setdefault(name, []).append(
+                        np.full(len(rows), np.nan) if all_kinds[name] == 'scalar'
+                        else [np.zeros(0) for _ in rows]
+                    )
+                elif kinds[name] == 'scalar':
+                    out.setdefault(name, []).append(data[name][rows])
+                else:
+                    values = data[f"{name}.values"]
+                    offsets = data[f"{name}.offsets"]
+                    out.setdefault(name, []).append(
+                        [values[offsets[r]:offsets[r + 1]] for r in rows]
+                    )
+            out.setdefault('experiment_id', []).append(
+                np.full(len(rows), entry['experiment_id'])
+            )
+
+    result = {}
+    for name, parts in out.items():
+        if parts and isinstance(parts[0], list):
+            result[name] = [arr for part in parts for arr in part]
+        else:
+            result[name] = np.concatenate(parts)
+    return result
+
+
+def export_csv(root, table, path, columns=None, **selection):
+    """Write the scalar columns of a table selection to one CSV file."""
+    import pandas as pd
+
+    data = read_table(root, table, columns=columns, **selection)
+    scalars = {k: v for k, v in data.items() if isinstance(v, np.ndarray)}
+    pd.DataFrame(scalars).to_csv(path, index=False)
+    return path
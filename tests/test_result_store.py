@@ -0,0 +1,55 @@
+"""Round trips of result_store chunks with differing column sets."""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import result_store as rs
+
+
+def test_mixed_column_chunks_stay_aligned(tmp_path):
+    root = str(tmp_path)
+    rs.write_table(root, 'e', 'runs', {'a': [1, 2], 'energy': [0.1, 0.2],
+                                       'series': [np.arange(2), np.arange(3)]})
+    rs.write_table(root, 'e', 'runs', {'a': [3]})
+
+    # Default: only the columns every chunk has
+    common = rs.read_table(root, 'runs')
+    assert set(common) == {'a', 'experiment_id'}
+    np.testing.assert_array_equal(common['a'], [1, 2, 3])
+
+    # Requested columns missing from a chunk are filled
+    data = rs.read_table(root, 'runs', columns=['a', 'energy', 'series'])
+    assert len(data['a']) == len(data['energy']) == len(data['series']) == 3
+    np.testing.assert_array_equal(data['energy'][:2], [0.1, 0.2])
+    assert np.isnan(data['energy'][2])
+    assert len(data['series'][2]) == 0
+
+    # Filtered reads stay aligned too
+    data = rs.read_table(root, 'runs', columns=['a', 'energy'], where={'a': [2, 3]})
+    np.testing.assert_array_equal(data['a'], [2, 3])
+    assert data['energy'][0] == 0.2 and np.isnan(data['energy'][1])
+
+    rs.export_csv(root, 'runs', str(tmp_path / 'runs.csv'), columns=['a', 'energy'])
+    assert len(open(tmp_path / 'runs.csv').read().splitlines()) == 4
+
+
+def test_unknown_column_raises(tmp_path):
+    root = str(tmp_path)
+    rs.write_table(root, 'e', 'runs', {'a': [1]})
+    with pytest.raises(KeyError):
+        rs.read_table(root, 'runs', columns=['missing'])
+
+
+def test_chunk_numbers_never_reused(tmp_path):
+    root = str(tmp_path)
+    first = rs.write_table(root, 'e', 'runs', {'a': [1]})
+    second = rs.write_table(root, 'e', 'runs', {'a': [2]})
+    os.remove(first)
+    third = rs.write_table(root, 'e', 'runs', {'a': [3]})
+    assert third != second and os.path.exists(second)
+    assert not any(f.endswith('.tmp') for f in os.listdir(os.path.dirname(third)))
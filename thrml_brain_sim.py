@@ -5,29 +5,38 @@ THRML Brain Simulation - Quantum Bias Test
 Uses Extropic's THRML library for true thermodynamic sampling.
 Tests whether small bias at hub nodes produces measurable shift in dynamics.
 
+JAX/THRML, SciPy and matplotlib are imported inside the functions that use
+them, so importing this module (e.g. for compute_avalanche_stats) is cheap.
+Without THRML, block Gibbs runs on the NumPy engine (numpy_gibbs;
+SIM_BACKEND=thrml/numpy selects it explicitly).
+
 Install: pip install thrml jax jaxlib
 
 Based on: https://github.com/extropic-ai/thrml
 """
 
-import jax
-import jax.numpy as jnp
-import jax.random as jr
+import time
+
+_IMPORT_START = time.perf_counter()
+
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy import stats
 from datetime import datetime
 import os
 
-# THRML imports
-from thrml import SpinNode, Block, SamplingSchedule, sample_states
-from thrml.models import IsingEBM, IsingSamplingProgram, hinton_init
+from cluster_sampler import run_cluster_simulation, METHODS as CLUSTER_METHODS
+from cluster_stats import graph_clusters, spin_runs
+from ising_graph import watts_strogatz_edges
+from mcmc_diagnostics import mixing_report
+from numpy_gibbs import resolve_backend, spawn_seeds
+
+# Seconds to import this module (JAX/THRML excluded, see thrml_sampling.TIMINGS)
+STARTUP_SECONDS = time.perf_counter() - _IMPORT_START
 
 # =============================================================================
 # NETWORK CONSTRUCTION
 # =============================================================================
 
-def create_brain_network(n_nodes=100, k=6, p=0.1):
+def create_brain_network(n_nodes=100, k=6, p=0.1, legacy=True):
     """
     Create a small-world network (Watts-Strogatz) as brain proxy.
     Returns edges as list of node index pairs.
@@ -36,40 +45,16 @@ def create_brain_network(n_nodes=100, k=6, p=0.1):
     - n_nodes: number of neurons
     - k: each node connects to k nearest neighbors (must be even)
     - p: rewiring probability (0.1 gives small-world properties)
+    - legacy: reproduce the original PRNGKey(42) topology; False uses the
+      batched generator (see ising_graph.watts_strogatz_edges)
     """
-    edges = []
-    
-    # Create ring lattice
-    for i in range(n_nodes):
-        for j in range(1, k // 2 + 1):
-            target = (i + j) % n_nodes
-            edges.append((i, target))
-    
-    # Rewire with probability p
-    key = jr.PRNGKey(42)
-    rewired_edges = []
-    for i, (u, v) in enumerate(edges):
-        key, subkey = jr.split(key)
-        if jr.uniform(subkey) < p:
-            # Rewire to random node
-            key, subkey = jr.split(key)
-            new_target = int(jr.randint(subkey, (), 0, n_nodes))
-            if new_target != u and (u, new_target) not in rewired_edges:
-                rewired_edges.append((u, new_target))
-            else:
-                rewired_edges.append((u, v))
-        else:
-            rewired_edges.append((u, v))
-    
-    return rewired_edges
+    edges = watts_strogatz_edges(n_nodes, k, p, seed=42, legacy=legacy)
+    return list(map(tuple, edges.tolist()))
 
 
 def identify_hubs(edges, n_nodes, n_hubs=10):
     """Find the most connected nodes (hubs) - these are our 'thalamic' nodes."""
-    degree = np.zeros(n_nodes)
-    for u, v in edges:
-        degree[u] += 1
-        degree[v] += 1
+    degree = np.bincount(np.asarray(edges).ravel(), minlength=n_nodes).astype(float)
     return np.argsort(degree)[-n_hubs:]
 
 
@@ -77,7 +62,9 @@ def identify_hubs(edges, n_nodes, n_hubs=10):
 # THRML SIMULATION
 # =============================================================================
 
-def run_ising_simulation(n_nodes, edges, beta, biases, n_samples=500, n_warmup=200):
+def run_ising_simulation(n_nodes, edges, beta, biases, n_samples=500, n_warmup=200,
+                         sampler='gibbs', steps_per_sample=2, graph=None, backend='auto',
+                         seed=None):
     """
     Run Ising model sampling using THRML.
     
@@ -88,96 +75,126 @@ def run_ising_simulation(n_nodes, edges, beta, biases, n_samples=500, n_warmup=2
     - biases: external field on each node (array of length n_nodes)
     - n_samples: number of samples to collect
     - n_warmup: warmup steps before collecting
+    - sampler: 'gibbs' (block Gibbs), 'tempering' (THRML replica exchange
+      around beta, see parallel_tempering; warmup is then the ladder-tuning
+      phase and n_warmup is ignored; needs THRML, so backend must resolve
+      to 'thrml'), or 'swendsen_wang' / 'wolff' (cluster
+      updates, see cluster_sampler). The alternatives are far less
+      autocorrelated near the critical point.
+    - steps_per_sample: sweeps between recorded samples (Gibbs and tempering)
+    - graph: optional thrml_sampling.build_spin_graph output; pass the same
+      graph to repeated calls so the sampler is compiled once
+    - backend: block Gibbs engine, 'thrml', 'numpy' (numpy_gibbs; graph
+      must then be a build_gibbs_graph output) or 'auto'
+    - seed: sampler seed (default: fresh entropy, see numpy_gibbs.spawn_seeds)
     
     Returns:
     - samples: (n_samples, n_nodes) array of spin states
     """
-    # Create nodes
-    nodes = [SpinNode() for _ in range(n_nodes)]
-    
-    # Create edges as node pairs
-    edge_pairs = [(nodes[i], nodes[j]) for i, j in edges]
-    
-    # Weights (coupling strength) - uniform ferromagnetic
-    weights = jnp.ones(len(edges)) * 0.5
-    
-    # Create model
-    model = IsingEBM(
-        nodes=nodes,
-        edges=edge_pairs,
-        biases=jnp.array(biases),
-        weights=weights,
-        beta=jnp.array(beta)
-    )
-    
-    # Two-color block Gibbs (checkerboard pattern for efficiency)
-    even_nodes = [nodes[i] for i in range(0, n_nodes, 2)]
-    odd_nodes = [nodes[i] for i in range(1, n_nodes, 2)]
-    free_blocks = [Block(even_nodes), Block(odd_nodes)]
-    
-    # Sampling program
-    program = IsingSamplingProgram(model, free_blocks, clamped_blocks=[])
-    
-    # Initialize and sample
-    key = jr.PRNGKey(int(datetime.now().timestamp()) % 2**31)
-    k_init, k_samp = jr.split(key)
-    
-    init_state = hinton_init(k_init, model, free_blocks, ())
-    schedule = SamplingSchedule(
-        n_warmup=n_warmup,
-        n_samples=n_samples,
-        steps_per_sample=2
+    if seed is None:
+        seed = spawn_seeds(1)[0]
+    
+    if sampler in CLUSTER_METHODS:
+        return run_cluster_simulation(
+            n_nodes, edges, beta, biases, n_samples=n_samples, n_warmup=n_warmup,
+            method=sampler, seed=seed
+        )
+    
+    if sampler == 'tempering':
+        if resolve_backend(backend) == 'numpy':
+            raise ValueError("sampler='tempering' needs THRML: use backend='thrml' "
+                             "(or 'auto' with JAX and THRML installed)")
+        from parallel_tempering import run_parallel_tempering
+        
+        result = run_parallel_tempering(
+            n_nodes, edges, beta, biases=biases, n_samples=n_samples,
+            steps_per_sample=steps_per_sample, observables=('magnetization',), graph=graph,
+            seed=seed
+        )
+        return result['spins'][0]
+    
+    if resolve_backend(backend) == 'numpy':
+        from numpy_gibbs import run_gibbs_simulation
+        
+        return run_gibbs_simulation(
+            n_nodes, edges, beta, biases, n_samples=n_samples, n_warmup=n_warmup,
+            steps_per_sample=steps_per_sample, graph=graph, seed=seed
+        )
+    
+    # THRML block Gibbs on the shared (cached, colour-blocked) graph
+    import jax.random as jr
+    from thrml_sampling import build_spin_graph, sample_phases
+    
+    if graph is None:
+        graph = build_spin_graph(n_nodes, edges)
+    key = jr.PRNGKey(seed)
+    spins, _ = sample_phases(
+        graph, key[None], [n_samples], np.asarray(biases, dtype=float)[None, None, :],
+        np.array([beta]), n_warmup=n_warmup, steps_per_sample=steps_per_sample
     )
-    
-    # Collect samples from all nodes
-    samples = sample_states(k_samp, program, schedule, init_state, [], [Block(nodes)])
-    
-    # samples is a list with one array; convert bool to +1/-1 spins
-    samples_array = np.array(samples[0])
-    spins = np.where(samples_array, 1, -1)  # True -> +1, False -> -1
-    
-    return spins
+    return spins[0]
 
 
-def compute_avalanche_stats(samples):
+def compute_avalanche_stats(samples, edges=None, biases=None, coupling=0.5, hubs=None):
     """
     Compute avalanche-like statistics from spin samples.
     
-    'Avalanche' = cluster of aligned spins (proxy for neural activation cascade)
+    'Avalanche' = cluster of aligned spins (proxy for neural activation cascade),
+    found for all samples at once by cluster_stats.spin_runs
+    
+    Also reports the integrated autocorrelation time and effective sample
+    size of the magnetization ('tau_mag', 'ess_mag') and, when edges are
+    given, of the energy ('tau_energy', 'ess_energy'). With edges, the
+    clusters of up-spins connected over the network ('graph_cluster_sizes',
+    'mean_graph_cluster', per-sample 'largest_cluster'; see
+    cluster_stats.graph_clusters) are reported as well. With hubs, the
+    summed hub spins per sample are kept as 'hub_sum' (for bias_response).
     """
+    from scipy import stats
+    
     n_samples, n_nodes = samples.shape
     
     # Magnetization per sample
     magnetization = np.mean(samples, axis=1)
     
-    # Cluster sizes (runs of +1 spins)
-    cluster_sizes = []
-    for s in samples:
-        in_cluster = False
-        size = 0
-        for spin in s:
-            if spin > 0:
-                in_cluster = True
-                size += 1
-            elif in_cluster:
-                cluster_sizes.append(size)
-                in_cluster = False
-                size = 0
-        if in_cluster:
-            cluster_sizes.append(size)
+    # Cluster sizes (runs of +1 spins), all samples at once
+    runs = spin_runs(samples)
+    cluster_sizes = runs['sizes']
     
     # Flip events between consecutive samples
     flips = np.sum(np.abs(np.diff(samples, axis=0)), axis=1)
     
+    # Sampling quality
+    series = {'mag': magnetization}
+    if edges is not None:
+        e = np.asarray(edges).reshape(-1, 2)
+        energy = -coupling * np.sum(samples[:, e[:, 0]] * samples[:, e[:, 1]], axis=1)
+        if biases is not None:
+            energy = energy - samples @ np.asarray(biases, dtype=float)
+        series['energy'] = energy
+    
+    extra = {} if hubs is None else {'hub_sum': samples[:, hubs].sum(axis=1)}
+    if edges is not None:
+        # Clusters connected over the network's edges, not node-index runs
+        clusters = graph_clusters(samples, edges)
+        extra.update({
+            'graph_cluster_sizes': clusters['sizes'],
+            'mean_graph_cluster': np.mean(clusters['sizes']) if len(clusters['sizes']) else 0,
+            'largest_cluster': clusters['largest'],
+        })
+    
     return {
         'magnetization': magnetization,
         'mean_mag': np.mean(magnetization),
         'std_mag': np.std(magnetization),
-        'cluster_sizes': np.array(cluster_sizes),
-        'mean_cluster': np.mean(cluster_sizes) if cluster_sizes else 0,
+        'cluster_sizes': cluster_sizes,
+        'clusters_per_sample': runs['counts'],
+        'mean_cluster': np.mean(cluster_sizes) if len(cluster_sizes) else 0,
         'flip_sizes': flips,
         'mean_flips': np.mean(flips),
-        'skewness': stats.skew(magnetization)
+        'skewness': stats.skew(magnetization),
+        **mixing_report(series),
+        **extra
     }
 
 
@@ -185,53 +202,107 @@ def compute_avalanche_stats(samples):
 # MAIN EXPERIMENT
 # =============================================================================
 
-def find_critical_temperature(n_nodes, edges, beta_range=None):
+def find_critical_temperature(n_nodes, edges, beta_range='screen', graph=None,
+                              cache_dir="data/critical_beta_cache", backend='auto'):
     """
     Sweep temperature to find critical point (maximum susceptibility).
     Critical point = edge of chaos = where brain operates.
+    
+    The initial grid is sampled in one batched call and then refined around
+    the peak; the returned betas/susceptibilities include every refined point.
+    The search is seeded deterministically and memoised in cache_dir (keyed
+    by network, grid and schedule; None disables the cache). The default
+    initial grid brackets the loopy-BP estimate of beta_c (see mean_field);
+    None gives the original linspace(0.1, 2.0, 10).
     """
+    from critical_search import search_critical_beta
+    
     if beta_range is None:
         beta_range = np.linspace(0.1, 2.0, 10)
     
     print("Finding critical temperature...")
-    susceptibilities = []
+    search = search_critical_beta(n_nodes, edges, beta_range=beta_range, seed=42,
+                                  graph=graph, cache_dir=cache_dir,
+                                  backend=resolve_backend(backend))
     
-    for beta in beta_range:
-        biases = np.zeros(n_nodes)
-        samples = run_ising_simulation(n_nodes, edges, beta, biases, n_samples=200, n_warmup=100)
-        mag = np.mean(samples, axis=1)
-        # Susceptibility = variance of magnetization
-        chi = np.var(mag) * n_nodes
-        susceptibilities.append(chi)
-        print(f"  beta={beta:.2f}: susceptibility={chi:.4f}")
+    return search['critical_beta'], search['betas'], search['susceptibility']
+
+
+def reweighted_critical_curve(n_nodes, edges, critical_beta, width=0.15, n_sims=5,
+                              n_samples=1000, n_warmup=200, backend='auto', seed=None):
+    """
+    Smooth susceptibility / |m| / specific-heat curves around the critical
+    point from a few simulations, via multi-histogram reweighting.
     
-    # Critical beta = maximum susceptibility
-    critical_idx = np.argmax(susceptibilities)
-    critical_beta = beta_range[critical_idx]
-    print(f"Critical beta: {critical_beta:.2f}")
+    Simulates n_sims betas spanning critical_beta +/- width and reweights
+    onto a dense grid (see reweighting.critical_curves). seed defaults to
+    fresh entropy (numpy_gibbs.spawn_seeds).
+    """
+    from critical_search import sample_energy_magnetization
+    from reweighting import critical_curves
     
-    return critical_beta, beta_range, susceptibilities
+    betas = np.linspace(max(critical_beta - width, 1e-3), critical_beta + width, n_sims)
+    energies, mags = sample_energy_magnetization(
+        n_nodes, edges, betas, n_samples=n_samples, n_warmup=n_warmup,
+        seed=spawn_seeds(1)[0] if seed is None else seed, backend=resolve_backend(backend)
+    )
+    curve = critical_curves(energies, mags, betas, n_nodes)
+    curve['simulated_betas'] = betas
+    print(f"Reweighted critical beta: {curve['critical_beta']:.3f} "
+          f"(from {n_sims} simulations)")
+    return curve
 
 
-def run_quantum_bias_experiment(n_nodes=100, n_runs=20, quantum_bias=0.3):
+def run_quantum_bias_experiment(n_nodes=100, n_runs=20, quantum_bias=0.3, sampler='gibbs',
+                                n_hubs=10, legacy_network=True, backend='auto', seed=None):
     """
     Main experiment: Compare classical vs quantum-biased dynamics at criticality.
+    
+    sampler: sampling engine for the trials (see run_ising_simulation).
+    n_hubs: number of highest-degree nodes to bias.
+    legacy_network: reproduce the original 100-node topology; use False
+    (batched generator) for large networks.
+    backend: block Gibbs engine ('thrml', 'numpy' or 'auto').
+    seed: base seed; every (condition, run) trial gets its own seed spawned
+    from it (default: fresh entropy, printed so the experiment can be rerun).
     """
+    backend = resolve_backend(backend)
+    if backend == 'thrml':
+        from thrml_sampling import build_spin_graph
+    else:
+        from numpy_gibbs import build_gibbs_graph as build_spin_graph
+    
     print("="*60)
     print("THRML Quantum Bias Experiment")
     print("="*60)
     
     # Create network
-    edges = create_brain_network(n_nodes, k=6, p=0.1)
-    hubs = identify_hubs(edges, n_nodes, n_hubs=10)
+    edges = create_brain_network(n_nodes, k=6, p=0.1, legacy=legacy_network)
+    hubs = identify_hubs(edges, n_nodes, n_hubs=n_hubs)
+    graph = build_spin_graph(n_nodes, edges)
     print(f"Network: {n_nodes} nodes, {len(edges)} edges")
-    print(f"Hub nodes (highest degree): {hubs}")
+    print(f"Hub nodes (highest degree): {hubs if n_hubs <= 20 else f'{n_hubs} nodes'}")
     
     # Find critical temperature
-    critical_beta, betas, suscept = find_critical_temperature(n_nodes, edges)
-    
-    # Run experiments at critical temperature
-    print(f"\nRunning {n_runs} trials at critical beta={critical_beta:.2f}...")
+    critical_beta, betas, suscept = find_critical_temperature(n_nodes, edges, graph=graph,
+                                                              backend=backend)
+    
+    # Loopy-BP preview of the hub-driven shift (milliseconds, approximate)
+    from mean_field import screen
+    hub_field = np.zeros(n_nodes)
+    hub_field[hubs] = quantum_bias
+    preview = screen(n_nodes, edges, [critical_beta],
+                     {'positive': hub_field, 'negative': -hub_field}, hubs=hubs)
+    print(f"Mean-field screen at beta={critical_beta:.2f}: "
+          f"Q(+) shift {preview['shift']['positive'][0]:+.3f}, "
+          f"Q(-) shift {preview['shift']['negative'][0]:+.3f} (Bethe approximation)")
+    
+    # Run experiments at critical temperature, one independent seed per
+    # (condition, run) trial
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+    run_seeds = np.reshape(spawn_seeds(3 * n_runs, seed), (3, n_runs))
+    print(f"\nRunning {n_runs} trials at critical beta={critical_beta:.2f} (seed {seed})...")
     
     results = {
         'classical': [],
@@ -244,27 +315,140 @@ def run_quantum_bias_experiment(n_nodes=100, n_runs=20, quantum_bias=0.3):
         
         # Classical: no bias
         biases_classical = np.zeros(n_nodes)
-        samples = run_ising_simulation(n_nodes, edges, critical_beta, biases_classical, n_samples=300)
-        results['classical'].append(compute_avalanche_stats(samples))
+        samples = run_ising_simulation(n_nodes, edges, critical_beta, biases_classical, n_samples=300,
+                                       sampler=sampler, graph=graph, backend=backend,
+                                       seed=int(run_seeds[0, run]))
+        results['classical'].append(compute_avalanche_stats(samples, edges, biases_classical, hubs=hubs))
         
         # Quantum positive: bias hubs toward +1 (promote activation)
         biases_positive = np.zeros(n_nodes)
         biases_positive[hubs] = quantum_bias
-        samples = run_ising_simulation(n_nodes, edges, critical_beta, biases_positive, n_samples=300)
-        results['quantum_positive'].append(compute_avalanche_stats(samples))
+        samples = run_ising_simulation(n_nodes, edges, critical_beta, biases_positive, n_samples=300,
+                                       sampler=sampler, graph=graph, backend=backend,
+                                       seed=int(run_seeds[1, run]))
+        results['quantum_positive'].append(compute_avalanche_stats(samples, edges, biases_positive))
         
         # Quantum negative: bias hubs toward -1 (veto/suppress)
         biases_negative = np.zeros(n_nodes)
         biases_negative[hubs] = -quantum_bias
-        samples = run_ising_simulation(n_nodes, edges, critical_beta, biases_negative, n_samples=300)
-        results['quantum_negative'].append(compute_avalanche_stats(samples))
+        samples = run_ising_simulation(n_nodes, edges, critical_beta, biases_negative, n_samples=300,
+                                       sampler=sampler, graph=graph, backend=backend,
+                                       seed=int(run_seeds[2, run]))
+        results['quantum_negative'].append(compute_avalanche_stats(samples, edges, biases_negative))
     
     print("\nDone!")
+    for condition, runs in results.items():
+        print(f"  {condition}: tau(mag)={np.mean([r['tau_mag'] for r in runs]):.1f}, "
+              f"ESS(mag)={np.mean([r['ess_mag'] for r in runs]):.0f} of {len(samples)} samples")
     return results, critical_beta, betas, suscept, hubs
 
 
-def plot_results(results, critical_beta, betas, suscept, output_dir="data/thrml_experiment"):
-    """Create publication-quality figures."""
+def quantum_bias_dose_curve(results, hubs, critical_beta, doses=None, n_nodes=None, edges=None,
+                            sampler='gibbs', graph=None, backend='auto', n_direct_runs=5,
+                            min_weight_fraction=0.05, seed=None):
+    """
+    Mean magnetization as a function of the hub bias (Q(+) for h > 0,
+    Q(-) for h < 0) from the classical runs alone, by linear response and
+    exact reweighting (see bias_response.dose_response).
+
+    Doses where the reweighting weights degenerate are simulated directly
+    (n_direct_runs runs of the classical run length) when n_nodes and
+    edges are given; otherwise they are only flagged.
+
+    Parameters:
+    - results: run_quantum_bias_experiment results (classical runs with 'hub_sum')
+    - hubs: biased nodes
+    - critical_beta: inverse temperature of the runs
+    - doses: hub field strengths (default: -0.6 ... 0.6)
+    - seed: base seed of the direct runs; every dose reuses the same
+      n_direct_runs seeds spawned from it (default: fresh entropy)
+
+    Returns the dose_response dict.
+    """
+    from bias_response import dose_response
+
+    if doses is None:
+        doses = np.linspace(-0.6, 0.6, 13)
+    classical = results['classical']
+    mags = np.array([r['magnetization'] for r in classical])
+    hub_sums = np.array([r['hub_sum'] for r in classical])
+
+    simulate = None
+    if edges is not None:
+        run_seeds = spawn_seeds(n_direct_runs, seed)
+
+        def simulate(dose):
+            biases = np.zeros(n_nodes)
+            biases[hubs] = dose
+            return np.array([
+                run_ising_simulation(n_nodes, edges, critical_beta, biases,
+                                     n_samples=mags.shape[1], sampler=sampler, graph=graph,
+                                     backend=backend, seed=run_seed).mean(axis=1)
+                for run_seed in run_seeds
+            ])
+
+    return dose_response(mags, hub_sums, critical_beta, doses,
+                         min_weight_fraction=min_weight_fraction, simulate=simulate)
+
+
+def validate_against_exact(n_nodes=16, beta=0.5, quantum_bias=0.3, n_hubs=3, n_runs=4,
+                           n_samples=2000, n_warmup=200, sampler='gibbs', backend='auto'):
+    """
+    Check a sampler against exact enumeration on a reduced brain network.
+
+    Runs the classical, Q(+) and Q(-) conditions of the experiment on
+    create_brain_network(n_nodes) (n_runs chains each, seeds 0..n_runs-1)
+    and compares magnetization, |m|, m^2, energy and hub magnetization with
+    exact_ising (see exact_ising.validate_sampler_series).
+
+    Returns dict condition -> validation result ('observables', 'max_abs_z',
+    'passed').
+    """
+    from exact_ising import exact_ising, validate_sampler_series
+
+    backend = resolve_backend(backend)
+    edges = create_brain_network(n_nodes, k=6, p=0.1)
+    hubs = identify_hubs(edges, n_nodes, n_hubs=n_hubs)
+    e = np.asarray(edges)
+
+    report = {}
+    for condition, sign in [('classical', 0), ('quantum_positive', 1), ('quantum_negative', -1)]:
+        biases = np.zeros(n_nodes)
+        biases[hubs] = sign * quantum_bias
+        exact = exact_ising(n_nodes, edges, beta, biases, hubs=hubs)
+
+        runs = np.array([
+            run_ising_simulation(n_nodes, edges, beta, biases, n_samples=n_samples,
+                                 n_warmup=n_warmup, sampler=sampler, backend=backend, seed=run)
+            for run in range(n_runs)
+        ]).astype(float)
+        series = {
+            'magnetization': runs.mean(axis=2),
+            'hub_magnetization': runs[:, :, hubs].mean(axis=2),
+            'energy': -(0.5 * np.sum(runs[:, :, e[:, 0]] * runs[:, :, e[:, 1]], axis=2)
+                        + runs @ biases),
+        }
+        report[condition] = validate_sampler_series(exact, series)
+
+    print(f"Exact check: {sampler} ({backend}), N={n_nodes}, beta={beta}")
+    for condition, check in report.items():
+        obs = check['observables']
+        print(f"  {condition:18s} <m>={obs['magnetization']['sampled']:+.4f} "
+              f"(exact {obs['magnetization']['exact']:+.4f}), "
+              f"max|z|={check['max_abs_z']:.2f} {'ok' if check['passed'] else 'FAIL'}")
+    return report
+
+
+def plot_results(results, critical_beta, betas, suscept, output_dir="data/thrml_experiment",
+                 curve=None):
+    """
+    Create publication-quality figures.
+    
+    curve: optional reweighted_critical_curve output, drawn as a continuous
+    susceptibility curve with error band over the sampled points.
+    """
+    import matplotlib.pyplot as plt
+    from scipy import stats
     
     os.makedirs(output_dir, exist_ok=True)
     
@@ -273,6 +457,13 @@ def plot_results(results, critical_beta, betas, suscept, output_dir="data/thrml_
     # 1. Critical temperature sweep
     ax = axes[0, 0]
     ax.plot(betas, suscept, 'b-o', linewidth=2, markersize=6)
+    if curve is not None:
+        ax.plot(curve['beta'], curve['susceptibility'], 'k-', linewidth=1.5,
+                label='Reweighted')
+        ax.fill_between(curve['beta'],
+                        curve['susceptibility'] - curve['susceptibility_err'],
+                        curve['susceptibility'] + curve['susceptibility_err'],
+                        color='gray', alpha=0.3)
     ax.axvline(critical_beta, color='r', linestyle='--', label=f'Critical beta={critical_beta:.2f}')
     ax.set_xlabel('Inverse Temperature (beta)', fontsize=11)
     ax.set_ylabel('Susceptibility (variance * N)', fontsize=11)
@@ -395,8 +586,54 @@ not Monte Carlo approximation.
 # MAIN
 # =============================================================================
 
+# Per-run summary columns of the result store ('runs' table)
+RUN_COLUMNS = ('mean_mag', 'std_mag', 'mean_flips', 'tau_mag', 'ess_mag', 'tau_energy',
+               'ess_energy', 'mean_cluster', 'mean_graph_cluster', 'skewness')
+
+# Per-sample series of the result store ('samples' table)
+SAMPLE_COLUMNS = ('magnetization', 'flip_sizes', 'cluster_sizes', 'graph_cluster_sizes',
+                  'largest_cluster', 'hub_sum')
+
+
+def save_results_to_store(results, critical_beta, betas, suscept, hubs, config,
+                          root="data/results_store"):
+    """
+    Save the experiment to the columnar result store (see result_store).
+
+    Tables under one experiment ID, keyed by the hash of config:
+    - 'runs': one row per (condition, run) with the RUN_COLUMNS summaries
+    - 'samples': the same rows with the raw per-sample SAMPLE_COLUMNS
+      series (magnetization trajectory, flips, cluster sizes, ...)
+    - 'scan': the critical-beta search (beta, susceptibility)
+
+    critical_beta and the hub indices go into the index metadata.
+    Returns the experiment ID.
+    """
+    from result_store import hash_config, new_experiment_id, write_table
+
+    experiment_id = new_experiment_id('thrml_brain_sim')
+    key = hash_config(config)
+    metadata = {'critical_beta': critical_beta, 'hubs': np.asarray(hubs), 'config': config}
+
+    rows = [(condition, i, r) for condition in ['classical', 'quantum_positive', 'quantum_negative']
+            for i, r in enumerate(results[condition])]
+    ids = {'condition': [c for c, _, _ in rows], 'run': [i for _, i, _ in rows]}
+    runs = {**ids, **{col: [r.get(col, np.nan) for _, _, r in rows] for col in RUN_COLUMNS}}
+    runs['max_flips'] = [np.max(r['flip_sizes']) for _, _, r in rows]
+    samples = {**ids, **{col: [np.asarray(r.get(col, [])) for _, _, r in rows]
+                         for col in SAMPLE_COLUMNS}}
+
+    write_table(root, experiment_id, 'runs', runs, config_hash=key, metadata=metadata)
+    write_table(root, experiment_id, 'samples', samples, config_hash=key,
+                ragged=SAMPLE_COLUMNS)
+    write_table(root, experiment_id, 'scan', {'beta': betas, 'susceptibility': suscept},
+                config_hash=key)
+    print(f"Saved: {root} (experiment {experiment_id}, config {key})")
+    return experiment_id
+
+
 def save_results_to_csv(results, critical_beta, betas, suscept, hubs, output_dir="data/thrml_experiment"):
-    """Save all numerical results to CSV files."""
+    """Save all numerical results to CSV files (superseded by save_results_to_store)."""
     import pandas as pd
     
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -429,7 +666,11 @@ def save_results_to_csv(results, critical_beta, betas, suscept, hubs, output_dir
                 'mean_mag': r['mean_mag'],
                 'std_mag': r['std_mag'],
                 'mean_flips': np.mean(r['flip_sizes']),
-                'max_flips': np.max(r['flip_sizes'])
+                'max_flips': np.max(r['flip_sizes']),
+                'tau_mag': r['tau_mag'],
+                'ess_mag': r['ess_mag'],
+                'tau_energy': r.get('tau_energy', np.nan),
+                'ess_energy': r.get('ess_energy', np.nan)
             })
     
     runs_df = pd.DataFrame(all_runs)
@@ -477,21 +718,45 @@ if __name__ == "__main__":
     print("Starting THRML thermodynamic brain simulation...")
     print("This uses true Gibbs sampling, not Monte Carlo approximation.\n")
     
+    # Network size (SIM_NODES=10000 etc. for the large-network mode: batched
+    # generator, 10% of nodes as hubs; see README for scaling)
+    N_NODES = int(os.environ.get("SIM_NODES", "100"))
+    LEGACY_NETWORK = N_NODES == 100
+    BACKEND = resolve_backend(os.environ.get("SIM_BACKEND", "auto"))
+    print(f"Block Gibbs backend: {BACKEND}\n")
+    if BACKEND == 'thrml':
+        # Persist compiled samplers across runs (see thrml_sampling)
+        from thrml_sampling import enable_compilation_cache
+        enable_compilation_cache()
+    
     # Run experiment
     results, critical_beta, betas, suscept, hubs = run_quantum_bias_experiment(
-        n_nodes=100,
+        n_nodes=N_NODES,
         n_runs=20,
-        quantum_bias=0.3
+        quantum_bias=0.3,
+        n_hubs=max(10, N_NODES // 10),
+        legacy_network=LEGACY_NETWORK,
+        backend=BACKEND
     )
     
+    # Continuous critical curve from a few reweighted simulations
+    # (the network is PRNGKey(42)-seeded, so this is the experiment's network)
+    edges = create_brain_network(N_NODES, k=6, p=0.1, legacy=LEGACY_NETWORK)
+    curve = reweighted_critical_curve(N_NODES, edges, critical_beta, backend=BACKEND)
+    
     # Plot
-    fig = plot_results(results, critical_beta, betas, suscept)
+    fig = plot_results(results, critical_beta, betas, suscept, curve=curve)
     
-    # Save numerical results to CSV
+    # Save summaries and raw per-sample series to the result store
     print("\n" + "="*60)
     print("SAVING NUMERICAL RESULTS")
     print("="*60)
-    timestamp = save_results_to_csv(results, critical_beta, betas, suscept, hubs)
+    experiment_id = save_results_to_store(
+        results, critical_beta, betas, suscept, hubs,
+        config={'n_nodes': N_NODES, 'n_runs': 20, 'quantum_bias': 0.3,
+                'n_hubs': max(10, N_NODES // 10), 'legacy_network': LEGACY_NETWORK,
+                'sampler': 'gibbs', 'backend': BACKEND, 'n_samples': 300}
+    )
     
     # Print summary statistics
     print("\n" + "="*60)
@@ -514,7 +779,30 @@ if __name__ == "__main__":
     print(f"\nStatistical Tests:")
     print(f"Classical vs Q(+): t={t_pos:.3f}, p={p_pos:.6f}")
     print(f"Classical vs Q(-): t={t_neg:.3f}, p={p_neg:.6f}")
-    
+
+    # Dose-response from the classical runs alone (reweighting), checked
+    # against the directly simulated Q(+)/Q(-) at h = +/-0.3
+    dose = quantum_bias_dose_curve(results, hubs, critical_beta, n_nodes=N_NODES, edges=edges,
+                                   backend=BACKEND)
+    print(f"\nDose-response of mean_mag from classical runs "
+          f"(susceptibility {dose['susceptibility']:+.4f} +/- {dose['susceptibility_err']:.4f}):")
+    print(f"{'h':>6s} {'linear':>9s} {'curve':>16s} {'weights':>8s}  source")
+    for i, h in enumerate(dose['doses']):
+        print(f"{h:+6.2f} {dose['linear'][i]:+9.4f} "
+              f"{dose['curve'][i]:+8.4f} +/- {dose['curve_err'][i]:.4f} "
+              f"{dose['weight_fraction'][i]:8.3f}  {dose['source'][i]}")
+    print(f"Direct: Q(+) {np.mean(qpos_mags):+.4f}, Q(-) {np.mean(qneg_mags):+.4f} at h=+/-0.3")
+
+    # Startup cost: the JAX/THRML import and the first compiled sample are
+    # paid once per process; the compilation cache makes later runs cheaper
+    if BACKEND == 'thrml':
+        from thrml_sampling import TIMINGS, COMPILATION_CACHE_DIR
+        first = TIMINGS['first_sample_seconds']
+        print(f"\nStartup: {STARTUP_SECONDS:.2f}s imports + {TIMINGS['import_seconds']:.2f}s JAX/THRML; "
+              f"first sample after {'n/a' if first is None else f'{first:.2f}s'} "
+              f"(compilation cache: {COMPILATION_CACHE_DIR or 'off'})")
+    
+    import matplotlib.pyplot as plt
     plt.show()
 
 
@@ -0,0 +1,579 @@
+"""
+Batched THRML Sampling
+======================
+
+Shared sampling core for the THRML experiments (unified_quantum_test,
+thrml_brain_sim). Instead of building one IsingEBM per run and sampling a
+single 100-spin chain at a time, B independent chains are sampled in one
+vmapped, jit-compiled call. Each chain has its own PRNG key, bias vector and
+inverse temperature, so runs x conditions (or a beta grid) become one
+vectorized ensemble.
+
+A sampling "schedule" is plain data: a list of phase lengths plus a
+(B, n_phases, n_nodes) bias array. The spin state is carried from phase to
+phase, so warmup is paid once per chain. With n_warmup='adaptive' the
+warmup runs until split-R-hat over chains with the same configuration says
+the chains have converged, instead of for a fixed number of sweeps.
+
+observe_schedule() takes a per-sample (T, n_nodes) bias schedule instead
+(ramps, decays, stochastic pulses; see bias_schedules) and scans the bias
+rows on device, so the whole schedule is one compiled call.
+
+Observables (magnetization, hub / non-hub magnetization, flip counts,
+energy and running moment sums) are reduced on device inside the sampling scan by
+SpinObservables, so full spin states only need to leave the device when
+they are explicitly requested.
+
+Compiled samplers can also be persisted across processes:
+enable_compilation_cache(), called by the experiment entry points (not on
+import), points JAX's compilation cache at data/jax_cache (override with
+THRML_COMPILATION_CACHE, or set it to '' to disable), so a second run - or
+a pool worker - loads the executables from disk instead of recompiling.
+TIMINGS records the JAX/THRML import cost and the time to the first
+returned sample.
+
+Install: pip install thrml jax jaxlib
+"""
+
+import os
+import time
+
+_IMPORT_START = time.perf_counter()
+
+import equinox as eqx
+import jax
+import jax.numpy as jnp
+import jax.random as jr
+import numpy as np
+
+from thrml import (SpinNode, Block, SamplingSchedule, AbstractObserver,
+                   sample_with_observation, block_state_to_global, from_global_state)
+from thrml.models import IsingEBM, IsingSamplingProgram, hinton_init
+
+from ising_graph import color_blocks
+from mcmc_diagnostics import adaptive_warmup
+
+# Per-sample observables SpinObservables can record
+OBSERVABLES = ('magnetization', 'hub_magnetization', 'nonhub_magnetization', 'flips', 'energy')
+
+# Seconds spent importing JAX/THRML, and from import to the first sample
+# returned to the host (compilation, or loading it from the disk cache)
+TIMINGS = {'import_seconds': time.perf_counter() - _IMPORT_START, 'first_sample_seconds': None}
+
+# =============================================================================
+# COMPILATION CACHE
+# =============================================================================
+
+# Directory in use once enable_compilation_cache() has run (None = off)
+COMPILATION_CACHE_DIR = None
+
+
+def enable_compilation_cache(cache_dir=None, min_compile_time=0.2):
+    """
+    Persist compiled XLA executables on disk, keyed by the traced program
+    (network, schedule and shapes), so later processes skip compilation.
+
+    Parameters:
+    - cache_dir: cache directory (default: $THRML_COMPILATION_CACHE, else
+      data/jax_cache next to this file; '' disables the cache)
+    - min_compile_time: only cache programs that took at least this many
+      seconds to compile
+
+    A directory already configured through JAX_COMPILATION_CACHE_DIR is
+    left alone unless cache_dir is given. Returns the directory in use, or
+    None if disabled, and records it in COMPILATION_CACHE_DIR.
+    """
+    global COMPILATION_CACHE_DIR
+    configured = jax.config.values.get('jax_compilation_cache_dir')
+    if cache_dir is None:
+        if configured:
+            COMPILATION_CACHE_DIR = configured
+            return configured
+        cache_dir = os.environ.get(
+            'THRML_COMPILATION_CACHE',
+            os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'jax_cache')
+        )
+    if not cache_dir:
+        return None
+
+    os.makedirs(cache_dir, exist_ok=True)
+    jax.config.update('jax_compilation_cache_dir', cache_dir)
+    jax.config.update('jax_persistent_cache_min_compile_time_secs', min_compile_time)
+    COMPILATION_CACHE_DIR = cache_dir
+    return cache_dir
+
+# =============================================================================
+# MODEL CONSTRUCTION
+# =============================================================================
+
+def build_spin_graph(n_nodes, edges, block_indices=None, coupling=0.5):
+    """
+    Build the THRML node/edge structure once for a network.
+
+    Parameters:
+    - n_nodes: number of spins
+    - edges: list of (i, j) pairs or an (E, 2) index array
+    - block_indices: list of node-index arrays, one per Gibbs block
+      (default: graph colouring, ising_graph.color_blocks, so no block
+      contains two neighbouring spins)
+    - coupling: uniform ferromagnetic weight on every edge
+
+    Returns a dict that is passed to the samplers below. Compiled samplers
+    are cached on it, so re-use the same graph for repeated calls.
+    """
+    if block_indices is None:
+        block_indices = color_blocks(n_nodes, edges)
+    block_indices = [np.asarray(idx) for idx in block_indices]
+
+    # THRML needs one SpinNode per spin and node pairs per edge; everything
+    # else works on the index arrays
+    edge_index = np.asarray(edges, dtype=np.int32).reshape(-1, 2)
+    nodes = [SpinNode() for _ in range(n_nodes)]
+    edge_pairs = [(nodes[i], nodes[j]) for i, j in edge_index.tolist()]
+
+    return {
+        'n_nodes': n_nodes,
+        'nodes': nodes,
+        'edge_pairs': edge_pairs,
+        'edge_index': edge_index,
+        'weights': jnp.full(len(edge_index), coupling),
+        'block_indices': block_indices,
+        'free_blocks': [Block([nodes[i] for i in idx]) for idx in block_indices],
+        'samplers': {},
+    }
+
+
+def _make_program(graph, biases, beta):
+    """IsingSamplingProgram for one chain (called under vmap/jit)."""
+    model = IsingEBM(
+        nodes=graph['nodes'],
+        edges=graph['edge_pairs'],
+        biases=biases,
+        weights=graph['weights'],
+        beta=beta
+    )
+    return model, IsingSamplingProgram(model, graph['free_blocks'], clamped_blocks=[])
+
+
+# =============================================================================
+# ON-DEVICE OBSERVABLES
+# =============================================================================
+
+class SpinObservables(AbstractObserver):
+    """
+    Observer that reduces each sample to a few scalars inside the JAX loop.
+
+    Per sample it records the selected `observables` (see OBSERVABLES) and,
+    if `capture_states` is set, the full boolean state. The carry holds the
+    previous sample (for flip counts, and as the chain state to continue
+    from) plus running sums over every sample seen so far:
+    n, m, m^2, m^4, |m|, E, E^2 and total flips.
+
+    Energy is E(s) = -(sum_ij J_ij s_i s_j + sum_i h_i s_i), i.e. the
+    model energy without the beta factor, as needed for reweighting.
+    """
+
+    all_nodes: list
+    hub_mask: jax.Array
+    edge_index: jax.Array
+    weights: jax.Array
+    biases: jax.Array
+    observables: tuple = eqx.field(static=True)
+    capture_states: bool = eqx.field(static=True)
+
+    def __call__(self, program, state_free, state_clamped, carry, iteration):
+        global_state = block_state_to_global(state_free + state_clamped, program.gibbs_spec)
+        x = from_global_state(global_state, program.gibbs_spec, self.all_nodes)[0]
+        spins = 2 * x.astype(jnp.float32) - 1
+
+        m = jnp.mean(spins)
+        flips = jnp.count_nonzero(x != carry['prev']).astype(jnp.int32)
+        energy = -(jnp.sum(self.weights * spins[self.edge_index[:, 0]] * spins[self.edge_index[:, 1]])
+                   + jnp.sum(self.biases * spins))
+
+        values = {
+            'magnetization': m,
+            'hub_magnetization': jnp.sum(jnp.where(self.hub_mask, spins, 0))
+                                 / jnp.maximum(jnp.sum(self.hub_mask), 1),
+            'nonhub_magnetization': jnp.sum(jnp.where(self.hub_mask, 0, spins))
+                                    / jnp.maximum(jnp.sum(~self.hub_mask), 1),
+            'flips': flips,
+            'energy': energy,
+        }
+        out = {name: values[name] for name in self.observables}
+        if self.capture_states:
+            out['spins'] = x
+
+        sums = carry['sums']
+        sums = {
+            'n': sums['n'] + 1,
+            'm': sums['m'] + m,
+            'm2': sums['m2'] + m ** 2,
+            'm4': sums['m4'] + m ** 4,
+            'abs_m': sums['abs_m'] + jnp.abs(m),
+            'e': sums['e'] + energy,
+            'e2': sums['e2'] + energy ** 2,
+            'flips': sums['flips'] + flips,
+        }
+        return {'prev': x, 'sums': sums}, out
+
+
+def initial_carry(graph, state):
+    """Observer carry for a batch of chains starting from block `state`."""
+    n_chains = state[0].shape[0]
+    prev = jnp.zeros((n_chains, graph['n_nodes']), dtype=jnp.bool_)
+    for idx, block_state in zip(graph['block_indices'], state):
+        prev = prev.at[:, jnp.asarray(idx)].set(block_state)
+
+    zeros = jnp.zeros(n_chains, dtype=jnp.float32)
+    counts = jnp.zeros(n_chains, dtype=jnp.int32)
+    sums = {'n': counts, 'm': zeros, 'm2': zeros, 'm4': zeros, 'abs_m': zeros,
+            'e': zeros, 'e2': zeros, 'flips': counts}
+    return {'prev': prev, 'sums': sums}
+
+
+# =============================================================================
+# BATCHED SAMPLERS
+# =============================================================================
+
+def _get_init_fn(graph):
+    """Compiled batched hinton_init: (keys[B], biases[B,N], betas[B]) -> state."""
+    if 'init' not in graph['samplers']:
+        def init_one(key, biases, beta):
+            model, _ = _make_program(graph, biases, beta)
+            return hinton_init(key, model, graph['free_blocks'], ())
+
+        graph['samplers']['init'] = jax.jit(jax.vmap(init_one))
+    return graph['samplers']['init']
+
+
+def make_chain_sampler(graph, schedule, hubs=None, observables=(), capture_states=True):
+    """
+    Un-batched sampler for one chain and one schedule:
+    (key, biases[N], beta, state, carry) -> (observed, state, carry)
+
+    `observed` is a dict of per-sample arrays with leading dim S: the
+    selected observables plus 'spins' (bool) if capture_states. Wrap with
+    jax.vmap / jax.jit (see _get_phase_fn) or embed in a larger scan.
+    """
+    hub_mask = np.zeros(graph['n_nodes'], dtype=bool)
+    if hubs is not None:
+        hub_mask[np.asarray(hubs)] = True
+    all_nodes = [Block(graph['nodes'])]
+    block_indices = [jnp.asarray(idx) for idx in graph['block_indices']]
+
+    def sample_one(key, biases, beta, state, carry):
+        _, program = _make_program(graph, biases, beta)
+        observer = SpinObservables(
+            all_nodes=all_nodes,
+            hub_mask=jnp.asarray(hub_mask),
+            edge_index=jnp.asarray(graph['edge_index']),
+            weights=graph['weights'],
+            biases=biases,
+            observables=tuple(observables),
+            capture_states=capture_states
+        )
+        carry, observed = sample_with_observation(
+            key, program, schedule, state, [], carry, observer
+        )
+        # The observer keeps the last sample - continue the chain from it
+        final_state = [carry['prev'][idx] for idx in block_indices]
+        return observed, final_state, carry
+
+    return sample_one
+
+
+def _get_phase_fn(graph, schedule, hubs=None, observables=(), capture_states=True):
+    """Compiled, batched (vmapped) make_chain_sampler, cached on the graph."""
+    hub_key = None if hubs is None else tuple(int(h) for h in hubs)
+    cache_key = ('phase', schedule.n_warmup, schedule.n_samples, schedule.steps_per_sample,
+                 hub_key, tuple(observables), capture_states)
+    if cache_key not in graph['samplers']:
+        sample_one = make_chain_sampler(graph, schedule, hubs, observables, capture_states)
+        graph['samplers'][cache_key] = jax.jit(jax.vmap(sample_one))
+    return graph['samplers'][cache_key]
+
+
+def init_chains(graph, keys, biases, betas):
+    """Draw hinton_init start states for a batch of chains."""
+    return _get_init_fn(graph)(keys, jnp.asarray(biases), jnp.asarray(betas))
+
+
+def warmup_chains(graph, keys, biases, betas, state=None, chunk=50, max_warmup=1000,
+                  rhat_threshold=1.1, groups=None, verbose=False):
+    """
+    Adaptive warmup: advance B chains in chunks of single sweeps until
+    split-R-hat of |m| and energy is below rhat_threshold in every group
+    of identically configured chains, or max_warmup sweeps have run.
+
+    |m| rather than m is monitored because in zero field the +m and -m
+    states are equivalent, and chains sitting in opposite ones are not
+    a convergence failure.
+
+    Parameters:
+    - keys: (B, 2) PRNG keys
+    - biases: (B, n_nodes) field during warmup
+    - betas: (B,) inverse temperatures
+    - state: optional start state (default: hinton_init)
+    - groups: (B,) configuration labels (default: chains with identical
+      beta and biases form one group)
+
+    Returns (state, info) with info as in mcmc_diagnostics.adaptive_warmup.
+    """
+    biases = np.asarray(biases, dtype=np.float32)
+    betas = np.asarray(betas, dtype=np.float32)
+    keys = jnp.asarray(keys)
+    if state is None:
+        split = jax.vmap(jr.split)(keys)
+        keys, init_keys = split[:, 0], split[:, 1]
+        state = init_chains(graph, init_keys, biases, betas)
+    if groups is None:
+        _, groups = np.unique(np.column_stack([betas, biases]), axis=0, return_inverse=True)
+        groups = groups.ravel()
+
+    chains = {'state': state, 'keys': keys}
+
+    def advance(n_sweeps):
+        split = jax.vmap(jr.split)(chains['keys'])
+        chains['keys'] = split[:, 0]
+        observed, chains['state'], _ = observe_phases(
+            graph, split[:, 1], [n_sweeps], biases[:, None], betas,
+            n_warmup=1, steps_per_sample=1, state=chains['state'],
+            observables=('magnetization', 'energy')
+        )
+        return {'abs_magnetization': np.abs(observed['magnetization']),
+                'energy': observed['energy']}
+
+    info = adaptive_warmup(advance, chunk=chunk, max_warmup=max_warmup,
+                           threshold=rhat_threshold, groups=groups, verbose=verbose)
+    return chains['state'], info
+
+
+def _start_chains(graph, keys, first_biases, betas, n_warmup, steps_per_sample,
+                  state, carry, max_warmup, rhat_threshold):
+    """
+    Shared start of observe_phases / observe_schedule: adaptive warmup if
+    requested, hinton_init states and a fresh observer carry if missing.
+
+    Returns (keys, state, carry, n_warmup, warmup) with n_warmup the fixed
+    sweeps still to run before the first sample.
+    """
+    keys = jnp.asarray(keys)
+    if n_warmup == 'adaptive':
+        split = jax.vmap(jr.split)(keys)
+        keys, warm_keys = split[:, 0], split[:, 1]
+        state, warmup = warmup_chains(
+            graph, warm_keys, first_biases, np.asarray(betas), state=state,
+            max_warmup=max_warmup, rhat_threshold=rhat_threshold
+        )
+        # The first recorded sample is one interval after the warm state
+        n_warmup = steps_per_sample
+        warmup['n_warmup'] += n_warmup
+        if carry is not None:
+            carry = {'prev': initial_carry(graph, state)['prev'], 'sums': carry['sums']}
+    else:
+        warmup = {'n_warmup': n_warmup}
+
+    if state is None:
+        split = jax.vmap(jr.split)(keys)
+        keys, init_keys = split[:, 0], split[:, 1]
+        state = init_chains(graph, init_keys, first_biases, betas)
+    if carry is None:
+        carry = initial_carry(graph, state)
+    return keys, state, carry, n_warmup, warmup
+
+
+def observe_phases(graph, keys, phase_lengths, phase_biases, betas,
+                   n_warmup=50, steps_per_sample=2, state=None, carry=None,
+                   hubs=None, observables=OBSERVABLES, capture_states=False,
+                   max_warmup=1000, rhat_threshold=1.1):
+    """
+    Run B chains through a sequence of constant-bias phases, reducing each
+    sample to the selected observables on device.
+
+    Parameters:
+    - graph: output of build_spin_graph
+    - keys: (B, 2) PRNG keys, one per chain
+    - phase_lengths: samples to record in each phase
+    - phase_biases: (B, n_phases, n_nodes) bias applied during each phase
+    - betas: (B,) inverse temperature per chain
+    - n_warmup: sweeps before the first recorded sample of the first phase,
+      or 'adaptive' to warm up until split-R-hat < rhat_threshold (capped
+      at max_warmup sweeps; see warmup_chains)
+    - steps_per_sample: sweeps between recorded samples
+    - state, carry: optional chain state / observer carry to continue from
+      (default: fresh hinton_init chains)
+    - hubs: node indices for hub vs non-hub magnetization
+    - observables: names from OBSERVABLES to record per sample
+    - capture_states: also return the full +1/-1 spin history
+
+    Later phases start from the final state of the previous phase and
+    advance by one sample interval, so the recorded samples form one
+    evenly spaced Markov chain per batch member. flips[t] counts changes
+    from sample t-1 (or from the start state for t=0).
+
+    Returns:
+    - observed: dict of (B, sum(phase_lengths)) NumPy arrays, one per
+      observable, 'spins' as a (B, n_samples, n_nodes) int8 buffer if
+      capture_states, 'sums' with the running totals per chain and
+      'warmup' with the warmup actually used ('n_warmup', plus 'rhat' and
+      'converged' when adaptive)
+    - state, carry: final chain state and observer carry
+    """
+    phase_biases = np.asarray(phase_biases)
+    betas = jnp.asarray(betas, dtype=jnp.float32)
+    n_chains = phase_biases.shape[0]
+    n_total = sum(phase_lengths)
+
+    keys, state, carry, n_warmup, warmup = _start_chains(
+        graph, keys, phase_biases[:, 0], betas, n_warmup, steps_per_sample,
+        state, carry, max_warmup, rhat_threshold
+    )
+
+    observed = {}
+    if capture_states:
+        observed['spins'] = np.empty((n_chains, n_total, graph['n_nodes']), dtype=np.int8)
+
+    t = 0
+    for p, n_samples in enumerate(phase_lengths):
+        schedule = SamplingSchedule(
+            n_warmup=n_warmup if p == 0 else steps_per_sample,
+            n_samples=n_samples,
+            steps_per_sample=steps_per_sample
+        )
+        split = jax.vmap(jr.split)(keys)
+        keys, phase_keys = split[:, 0], split[:, 1]
+
+        phase_fn = _get_phase_fn(graph, schedule, hubs, observables, capture_states)
+        phase_out, state, carry = phase_fn(
+            phase_keys, jnp.asarray(phase_biases[:, p]), betas, state, carry
+        )
+
+        for name in observables:
+            if name not in observed:
+                observed[name] = np.empty((n_chains, n_total), dtype=phase_out[name].dtype)
+            observed[name][:, t:t + n_samples] = phase_out[name]
+        if capture_states:
+            # bool -> +1/-1 without an int64 intermediate
+            phase_spins = observed['spins'][:, t:t + n_samples]
+            phase_spins[...] = np.asarray(phase_out['spins'])
+            phase_spins *= 2
+            phase_spins -= 1
+        t += n_samples
+        if TIMINGS['first_sample_seconds'] is None:
+            TIMINGS['first_sample_seconds'] = time.perf_counter() - _IMPORT_START
+
+    observed['sums'] = {name: np.asarray(v) for name, v in carry['sums'].items()}
+    observed['warmup'] = warmup
+    return observed, state, carry
+
+
+def _get_schedule_fn(graph, n_steps, n_warmup, steps_per_sample, hubs=None,
+                     observables=(), capture_states=False, shared=False):
+    """
+    Compiled, batched runner for a per-sample bias schedule, cached on the
+    graph: (keys[B], biases[B,T,N] or [T,N] if shared, betas[B], state,
+    carry) -> (observed, state, carry).
+
+    Sample 0 follows n_warmup sweeps, every later sample steps_per_sample
+    sweeps, each under its own bias row; the rows are scanned on device,
+    so a schedule of any shape is one call.
+    """
+    hub_key = None if hubs is None else tuple(int(h) for h in hubs)
+    cache_key = ('schedule', n_steps, n_warmup, steps_per_sample, hub_key,
+                 tuple(observables), capture_states, shared)
+    if cache_key not in graph['samplers']:
+        first = make_chain_sampler(
+            graph, SamplingSchedule(n_warmup=n_warmup, n_samples=1, steps_per_sample=steps_per_sample),
+            hubs, observables, capture_states
+        )
+        step = make_chain_sampler(
+            graph, SamplingSchedule(n_warmup=steps_per_sample, n_samples=1,
+                                    steps_per_sample=steps_per_sample),
+            hubs, observables, capture_states
+        )
+
+        def run_one(key, biases, beta, state, carry):
+            keys = jr.split(key, n_steps)
+            observed, state, carry = first(keys[0], biases[0], beta, state, carry)
+
+            def body(chain, inputs):
+                observed, state, carry = step(inputs[0], inputs[1], beta, *chain)
+                return (state, carry), observed
+
+            (state, carry), rest = jax.lax.scan(body, (state, carry), (keys[1:], biases[1:]))
+            # Each step records one sample: (1, ...) and (T-1, 1, ...) -> (T, ...)
+            observed = jax.tree.map(lambda a, b: jnp.concatenate([a, b[:, 0]]), observed, rest)
+            return observed, state, carry
+
+        in_axes = (0, None if shared else 0, 0, 0, 0)
+        graph['samplers'][cache_key] = jax.jit(jax.vmap(run_one, in_axes=in_axes))
+    return graph['samplers'][cache_key]
+
+
+def observe_schedule(graph, keys, bias_schedule, betas, n_warmup=50, steps_per_sample=2,
+                     state=None, carry=None, hubs=None, observables=OBSERVABLES,
+                     capture_states=False, max_warmup=1000, rhat_threshold=1.1):
+    """
+    Run B chains through a per-sample bias schedule in one compiled scan
+    (see bias_schedules for building schedules).
+
+    Parameters:
+    - bias_schedule: (T, n_nodes) field per recorded sample, shared by all
+      chains, or (B, T, n_nodes) with one schedule per chain
+    - keys, betas, n_warmup, steps_per_sample, state, carry, hubs,
+      observables, capture_states, max_warmup, rhat_threshold: as in
+      observe_phases (adaptive warmup runs under the first bias row)
+
+    Equivalent to observe_phases with T one-sample phases, but without a
+    host round-trip (or a separately compiled sampler) per bias change.
+
+    Returns (observed, state, carry) as observe_phases.
+    """
+    bias_schedule = np.asarray(bias_schedule, dtype=np.float32)
+    shared = bias_schedule.ndim == 2
+    betas = jnp.asarray(betas, dtype=jnp.float32)
+    n_chains = len(betas)
+    n_steps = bias_schedule.shape[-2]
+    first_biases = np.broadcast_to(bias_schedule[..., 0, :], (n_chains, bias_schedule.shape[-1]))
+
+    keys, state, carry, n_warmup, warmup = _start_chains(
+        graph, keys, first_biases, betas, n_warmup, steps_per_sample,
+        state, carry, max_warmup, rhat_threshold
+    )
+
+    split = jax.vmap(jr.split)(keys)
+    run = _get_schedule_fn(graph, n_steps, n_warmup, steps_per_sample, hubs,
+                           observables, capture_states, shared)
+    out, state, carry = run(split[:, 1], jnp.asarray(bias_schedule), betas, state, carry)
+
+    observed = {name: np.asarray(out[name]) for name in observables}
+    if capture_states:
+        # bool -> +1/-1 without an int64 intermediate
+        observed['spins'] = np.asarray(out['spins']).astype(np.int8)
+        observed['spins'] *= 2
+        observed['spins'] -= 1
+    if TIMINGS['first_sample_seconds'] is None:
+        TIMINGS['first_sample_seconds'] = time.perf_counter() - _IMPORT_START
+
+    observed['sums'] = {name: np.asarray(v) for name, v in carry['sums'].items()}
+    observed['warmup'] = warmup
+    return observed, state, carry
+
+
+def sample_phases(graph, keys, phase_lengths, phase_biases, betas,
+                  n_warmup=50, steps_per_sample=2, state=None):
+    """
+    Full-state variant of observe_phases.
+
+    Returns:
+    - spins: (B, sum(phase_lengths), n_nodes) int8 array of +1/-1, filled
+      phase by phase into one preallocated buffer
+    - state: final block state, usable to continue the chains
+    """
+    observed, state, _ = observe_phases(
+        graph, keys, phase_lengths, phase_biases, betas,
+        n_warmup=n_warmup, steps_per_sample=steps_per_sample, state=state,
+        observables=(), capture_states=True
+    )
+    return observed['spins'], state
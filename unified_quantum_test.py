@@ -12,29 +12,55 @@ End-to-end rigorous test combining:
 This is the definitive test. If this works, the mechanism is demonstrated.
 If this fails, we need to understand why.
 
+JAX, THRML and SciPy are imported on first use, so the analysis helpers
+(compute_avalanches, fit_power_law, ...) can be reused without them.
+Compiled samplers persist in the JAX compilation cache (see
+thrml_sampling), so only the first run on a machine pays compilation.
+
+Without THRML the same pipeline runs on the NumPy block Gibbs engine
+(numpy_gibbs, 'backend' in CONFIG); benchmark_backends() times both
+engines on the same network, seeds and schedule, and validate_samplers()
+checks every engine against exact enumeration (exact_ising) on a reduced
+network.
+
+Beyond the square-wave epochs, run_schedule_batch() runs arbitrary
+per-sample bias schedules (ramps, decays, OR-timed pulses; see
+bias_schedules).
+
 Install: pip install thrml jax jaxlib numpy scipy matplotlib pandas
 
 Author: Consciousness Investigation Project
 Date: December 2024
 """
 
-import jax
-import jax.numpy as jnp
-import jax.random as jr
+import time
+
+_IMPORT_START = time.perf_counter()
+
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy import stats
 from datetime import datetime
+import hashlib
+import importlib.util
+import json
 import os
+import zlib
+
+from functools import partial
+
+from cluster_sampler import METHODS as CLUSTER_METHODS
+from ising_graph import watts_strogatz_edges
+from mcmc_diagnostics import (mixing_report, tune_steps_per_sample, adaptive_warmup,
+                              integrated_autocorr_time)
+from numpy_gibbs import resolve_backend, spawn_seeds
+
+# THRML imports are deferred to the samplers; only check they are installed
+THRML_AVAILABLE = all(importlib.util.find_spec(m) is not None for m in ('jax', 'thrml'))
+if not THRML_AVAILABLE:
+    print("WARNING: THRML not available - block Gibbs falls back to the NumPy backend. "
+          "Install with: pip install thrml jax jaxlib")
 
-# THRML imports
-try:
-    from thrml import SpinNode, Block, SamplingSchedule, sample_states
-    from thrml.models import IsingEBM, IsingSamplingProgram, hinton_init
-    THRML_AVAILABLE = True
-except ImportError:
-    print("WARNING: THRML not available. Install with: pip install thrml jax jaxlib")
-    THRML_AVAILABLE = False
+# Seconds to import this module (JAX/THRML excluded, see thrml_sampling.TIMINGS)
+STARTUP_SECONDS = time.perf_counter() - _IMPORT_START
 
 # =============================================================================
 # CONFIGURATION
@@ -45,6 +71,7 @@ CONFIG = {
     'n_nodes': 100,          # Number of neurons
     'k': 6,                   # Connectivity (Watts-Strogatz)
     'p_rewire': 0.1,          # Rewiring probability
+    'legacy_network': True,   # Reproduce the original network (False = batched generator)
     'n_hubs': 10,             # Number of hub nodes to bias (10% of network)
     
     # Epoch structure (matching OR dynamics)
@@ -56,8 +83,24 @@ CONFIG = {
     'quantum_bias': 0.3,      # Bias strength at hub nodes
     
     # Sampling
+    'beta_range': 'screen',   # Initial critical-beta search grid: 'screen' = around the loopy-BP
+                              # estimate (mean_field), None = linspace(0.2, 1.5, 8), or an array
     'n_runs': 40,             # Number of independent runs per condition (increased for statistical power)
-    'n_warmup': 50,           # Warmup samples before each phase
+    'n_warmup': 'adaptive',   # Warmup sweeps at the start of each run (chain is carried after),
+                              # or 'adaptive' = until split-R-hat < rhat_threshold
+    'max_warmup': 1000,       # Cap on adaptive warmup sweeps
+    'rhat_threshold': 1.1,    # Adaptive warmup convergence criterion (1.01 = strict)
+    'steps_per_sample': 2,    # Sweeps between recorded samples ('auto' = tune by ESS per second)
+    'min_ess': 50,            # Runs with magnetization ESS below this are flagged as under-sampled
+    'batch_size': None,       # Chains per vectorized sampling call and checkpoint
+                              # (None = n_runs, one condition per batch)
+    'capture_states': False,  # Return full spin histories (analysis only needs on-device summaries)
+    'sampler': 'gibbs',       # 'gibbs' (block Gibbs) or cluster updates: 'swendsen_wang' / 'wolff'
+    'backend': 'auto',        # Block Gibbs engine: 'thrml', 'numpy' or 'auto' (THRML if installed)
+    'checkpoint_dir': 'data/unified_test/checkpoints',  # Per-run results store for resume (None = off)
+    'critical_cache_dir': 'data/critical_beta_cache',   # Memoised beta_c searches (None = off)
+    'results_store': 'data/results_store',  # Columnar store of summaries + per-sample series
+                                            # (None = CSV summary only)
     
     # Real data target (SIZE-based avalanches, not duration)
     # Duration exponent α ≈ 2.0, Size exponent α ≈ 1.5-1.6 at criticality
@@ -65,44 +108,51 @@ CONFIG = {
     'alpha_tolerance': 0.25,  # Widen tolerance - Ising model may differ slightly
 }
 
+
+def large_network_config(n_nodes=10000, **overrides):
+    """
+    CONFIG for the large-network mode (10^4-10^5 spins).
+    
+    Batched network generator, 10% of nodes as hubs, and only on-device
+    summaries leave the sampler. Sampling cost grows linearly in N (about
+    0.12 us per spin per sweep on CPU); see README for the measured scaling.
+    
+    The critical-beta grid stops at 0.8: above the transition, large
+    networks coarsen too slowly to equilibrate within the warmup cap, and
+    the slow domain dynamics masquerade as a susceptibility peak at the
+    top of the default grid.
+    """
+    config = dict(CONFIG)
+    config.update({
+        'n_nodes': n_nodes,
+        'n_hubs': n_nodes // 10,
+        'legacy_network': False,
+        'capture_states': False,
+        'beta_range': np.linspace(0.2, 0.8, 8),
+    })
+    config.update(overrides)
+    return config
+
+
 # =============================================================================
 # NETWORK CONSTRUCTION
 # =============================================================================
 
-def create_network(n_nodes, k, p):
-    """Create Watts-Strogatz small-world network."""
-    edges = []
-    
-    # Ring lattice
-    for i in range(n_nodes):
-        for j in range(1, k // 2 + 1):
-            target = (i + j) % n_nodes
-            edges.append((i, target))
-    
-    # Rewire
-    key = jr.PRNGKey(42)
-    rewired = []
-    for u, v in edges:
-        key, subkey = jr.split(key)
-        if jr.uniform(subkey) < p:
-            key, subkey = jr.split(key)
-            new_target = int(jr.randint(subkey, (), 0, n_nodes))
-            if new_target != u and (u, new_target) not in rewired:
-                rewired.append((u, new_target))
-            else:
-                rewired.append((u, v))
-        else:
-            rewired.append((u, v))
+def create_network(n_nodes, k, p, legacy=True):
+    """
+    Create Watts-Strogatz small-world network.
     
-    return rewired
+    legacy=True reproduces the original PRNGKey(42) topology (results stay
+    comparable with earlier runs); legacy=False uses the batched generator,
+    which also guarantees a simple graph (see ising_graph.watts_strogatz_edges).
+    """
+    edges = watts_strogatz_edges(n_nodes, k, p, seed=42, legacy=legacy)
+    return list(map(tuple, edges.tolist()))
 
 
 def identify_hubs(edges, n_nodes, n_hubs):
     """Find highest-degree nodes."""
-    degree = np.zeros(n_nodes)
-    for u, v in edges:
-        degree[u] += 1
-        degree[v] += 1
+    degree = np.bincount(np.asarray(edges).ravel(), minlength=n_nodes).astype(float)
     return np.argsort(degree)[-n_hubs:]
 
 
@@ -110,11 +160,338 @@ def identify_hubs(edges, n_nodes, n_hubs):
 # THRML EPOCH-BASED SAMPLING
 # =============================================================================
 
+def build_effect_biases(n_nodes, hubs, n_epochs, bias_strength, bias_mode, seed=None):
+    """
+    Bias vector applied during the effect phase of every epoch.
+    
+    Returns (n_epochs, n_nodes) array. 'mimic' draws a fresh random pattern
+    per epoch from a generator seeded by the run seed, so a run is fully
+    reproducible from its seed.
+    """
+    biases = np.zeros((n_epochs, n_nodes))
+    if bias_mode == 'positive':
+        biases[:, hubs] = bias_strength
+    elif bias_mode == 'negative':
+        biases[:, hubs] = -bias_strength
+    elif bias_mode == 'mimic':
+        # Random bias to all nodes with same total magnitude
+        rng = np.random.default_rng(seed)
+        total_bias = bias_strength * len(hubs)
+        noise = rng.standard_normal((n_epochs, n_nodes))
+        biases = noise / np.abs(noise).sum(axis=1, keepdims=True) * total_bias
+    # 'none' = classical, no bias
+    return biases
+
+
+def epoch_schedule(n_epochs, coherent_samples, effect_samples):
+    """
+    Phase layout of an epoch run as data.
+    
+    Returns (phase_lengths, phase_labels, phase_epochs), one entry per phase:
+    coherent, effect, coherent, effect, ...
+    """
+    phase_lengths = [coherent_samples, effect_samples] * n_epochs
+    phase_labels = ['coherent', 'effect'] * n_epochs
+    phase_epochs = np.repeat(np.arange(n_epochs), 2)
+    return phase_lengths, phase_labels, phase_epochs
+
+
+def _observables_from_spins(spins, edges, hubs, phase_lengths, phase_biases, coupling=0.5):
+    """
+    Host-side version of the on-device observables for samplers that
+    return full spin histories. Same keys and layout as observe_phases.
+    """
+    edge_index = np.asarray(edges).reshape(-1, 2)
+    hub_mask = np.zeros(spins.shape[2], dtype=bool)
+    hub_mask[hubs] = True
+    
+    energy = np.empty(spins.shape[:2])
+    t = 0
+    for p, n_samples in enumerate(phase_lengths):
+        s = spins[:, t:t + n_samples].astype(np.float32)
+        bonds = np.sum(s[:, :, edge_index[:, 0]] * s[:, :, edge_index[:, 1]], axis=2)
+        field = np.einsum('btn,bn->bt', s, phase_biases[:, p])
+        energy[:, t:t + n_samples] = -(coupling * bonds + field)
+        t += n_samples
+    
+    flips = np.zeros(spins.shape[:2], dtype=np.int64)
+    flips[:, 1:] = count_flips(spins)
+    
+    return {
+        'magnetization': spins.mean(axis=2),
+        'hub_magnetization': spins[:, :, hub_mask].mean(axis=2),
+        'nonhub_magnetization': spins[:, :, ~hub_mask].mean(axis=2),
+        'energy': energy,
+        'flips': flips,
+        'spins': spins,
+    }
+
+
+def _host_warmup(n_nodes, edges, hubs, beta, biases, sample_host, seeds,
+                 max_warmup=1000, rhat_threshold=1.1):
+    """
+    Adaptive warmup for the host (NumPy) engines; sample_host has the
+    sample_cluster_phases signature. R-hat is computed within groups of
+    chains with identical warmup biases, as in warmup_gibbs_chains.
+    Returns (spins, info).
+    """
+    rng = np.random.default_rng(seeds)
+    chains = {'spins': None}
+    # All chains share beta, so the biases alone define a configuration
+    _, groups = np.unique(biases, axis=0, return_inverse=True)
+    
+    def advance(n_sweeps):
+        history, chains['spins'] = sample_host(
+            n_nodes, edges, [n_sweeps], biases[:, None], np.full(len(seeds), beta),
+            n_warmup=1, steps_per_sample=1,
+            seed=int(rng.integers(2**31)), spins=chains['spins']
+        )
+        obs = _observables_from_spins(history, edges, hubs, [n_sweeps], biases[:, None])
+        return {'abs_magnetization': np.abs(obs['magnetization']), 'energy': obs['energy']}
+    
+    info = adaptive_warmup(advance, max_warmup=max_warmup, threshold=rhat_threshold,
+                           groups=groups.ravel())
+    return chains['spins'], info
+
+
+def fill_seeds(seeds):
+    """Replace None entries by independent fresh seeds (one per chain)."""
+    fresh = iter(spawn_seeds(sum(s is None for s in seeds)))
+    return [next(fresh) if s is None else s for s in seeds]
+
+
+def run_epoch_batch_thrml(
+    n_nodes, edges, hubs, beta,
+    n_epochs, coherent_samples, effect_samples,
+    bias_strength, bias_modes, seeds,
+    n_warmup=50, steps_per_sample=2, graph=None, capture_states=True,
+    sampler='gibbs', max_warmup=1000, rhat_threshold=1.1, backend='auto'
+):
+    """
+    Run a batch of independent epoch-based runs as one vectorized ensemble.
+    
+    Chain b uses bias_modes[b] and seeds[b] (None entries get independent
+    fresh seeds, see fill_seeds). All chains are advanced together
+    by one vmapped THRML call per phase, and the per-chain bias schedule is
+    passed in as a (B, n_phases, n_nodes) array.
+    
+    Magnetization, hub / non-hub magnetization and flip counts are reduced
+    on device. The full spin history is only transferred back when
+    capture_states is True; the analysis needs just the flip counts.
+    
+    sampler='swendsen_wang' or 'wolff' swaps THRML block Gibbs for the
+    cluster-update engine (see cluster_sampler); steps_per_sample then
+    counts cluster sweeps and the same observables are computed on host.
+    
+    backend selects the block Gibbs engine: 'thrml', 'numpy' (numpy_gibbs,
+    same model and schedule, observables computed on host) or 'auto'.
+    graph, if given, must come from that engine's builder
+    (build_spin_graph / build_gibbs_graph).
+    
+    n_warmup='adaptive' warms all chains up together (the first phase is
+    unbiased, so every chain has the same configuration) until split-R-hat
+    of |m| and energy drops below rhat_threshold, capped at max_warmup
+    sweeps. The warmup used is returned as 'n_warmup_used'.
+    
+    Returns a list of B result dicts in the same format as
+    run_epoch_based_thrml.
+    """
+    backend = resolve_backend(backend)
+    if sampler == 'gibbs' and backend == 'thrml' and not THRML_AVAILABLE:
+        raise RuntimeError("THRML not available (use backend='numpy')")
+    
+    seeds = fill_seeds(seeds)
+    
+    # Schedule as data: zero bias while coherent, effect biases per epoch
+    phase_lengths, phase_labels, phase_epochs = epoch_schedule(
+        n_epochs, coherent_samples, effect_samples
+    )
+    phase_biases = np.zeros((len(seeds), len(phase_lengths), n_nodes))
+    for b, (mode, seed) in enumerate(zip(bias_modes, seeds)):
+        phase_biases[b, 1::2] = build_effect_biases(
+            n_nodes, hubs, n_epochs, bias_strength, mode, seed
+        )
+    
+    observed, n_warmup_used = _observe_batch(
+        n_nodes, edges, hubs, beta, phase_lengths, phase_biases, seeds,
+        n_warmup, steps_per_sample, graph, capture_states, sampler,
+        max_warmup, rhat_threshold, backend
+    )
+    
+    # Labels are identical for every chain - share one copy
+    phases = np.repeat(phase_labels, phase_lengths)
+    epochs = np.repeat(phase_epochs, phase_lengths)
+    return _batch_results(observed, bias_modes, [phases] * len(seeds), [epochs] * len(seeds),
+                          n_warmup_used, capture_states)
+
+
+def _observe_batch(n_nodes, edges, hubs, beta, phase_lengths, phase_biases, seeds,
+                   n_warmup, steps_per_sample, graph, capture_states, sampler,
+                   max_warmup, rhat_threshold, backend, per_sample=False):
+    """
+    Sample a batch on the selected engine. Returns (observed, n_warmup_used)
+    with observed in the observe_phases layout.
+    
+    per_sample=True: phase_biases is a per-sample schedule, (T, N) shared
+    or (B, T, N), and phase_lengths is ignored; THRML runs it as one
+    compiled scan (observe_schedule), the host engines as T one-sample
+    phases.
+    """
+    n_chains = len(seeds)
+    if per_sample:
+        phase_biases = np.asarray(phase_biases, dtype=np.float32)
+        phase_lengths = [1] * phase_biases.shape[-2]
+    
+    if sampler in CLUSTER_METHODS or backend == 'numpy':
+        if per_sample:
+            phase_biases = np.broadcast_to(phase_biases, (n_chains,) + phase_biases.shape[-2:])
+        if sampler in CLUSTER_METHODS:
+            from cluster_sampler import sample_cluster_phases
+            sample_host = partial(sample_cluster_phases, method=sampler)
+        else:
+            from numpy_gibbs import build_gibbs_graph, sample_gibbs_phases
+            if graph is None:
+                graph = build_gibbs_graph(n_nodes, edges)
+            sample_host = partial(sample_gibbs_phases, graph=graph)
+        
+        start_spins = None
+        n_warmup_used = n_warmup
+        if n_warmup == 'adaptive':
+            start_spins, warmup = _host_warmup(
+                n_nodes, edges, hubs, beta, phase_biases[:, 0], sample_host, seeds,
+                max_warmup, rhat_threshold
+            )
+            n_warmup, n_warmup_used = steps_per_sample, warmup['n_warmup'] + steps_per_sample
+        spins, _ = sample_host(
+            n_nodes, edges, phase_lengths, phase_biases,
+            betas=np.full(len(seeds), beta),
+            n_warmup=n_warmup, steps_per_sample=steps_per_sample,
+            seed=seeds, spins=start_spins
+        )
+        observed = _observables_from_spins(spins, edges, hubs, phase_lengths, phase_biases)
+        return observed, n_warmup_used
+    
+    import jax.numpy as jnp
+    import jax.random as jr
+    from thrml_sampling import build_spin_graph, observe_phases, observe_schedule
+    
+    if graph is None:
+        graph = build_spin_graph(n_nodes, edges)
+    keys = jnp.stack([jr.PRNGKey(s) for s in seeds])
+    if per_sample:
+        observed, _, _ = observe_schedule(
+            graph, keys, phase_biases, betas=np.full(n_chains, beta),
+            n_warmup=n_warmup, steps_per_sample=steps_per_sample,
+            hubs=hubs, capture_states=capture_states,
+            max_warmup=max_warmup, rhat_threshold=rhat_threshold
+        )
+    else:
+        observed, _, _ = observe_phases(
+            graph, keys, phase_lengths, phase_biases,
+            betas=np.full(n_chains, beta),
+            n_warmup=n_warmup, steps_per_sample=steps_per_sample,
+            hubs=hubs, capture_states=capture_states,
+            max_warmup=max_warmup, rhat_threshold=rhat_threshold
+        )
+    return observed, observed['warmup']['n_warmup']
+
+
+def _batch_results(observed, bias_modes, phases, epochs, n_warmup_used, capture_states):
+    """Split batched observables into per-run result dicts."""
+    results = []
+    for b, mode in enumerate(bias_modes):
+        result = {
+            'magnetizations': observed['magnetization'][b],
+            'hub_magnetizations': observed['hub_magnetization'][b],
+            'nonhub_magnetizations': observed['nonhub_magnetization'][b],
+            'energies': observed['energy'][b],
+            # flips[0] is relative to the start state, not a recorded sample
+            'flip_counts': observed['flips'][b, 1:],
+            'phases': phases[b],
+            'epochs': epochs[b],
+            'bias_mode': mode,
+            'n_warmup_used': n_warmup_used,
+        }
+        if capture_states:
+            # View into one (B, n_samples, n_nodes) int8 buffer, not a copy
+            result['spin_history'] = observed['spins'][b]
+        results.append(result)
+    
+    return results
+
+
+def or_pulse_schedules(n_nodes, hubs, n_steps, bias_strength, bias_modes, seeds, **pulse_kwargs):
+    """
+    One stochastic OR-timed pulse schedule per chain (bias_schedules.or_pulses).
+    
+    The pulse pattern follows bias_mode as in build_effect_biases
+    ('positive' / 'negative' hubs, 'mimic' a random pattern of the same
+    total magnitude, 'none' no field); pulse timings are drawn from the
+    chain's seed. pulse_kwargs go to or_pulses (n_tubulins, spread,
+    sample_dt, pulse_samples, pulse, tau).
+    """
+    from bias_schedules import build_schedule, or_pulses
+    
+    return [
+        build_schedule(
+            or_pulses(build_effect_biases(n_nodes, hubs, 1, bias_strength, mode, seed)[0],
+                      seed=seed, **pulse_kwargs),
+            n_nodes, n_steps=n_steps
+        )
+        for mode, seed in zip(bias_modes, seeds)
+    ]
+
+
+def run_schedule_batch(
+    n_nodes, edges, hubs, beta, schedules, seeds, labels=None,
+    n_warmup=50, steps_per_sample=2, graph=None, capture_states=True,
+    sampler='gibbs', max_warmup=1000, rhat_threshold=1.1, backend='auto'
+):
+    """
+    Run a batch of chains through programmable per-sample bias schedules.
+    
+    schedules: one bias_schedules.build_schedule output shared by every
+    chain, or a list with one per chain (all of the same length). Ramps,
+    decays and stochastic pulses (see or_pulse_schedules) all run as one
+    compiled scan on THRML (thrml_sampling.observe_schedule); the host
+    engines apply the rows sample by sample.
+    
+    labels: optional per-chain label stored as 'bias_mode' (default
+    'schedule'). The other parameters are as in run_epoch_batch_thrml.
+    
+    Returns a list of B result dicts in the run_epoch_batch_thrml format,
+    with each chain's schedule phases and epochs, so analyze_run applies
+    unchanged.
+    """
+    backend = resolve_backend(backend)
+    if sampler == 'gibbs' and backend == 'thrml' and not THRML_AVAILABLE:
+        raise RuntimeError("THRML not available (use backend='numpy')")
+    
+    seeds = fill_seeds(seeds)
+    if isinstance(schedules, dict):
+        biases = schedules['biases']
+        schedules = [schedules] * len(seeds)
+    else:
+        biases = np.stack([sch['biases'] for sch in schedules])
+    
+    observed, n_warmup_used = _observe_batch(
+        n_nodes, edges, hubs, beta, None, biases, seeds,
+        n_warmup, steps_per_sample, graph, capture_states, sampler,
+        max_warmup, rhat_threshold, backend, per_sample=True
+    )
+    return _batch_results(
+        observed, labels if labels is not None else ['schedule'] * len(seeds),
+        [sch['phases'] for sch in schedules], [sch['epochs'] for sch in schedules],
+        n_warmup_used, capture_states
+    )
+
+
 def run_epoch_based_thrml(
     n_nodes, edges, hubs, beta,
     n_epochs, coherent_samples, effect_samples,
     bias_strength, bias_mode='none',
-    n_warmup=50, seed=None
+    n_warmup=50, seed=None, steps_per_sample=2, capture_states=True,
+    sampler='gibbs', max_warmup=1000, rhat_threshold=1.1, backend='auto'
 ):
     """
     Run THRML with epoch-based pulsed bias.
@@ -124,152 +501,75 @@ def run_epoch_based_thrml(
     2. COLLAPSE EVENT: Transition point
     3. EFFECT PHASE: Bias pulse applied (OR collapse effect)
     
+    The spin state is carried from each phase into the next, so the whole
+    run is one continuous Markov chain and `n_warmup` is paid only once.
+    Single-run wrapper around run_epoch_batch_thrml.
+    
     Returns magnetization time series and phase labels.
     """
-    if not THRML_AVAILABLE:
-        raise RuntimeError("THRML not available")
-    
-    # Create nodes
-    nodes = [SpinNode() for _ in range(n_nodes)]
-    edge_pairs = [(nodes[i], nodes[j]) for i, j in edges]
-    weights = jnp.ones(len(edges)) * 0.5
-    
-    # Key for randomness
-    if seed is None:
-        seed = int(datetime.now().timestamp() * 1000) % 2**31
-    key = jr.PRNGKey(seed)
-    
-    # Storage
-    all_magnetizations = []
-    all_phases = []
-    all_epoch_labels = []
-    all_spin_history = []
-    
-    # Two-color blocks for Gibbs sampling
-    even_nodes = [nodes[i] for i in range(0, n_nodes, 2)]
-    odd_nodes = [nodes[i] for i in range(1, n_nodes, 2)]
-    free_blocks = [Block(even_nodes), Block(odd_nodes)]
-    
-    for epoch in range(n_epochs):
-        # =================================================================
-        # COHERENT PHASE: No bias
-        # =================================================================
-        biases_coherent = np.zeros(n_nodes)
-        
-        model = IsingEBM(
-            nodes=nodes,
-            edges=edge_pairs,
-            biases=jnp.array(biases_coherent),
-            weights=weights,
-            beta=jnp.array(beta)
-        )
-        
-        program = IsingSamplingProgram(model, free_blocks, clamped_blocks=[])
-        
-        key, k_init, k_samp = jr.split(key, 3)
-        init_state = hinton_init(k_init, model, free_blocks, ())
-        
-        schedule = SamplingSchedule(
-            n_warmup=n_warmup if epoch == 0 else 5,  # Less warmup after first epoch
-            n_samples=coherent_samples,
-            steps_per_sample=2
-        )
-        
-        samples = sample_states(k_samp, program, schedule, init_state, [], [Block(nodes)])
-        samples_array = np.array(samples[0])
-        spins = np.where(samples_array, 1, -1)
-        
-        # Record magnetizations and spin history
-        mags = np.mean(spins, axis=1)
-        all_magnetizations.extend(mags.tolist())
-        all_phases.extend(['coherent'] * len(mags))
-        all_epoch_labels.extend([epoch] * len(mags))
-        all_spin_history.extend([s.copy() for s in spins])
-        
-        # =================================================================
-        # EFFECT PHASE: Bias applied (OR collapse effect)
-        # =================================================================
-        biases_effect = np.zeros(n_nodes)
-        if bias_mode == 'positive':
-            biases_effect[hubs] = bias_strength
-        elif bias_mode == 'negative':
-            biases_effect[hubs] = -bias_strength
-        elif bias_mode == 'mimic':
-            # Random bias to all nodes with same total magnitude
-            total_bias = bias_strength * len(hubs)
-            biases_effect = np.random.randn(n_nodes)
-            biases_effect = biases_effect / np.abs(biases_effect).sum() * total_bias
-        # 'none' = classical, no bias
-        
-        model = IsingEBM(
-            nodes=nodes,
-            edges=edge_pairs,
-            biases=jnp.array(biases_effect),
-            weights=weights,
-            beta=jnp.array(beta)
-        )
-        
-        program = IsingSamplingProgram(model, free_blocks, clamped_blocks=[])
-        
-        key, k_init, k_samp = jr.split(key, 3)
-        # Use last state from coherent phase as init
-        init_state = hinton_init(k_init, model, free_blocks, ())
-        
-        schedule = SamplingSchedule(
-            n_warmup=5,  # Short warmup - we want to see immediate effect
-            n_samples=effect_samples,
-            steps_per_sample=2
-        )
-        
-        samples = sample_states(k_samp, program, schedule, init_state, [], [Block(nodes)])
-        samples_array = np.array(samples[0])
-        spins = np.where(samples_array, 1, -1)
-        
-        # Record magnetizations and spin history
-        mags = np.mean(spins, axis=1)
-        all_magnetizations.extend(mags.tolist())
-        all_phases.extend(['effect'] * len(mags))
-        all_epoch_labels.extend([epoch] * len(mags))
-        all_spin_history.extend([s.copy() for s in spins])
-    
-    return {
-        'magnetizations': np.array(all_magnetizations),
-        'phases': np.array(all_phases),
-        'epochs': np.array(all_epoch_labels),
-        'bias_mode': bias_mode,
-        'spin_history': all_spin_history
-    }
+    return run_epoch_batch_thrml(
+        n_nodes, edges, hubs, beta,
+        n_epochs, coherent_samples, effect_samples,
+        bias_strength, bias_modes=[bias_mode], seeds=[seed],
+        n_warmup=n_warmup, steps_per_sample=steps_per_sample,
+        capture_states=capture_states, sampler=sampler,
+        max_warmup=max_warmup, rhat_threshold=rhat_threshold, backend=backend
+    )[0]
 
 
 # =============================================================================
 # ANALYSIS
 # =============================================================================
 
+def _burst_sums(active, values):
+    """
+    Sum `values` over each contiguous run of True in `active`.
+    Returns one entry per run, in time order.
+    """
+    edges = np.diff(np.concatenate(([False], active, [False])).astype(np.int8))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    if len(starts) == 0:
+        return np.array([], dtype=np.asarray(values).dtype)
+    cumsum = np.concatenate(([0], np.cumsum(values)))
+    return cumsum[ends] - cumsum[starts]
+
+
 def compute_avalanches_duration(magnetizations, threshold=0.1):
     """
     Duration-based avalanches: count time steps where |mag| > threshold.
     Expected α ≈ 2.0 at criticality (duration exponent).
     """
     high_activity = np.abs(magnetizations) > threshold
+    return _burst_sums(high_activity, np.ones(len(high_activity), dtype=np.int64))
+
+
+def count_flips(spin_history):
+    """
+    Number of spins that changed between consecutive samples.
     
-    avalanches = []
-    current = 0
-    in_avalanche = False
-    
-    for active in high_activity:
-        if active:
-            in_avalanche = True
-            current += 1
-        else:
-            if in_avalanche:
-                avalanches.append(current)
-                current = 0
-                in_avalanche = False
+    spin_history: (..., n_samples, n_nodes) array of +1/-1 (or list of rows)
+    """
+    history = np.asarray(spin_history)
+    return np.count_nonzero(history[..., 1:, :] != history[..., :-1, :], axis=-1)
+
+
+def compute_avalanches_from_flips(flip_counts, threshold=0.1):
+    """
+    Size-based avalanches from per-step flip counts.
+    A burst is a run of steps with above-average flipping; its size is the
+    total number of flips during the run.
+    """
+    flip_counts = np.asarray(flip_counts)
+    if len(flip_counts) == 0:
+        return np.array([])
     
-    if in_avalanche:
-        avalanches.append(current)
+    # High activity = above-average flipping
+    mean_flips = np.mean(flip_counts)
+    high_activity = flip_counts > (mean_flips * (1 + threshold))
     
-    return np.array(avalanches)
+    # Collapse into contiguous avalanches (sum of flips during burst)
+    return _burst_sums(high_activity, flip_counts)
 
 
 def compute_avalanches_size(spin_history, threshold=0.1):
@@ -278,50 +578,24 @@ def compute_avalanches_size(spin_history, threshold=0.1):
     This matches hc-3 neural data (spike counts per burst).
     Expected α ≈ 1.5-1.6 at criticality (size exponent).
     
-    spin_history: list of spin configurations (each is array of +1/-1)
+    spin_history: (n_samples, n_nodes) array of +1/-1 (or list of rows)
     """
     if len(spin_history) < 2:
         return np.array([])
     
     # Count flips between consecutive configurations
-    flip_counts = []
-    for i in range(1, len(spin_history)):
-        flips = np.sum(spin_history[i] != spin_history[i-1])
-        flip_counts.append(flips)
-    
-    flip_counts = np.array(flip_counts)
-    
-    # High activity = above-average flipping
-    mean_flips = np.mean(flip_counts)
-    high_activity = flip_counts > (mean_flips * (1 + threshold))
-    
-    # Collapse into contiguous avalanches (sum of flips during burst)
-    avalanches = []
-    current_size = 0
-    in_avalanche = False
-    
-    for i, active in enumerate(high_activity):
-        if active:
-            in_avalanche = True
-            current_size += flip_counts[i]
-        else:
-            if in_avalanche:
-                avalanches.append(current_size)
-                current_size = 0
-                in_avalanche = False
-    
-    if in_avalanche:
-        avalanches.append(current_size)
-    
-    return np.array(avalanches)
+    return compute_avalanches_from_flips(count_flips(spin_history), threshold)
 
 
-def compute_avalanches(magnetizations, threshold=0.1, spin_history=None):
+def compute_avalanches(magnetizations, threshold=0.1, spin_history=None, flip_counts=None):
     """
     Wrapper that computes both duration and size-based avalanches.
-    Returns size-based if spin_history available, else duration-based.
+    Returns size-based if flip counts or spin_history are available,
+    else duration-based.
     """
-    if spin_history is not None and len(spin_history) > 1:
+    if flip_counts is not None and len(flip_counts) > 0:
+        return compute_avalanches_from_flips(flip_counts, threshold)
+    elif spin_history is not None and len(spin_history) > 1:
         return compute_avalanches_size(spin_history, threshold)
     else:
         return compute_avalanches_duration(magnetizations, threshold)
@@ -370,9 +644,10 @@ def analyze_run(result):
     mags = result['magnetizations']
     phases = result['phases']
     spin_history = result.get('spin_history', None)
+    flip_counts = result.get('flip_counts', None)
     
-    # Avalanche analysis - use size-based if spin_history available
-    avalanches = compute_avalanches(mags, spin_history=spin_history)
+    # Avalanche analysis - use size-based if flips / spin_history available
+    avalanches = compute_avalanches(mags, spin_history=spin_history, flip_counts=flip_counts)
     alpha, alpha_err = fit_power_law(avalanches)
     
     # Phase-separated entropy
@@ -382,6 +657,12 @@ def analyze_run(result):
     coherent_entropy = compute_sample_entropy(mags[coherent_mask][:50]) if coherent_mask.sum() > 50 else np.nan
     effect_entropy = compute_sample_entropy(mags[effect_mask][:50]) if effect_mask.sum() > 50 else np.nan
     
+    # Sampling quality: autocorrelation time / ESS of the recorded series
+    series = {'mag': mags}
+    if result.get('energies') is not None:
+        series['energy'] = result['energies']
+    mixing = mixing_report(series)
+    
     # Magnetization statistics
     return {
         'mean_mag': np.mean(mags),
@@ -394,7 +675,9 @@ def analyze_run(result):
         'effect_entropy': effect_entropy,
         'entropy_change': effect_entropy - coherent_entropy if not (np.isnan(effect_entropy) or np.isnan(coherent_entropy)) else np.nan,
         'n_avalanches': len(avalanches),
-        'mean_avalanche': np.mean(avalanches) if len(avalanches) > 0 else 0
+        'n_warmup_used': result.get('n_warmup_used', np.nan),
+        'mean_avalanche': np.mean(avalanches) if len(avalanches) > 0 else 0,
+        **mixing
     }
 
 
@@ -402,74 +685,206 @@ def analyze_run(result):
 # FIND CRITICAL TEMPERATURE
 # =============================================================================
 
-def find_critical_beta(n_nodes, edges, beta_range=None):
-    """Find critical temperature via susceptibility maximum."""
-    if not THRML_AVAILABLE:
+def find_critical_beta(n_nodes, edges, beta_range=None, cache_dir=None, backend='auto'):
+    """
+    Find critical temperature via susceptibility maximum.
+    
+    All grid betas are sampled in one batched call, then the grid is zoomed
+    in around the peak (see critical_search.search_critical_beta). With
+    cache_dir, results are memoised per (network, grid, schedule).
+    """
+    backend = resolve_backend(backend)
+    if backend == 'thrml' and not THRML_AVAILABLE:
         print("THRML not available - using default beta=0.52")
         return 0.52
+    from critical_search import search_critical_beta
     
     if beta_range is None:
         beta_range = np.linspace(0.2, 1.5, 8)
     
     print("Finding critical temperature...")
+    search = search_critical_beta(n_nodes, edges, beta_range=beta_range, seed=42,
+                                  cache_dir=cache_dir, backend=backend)
     
-    nodes = [SpinNode() for _ in range(n_nodes)]
-    edge_pairs = [(nodes[i], nodes[j]) for i, j in edges]
-    weights = jnp.ones(len(edges)) * 0.5
-    
-    even_nodes = [nodes[i] for i in range(0, n_nodes, 2)]
-    odd_nodes = [nodes[i] for i in range(1, n_nodes, 2)]
-    free_blocks = [Block(even_nodes), Block(odd_nodes)]
-    
-    susceptibilities = []
-    
-    for beta in beta_range:
-        biases = np.zeros(n_nodes)
-        
-        model = IsingEBM(
-            nodes=nodes,
-            edges=edge_pairs,
-            biases=jnp.array(biases),
-            weights=weights,
-            beta=jnp.array(beta)
-        )
-        
-        program = IsingSamplingProgram(model, free_blocks, clamped_blocks=[])
-        
-        key = jr.PRNGKey(42)
-        k_init, k_samp = jr.split(key)
-        init_state = hinton_init(k_init, model, free_blocks, ())
-        
-        schedule = SamplingSchedule(n_warmup=100, n_samples=200, steps_per_sample=2)
-        samples = sample_states(k_samp, program, schedule, init_state, [], [Block(nodes)])
-        
-        samples_array = np.array(samples[0])
-        spins = np.where(samples_array, 1, -1)
-        mag = np.mean(spins, axis=1)
-        
-        chi = np.var(mag) * n_nodes
-        susceptibilities.append(chi)
-        print(f"  beta={beta:.2f}: chi={chi:.4f}")
-    
-    critical_idx = np.argmax(susceptibilities)
-    critical_beta = beta_range[critical_idx]
-    print(f"Critical beta: {critical_beta:.2f}")
+    return search['critical_beta']
+
+
+# =============================================================================
+# CHECKPOINTING
+# =============================================================================
+
+# Keys that only affect evaluation/reporting, not the sampled runs
+_CHECKPOINT_IGNORED = ('checkpoint_dir', 'critical_cache_dir', 'results_store', 'target_alpha',
+                       'alpha_tolerance', 'min_ess')
+
+
+def _json_value(v):
+    """NumPy scalars/arrays -> plain JSON types (floats round-trip exactly)."""
+    if isinstance(v, np.ndarray):
+        return v.tolist()
+    if isinstance(v, np.generic):
+        return v.item()
+    return v
+
+
+def config_hash(config):
+    """Stable hash of every config entry that affects the sampled runs."""
+    relevant = {k: v for k, v in config.items() if k not in _CHECKPOINT_IGNORED}
+    blob = json.dumps(relevant, sort_keys=True, default=_json_value)
+    return hashlib.sha256(blob.encode()).hexdigest()[:16]
+
+
+def run_seed(cond, run):
+    """Per-run seed, stable across processes (unlike the salted hash())."""
+    return run * 1000 + zlib.crc32(cond.encode()) % 1000
+
+
+def load_checkpoint(path):
+    """
+    Read a checkpoint store.
     
-    return critical_beta
+    Returns (runs, meta): runs maps (condition, seed) -> analysis dict,
+    meta holds run-level values such as 'critical_beta'. A truncated last
+    line (crash mid-write) is ignored.
+    """
+    runs, meta = {}, {}
+    if not os.path.exists(path):
+        return runs, meta
+    with open(path) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record['kind'] == 'run':
+                runs[(record['condition'], record['seed'])] = record['analysis']
+            else:
+                meta[record['kind']] = record['value']
+    return runs, meta
+
+
+def append_checkpoint(path, records):
+    """Append records as JSON lines and fsync, so they survive a crash."""
+    # Start on a fresh line if a previous write was torn
+    torn = False
+    if os.path.exists(path) and os.path.getsize(path) > 0:
+        with open(path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            torn = f.read(1) != b"\n"
+    with open(path, 'a') as f:
+        if torn:
+            f.write("\n")
+        for record in records:
+            f.write(json.dumps(record, default=_json_value) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+# =============================================================================
+# RESULT STORE
+# =============================================================================
+
+def store_batch(root, experiment_id, key, runs):
+    """
+    Bulk-write one sampled batch to the result store ('samples' table).
+    
+    Parameters:
+    - root: store directory (see result_store)
+    - experiment_id, key: experiment ID and config hash of the test
+    - runs: list of ((condition, run, seed), result) pairs
+    
+    One row per run: condition, run, seed, and ragged per-sample
+    magnetization, hub_magnetization, energy and flip_count series plus the
+    run's avalanche sizes (as analysed by analyze_run). The epoch schedule
+    (phase, epoch) is identical for every run, so it is written once per
+    experiment, as the 'schedule' table.
+    """
+    from result_store import read_index, write_table
+    
+    if not runs:
+        return
+    results = [result for _, result in runs]
+    columns = {
+        'condition': [cond for (cond, _, _), _ in runs],
+        'run': np.array([run for (_, run, _), _ in runs], dtype=np.int32),
+        'seed': np.array([seed for (_, _, seed), _ in runs], dtype=np.int64),
+        'n_warmup_used': np.array([r['n_warmup_used'] for r in results], dtype=np.int64),
+        'magnetization': [r['magnetizations'] for r in results],
+        'hub_magnetization': [r['hub_magnetizations'] for r in results],
+        'avalanche_sizes': [compute_avalanches(r['magnetizations'],
+                                               spin_history=r.get('spin_history'),
+                                               flip_counts=r.get('flip_counts'))
+                            for r in results],
+    }
+    if all(r.get('energies') is not None for r in results):
+        columns['energy'] = [r['energies'] for r in results]
+    if all(r.get('flip_counts') is not None for r in results):
+        columns['flip_count'] = [r['flip_counts'] for r in results]
+    write_table(root, experiment_id, 'samples', columns, config_hash=key,
+                ragged=('magnetization', 'hub_magnetization', 'avalanche_sizes', 'energy',
+                        'flip_count'))
+    
+    if not read_index(root, experiment_id, table='schedule'):
+        write_table(root, experiment_id, 'schedule',
+                    {'phase': results[0]['phases'], 'epoch': results[0]['epochs']},
+                    config_hash=key)
 
 
 # =============================================================================
 # MAIN EXPERIMENT
 # =============================================================================
 
+def tune_thinning(config, edges, hubs, beta, graph=None, n_chains=8, n_pilot=200):
+    """
+    Choose steps_per_sample from short unbiased pilot runs at beta.
+    
+    Each candidate is scored by magnetization ESS per wall-clock second
+    (see mcmc_diagnostics.tune_steps_per_sample).
+    """
+    def run_pilot(steps_per_sample, n_samples):
+        pilot = run_epoch_batch_thrml(
+            config['n_nodes'], edges, hubs, beta,
+            n_epochs=1, coherent_samples=n_samples, effect_samples=1,
+            bias_strength=0.0, bias_modes=['none'] * n_chains,
+            seeds=list(range(n_chains)),
+            n_warmup=50 if config['n_warmup'] == 'adaptive' else config['n_warmup'],
+            steps_per_sample=steps_per_sample,
+            graph=graph, capture_states=False,
+            sampler=config.get('sampler', 'gibbs'), backend=config.get('backend', 'auto')
+        )
+        return np.array([r['magnetizations'] for r in pilot])
+    
+    print("Tuning steps_per_sample...")
+    tuned = tune_steps_per_sample(run_pilot, n_pilot=n_pilot)
+    print(f"Using steps_per_sample={tuned['steps_per_sample']} "
+          f"(tau={tuned['tau']:.1f} samples, {tuned['ess_per_second']:.0f} ESS/s)")
+    return tuned['steps_per_sample']
+
+
 def run_unified_test(config=None):
-    """Run the complete unified test."""
+    """
+    Run the complete unified test.
+    
+    With config['checkpoint_dir'] set, beta_c, the tuned thinning and every
+    run's analysis are appended to <checkpoint_dir>/<config hash>.jsonl as
+    soon as they are known. A restarted test with the same config reuses
+    them and only samples the missing runs. A batch with any missing run is
+    re-sampled whole, so resumed results are identical to an uninterrupted
+    run's (the adaptive warmup depends on the whole batch).
+    
+    With config['results_store'] set, every sampled batch's per-sample
+    series are written to the columnar store (see store_batch) under one
+    experiment ID, which a resumed test reuses.
+    """
     if config is None:
         config = CONFIG
     
-    if not THRML_AVAILABLE:
-        print("ERROR: THRML required for unified test")
-        print("Install with: pip install thrml jax jaxlib")
+    # Resolved before hashing, so 'auto' checkpoints do not mix engines
+    backend = resolve_backend(config.get('backend', 'auto'))
+    config = {**config, 'backend': backend}
+    if backend == 'thrml' and not THRML_AVAILABLE:
+        print("ERROR: THRML required for backend='thrml'")
+        print("Install with: pip install thrml jax jaxlib, or use backend='numpy'")
         return None
     
     print("="*70)
@@ -479,20 +894,48 @@ def run_unified_test(config=None):
     for k, v in config.items():
         print(f"  {k}: {v}")
     
+    checkpoint_path = None
+    done, meta = {}, {}
+    if config.get('checkpoint_dir'):
+        os.makedirs(config['checkpoint_dir'], exist_ok=True)
+        key = config_hash(config)
+        checkpoint_path = os.path.join(config['checkpoint_dir'], f"{key}.jsonl")
+        done, meta = load_checkpoint(checkpoint_path)
+        print(f"\nCheckpoint: {checkpoint_path} ({len(done)} runs stored)")
+    
+    store = config.get('results_store')
+    experiment_id = meta.get('experiment_id')
+    if experiment_id is None:
+        from result_store import new_experiment_id
+        experiment_id = new_experiment_id('unified_test')
+        if checkpoint_path:
+            append_checkpoint(checkpoint_path, [{'kind': 'experiment_id', 'value': experiment_id}])
+    if store:
+        print(f"Results store: {store} (experiment {experiment_id})")
+    
     # Create network
     print("\n" + "-"*70)
     print("STEP 1: Network Construction")
     print("-"*70)
-    edges = create_network(config['n_nodes'], config['k'], config['p_rewire'])
+    edges = create_network(config['n_nodes'], config['k'], config['p_rewire'],
+                           legacy=config.get('legacy_network', True))
     hubs = identify_hubs(edges, config['n_nodes'], config['n_hubs'])
     print(f"Network: {config['n_nodes']} nodes, {len(edges)} edges")
-    print(f"Hub nodes: {list(hubs)}")
+    print(f"Hub nodes: {list(hubs) if len(hubs) <= 20 else f'{len(hubs)} highest-degree nodes'}")
     
     # Find critical temperature
     print("\n" + "-"*70)
     print("STEP 2: Find Critical Temperature")
     print("-"*70)
-    critical_beta = find_critical_beta(config['n_nodes'], edges)
+    if 'critical_beta' in meta:
+        critical_beta = meta['critical_beta']
+        print(f"Reusing stored critical beta: {critical_beta:.4f}")
+    else:
+        critical_beta = find_critical_beta(config['n_nodes'], edges, config.get('beta_range'),
+                                           cache_dir=config.get('critical_cache_dir'),
+                                           backend=backend)
+        if checkpoint_path:
+            append_checkpoint(checkpoint_path, [{'kind': 'critical_beta', 'value': critical_beta}])
     
     # Run all conditions
     print("\n" + "-"*70)
@@ -500,46 +943,111 @@ def run_unified_test(config=None):
     print("-"*70)
     
     conditions = ['none', 'positive', 'negative', 'mimic']
+    labels = {'none': 'Classical', 'positive': 'Q(+)',
+              'negative': 'Q(-)', 'mimic': 'Mimic'}
     results = {c: [] for c in conditions}
     
-    for cond in conditions:
-        label = {'none': 'Classical', 'positive': 'Q(+)', 
-                 'negative': 'Q(-)', 'mimic': 'Mimic'}[cond]
-        print(f"\n  Running {label}...")
+    # Every (condition, run) pair is an independent chain; sample them in
+    # vectorized batches instead of n_conditions x n_runs tiny jobs
+    jobs = [(cond, run, run_seed(cond, run))
+            for cond in conditions for run in range(config['n_runs'])]
+    # Bounded batches, so the checkpoint advances during a long run
+    batch_size = config.get('batch_size') or config['n_runs']
+    if backend == 'thrml':
+        from thrml_sampling import build_spin_graph
+        graph = build_spin_graph(config['n_nodes'], edges)
+    else:
+        from numpy_gibbs import build_gibbs_graph
+        graph = build_gibbs_graph(config['n_nodes'], edges)
+    
+    steps_per_sample = config.get('steps_per_sample', 2)
+    if steps_per_sample == 'auto':
+        if 'steps_per_sample' in meta:
+            steps_per_sample = meta['steps_per_sample']
+        else:
+            steps_per_sample = tune_thinning(config, edges, hubs, critical_beta, graph)
+            if checkpoint_path:
+                append_checkpoint(checkpoint_path, [{'kind': 'steps_per_sample',
+                                                     'value': steps_per_sample}])
+    
+    for start in range(0, len(jobs), batch_size):
+        batch = jobs[start:start + batch_size]
+        if all((cond, seed) in done for cond, _, seed in batch):
+            print(f"  Chains {start+1}-{start+len(batch)} of {len(jobs)}: restored from checkpoint")
+            continue
+        print(f"  Sampling chains {start+1}-{start+len(batch)} of {len(jobs)}...")
         
-        for run in range(config['n_runs']):
-            print(f"    Run {run+1}/{config['n_runs']}", end='\r')
-            
-            result = run_epoch_based_thrml(
-                n_nodes=config['n_nodes'],
-                edges=edges,
-                hubs=hubs,
-                beta=critical_beta,
-                n_epochs=config['n_epochs'],
-                coherent_samples=config['coherent_samples'],
-                effect_samples=config['effect_samples'],
-                bias_strength=config['quantum_bias'],
-                bias_mode=cond,
-                n_warmup=config['n_warmup'],
-                seed=run * 1000 + hash(cond) % 1000
-            )
-            
-            analysis = analyze_run(result)
-            results[cond].append(analysis)
+        batch_results = run_epoch_batch_thrml(
+            n_nodes=config['n_nodes'],
+            edges=edges,
+            hubs=hubs,
+            beta=critical_beta,
+            n_epochs=config['n_epochs'],
+            coherent_samples=config['coherent_samples'],
+            effect_samples=config['effect_samples'],
+            bias_strength=config['quantum_bias'],
+            bias_modes=[cond for cond, _, _ in batch],
+            seeds=[seed for _, _, seed in batch],
+            n_warmup=config['n_warmup'],
+            max_warmup=config.get('max_warmup', 1000),
+            rhat_threshold=config.get('rhat_threshold', 1.1),
+            steps_per_sample=steps_per_sample,
+            graph=graph,
+            capture_states=config.get('capture_states', False),
+            sampler=config.get('sampler', 'gibbs'),
+            backend=backend
+        )
         
-        print(f"    {label}: Done" + " " * 20)
+        print(f"    Warmup used: {batch_results[0]['n_warmup_used']} sweeps")
+        fresh = [(job, result) for job, result in zip(batch, batch_results)
+                 if (job[0], job[2]) not in done]
+        # Store first: a crash before the checkpoint line re-samples (and
+        # re-stores) this batch, it never leaves analysed runs unstored
+        if store:
+            store_batch(store, experiment_id, config_hash(config), fresh)
+        # Plain-JSON values, so fresh and restored runs are indistinguishable
+        records = [{'kind': 'run', 'condition': cond, 'seed': seed,
+                    'analysis': {k: _json_value(v) for k, v in analyze_run(result).items()}}
+                   for (cond, _, seed), result in fresh]
+        if checkpoint_path:
+            append_checkpoint(checkpoint_path, records)
+        done.update({(r['condition'], r['seed']): r['analysis'] for r in records})
+    
+    for cond, _, seed in jobs:
+        results[cond].append(done[(cond, seed)])
+    
+    for cond in conditions:
+        print(f"    {labels[cond]}: {len(results[cond])} runs done")
+    
+    timings = {'startup_seconds': STARTUP_SECONDS}
+    if backend == 'thrml':
+        from thrml_sampling import TIMINGS, COMPILATION_CACHE_DIR
+        
+        # first_sample_seconds stays None if everything came from the caches
+        timings.update(TIMINGS)
+        first = timings['first_sample_seconds']
+        print(f"\nStartup: {STARTUP_SECONDS:.2f}s imports + {TIMINGS['import_seconds']:.2f}s JAX/THRML; "
+              f"first sample after {'n/a' if first is None else f'{first:.2f}s'} "
+              f"(compilation cache: {COMPILATION_CACHE_DIR or 'off'})")
+    else:
+        print(f"\nStartup: {STARTUP_SECONDS:.2f}s imports (NumPy backend, nothing to compile)")
     
     return {
         'results': results,
         'critical_beta': critical_beta,
+        'steps_per_sample': steps_per_sample,
+        'timings': timings,
         'config': config,
         'hubs': hubs,
-        'edges': edges
+        'edges': edges,
+        'experiment_id': experiment_id
     }
 
 
 def print_results(data):
     """Print comprehensive results."""
+    from scipy import stats
+    
     results = data['results']
     config = data['config']
     
@@ -565,6 +1073,22 @@ def print_results(data):
               f"{np.mean(ent_changes) if ent_changes else np.nan:>15.4f} "
               f"{np.mean(effect_ents) if effect_ents else np.nan:>15.4f}")
     
+    # Sampling quality
+    print("\n### Sampling Quality ###\n")
+    min_ess = config.get('min_ess', 50)
+    print(f"{'Condition':<15} {'tau(mag)':>10} {'ESS(mag)':>10} {'tau(E)':>10} {'ESS(E)':>10} {'Under-sampled':>14}")
+    print("-" * 73)
+    for cond in ['none', 'positive', 'negative', 'mimic']:
+        label = {'none': 'Classical', 'positive': 'Q(+)',
+                 'negative': 'Q(-)', 'mimic': 'Mimic'}[cond]
+        rs = results[cond]
+        n_low = sum(r['ess_mag'] < min_ess for r in rs)
+        print(f"{label:<15} {np.mean([r['tau_mag'] for r in rs]):>10.1f} "
+              f"{np.mean([r['ess_mag'] for r in rs]):>10.0f} "
+              f"{np.mean([r.get('tau_energy', np.nan) for r in rs]):>10.1f} "
+              f"{np.mean([r.get('ess_energy', np.nan) for r in rs]):>10.0f} "
+              f"{n_low:>8d}/{len(rs):<5d}")
+    
     # Statistical tests
     print("\n### Statistical Tests ###\n")
     
@@ -653,24 +1177,45 @@ def print_results(data):
     }
 
 
-def save_results(data, verdict, output_dir="data/unified_test"):
-    """Save all results to files."""
+def save_results(data, verdict, output_dir="data/unified_test", store=None, config=None):
+    """
+    Save all results to files.
+    
+    With store (a result_store root), the per-run analyses are written as
+    one bulk 'runs' table chunk under data['experiment_id'], next to the
+    'samples' chunks of run_unified_test, with the verdict and critical beta
+    in its metadata. Without it, the summary is a timestamped CSV as before.
+    The verdict text file is written either way.
+    """
     os.makedirs(output_dir, exist_ok=True)
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     
-    # Save summary
-    import pandas as pd
-    
-    rows = []
-    for cond in ['none', 'positive', 'negative', 'mimic']:
-        for i, r in enumerate(data['results'][cond]):
-            row = {'condition': cond, 'run': i}
-            row.update(r)
-            rows.append(row)
+    conditions = ['none', 'positive', 'negative', 'mimic']
+    runs = [(cond, i, r) for cond in conditions for i, r in enumerate(data['results'][cond])]
     
-    df = pd.DataFrame(rows)
-    df.to_csv(f"{output_dir}/unified_test_{timestamp}.csv", index=False)
-    print(f"\nSaved: {output_dir}/unified_test_{timestamp}.csv")
+    if store:
+        from result_store import write_table
+        
+        # One float column per analysis key (None -> NaN), plus the run keys
+        columns = {
+            'condition': [cond for cond, _, _ in runs],
+            'run': np.array([i for _, i, _ in runs], dtype=np.int32),
+        }
+        for name in runs[0][2]:
+            columns[name] = np.array([np.nan if r[name] is None else r[name]
+                                      for _, _, r in runs], dtype=float)
+        write_table(store, data['experiment_id'], 'runs', columns,
+                    config_hash=config_hash(config) if config is not None else None,
+                    metadata={'critical_beta': data['critical_beta'],
+                              'steps_per_sample': data['steps_per_sample'],
+                              'verdict': {k: bool(v) for k, v in verdict.items()}})
+        print(f"\nSaved: {store} (experiment {data['experiment_id']}, {len(runs)} runs)")
+    else:
+        import pandas as pd
+        
+        rows = [{'condition': cond, 'run': i, **r} for cond, i, r in runs]
+        pd.DataFrame(rows).to_csv(f"{output_dir}/unified_test_{timestamp}.csv", index=False)
+        print(f"\nSaved: {output_dir}/unified_test_{timestamp}.csv")
     
     # Save verdict
     with open(f"{output_dir}/verdict_{timestamp}.txt", 'w') as f:
@@ -690,6 +1235,134 @@ def save_results(data, verdict, output_dir="data/unified_test"):
     return timestamp
 
 
+# =============================================================================
+# BACKEND BENCHMARK
+# =============================================================================
+
+def benchmark_backends(config=None, beta=0.5, n_epochs=5, n_warmup=50,
+                       backends=('thrml', 'numpy')):
+    """
+    Time the block Gibbs engines on identical work.
+    
+    Every (condition, run) chain of the config is sampled as one batch with
+    the same network, seeds (run_seed), epoch schedule and fixed warmup on
+    each backend. Each backend runs twice: the first call includes JIT
+    compilation (THRML), the second is the steady-state time.
+    
+    Returns dict backend -> {'first_call_seconds', 'seconds',
+    'chain_sweeps_per_second', 'mean_abs_mag', 'tau_mag'}.
+    """
+    if config is None:
+        config = CONFIG
+    
+    edges = create_network(config['n_nodes'], config['k'], config['p_rewire'],
+                           legacy=config.get('legacy_network', True))
+    hubs = identify_hubs(edges, config['n_nodes'], config['n_hubs'])
+    jobs = [(cond, run_seed(cond, run))
+            for cond in ['none', 'positive', 'negative', 'mimic'] for run in range(config['n_runs'])]
+    steps_per_sample = config['steps_per_sample'] if config['steps_per_sample'] != 'auto' else 2
+    n_sweeps = n_warmup + steps_per_sample * (
+        n_epochs * (config['coherent_samples'] + config['effect_samples']) - 1
+    )
+    
+    report = {}
+    for backend in backends:
+        if backend == 'thrml' and not THRML_AVAILABLE:
+            print("  thrml: not installed, skipped")
+            continue
+        
+        def run():
+            return run_epoch_batch_thrml(
+                config['n_nodes'], edges, hubs, beta,
+                n_epochs, config['coherent_samples'], config['effect_samples'],
+                config['quantum_bias'], [cond for cond, _ in jobs], [seed for _, seed in jobs],
+                n_warmup=n_warmup, steps_per_sample=steps_per_sample,
+                capture_states=False, backend=backend
+            )
+        
+        start = time.perf_counter()
+        run()
+        first = time.perf_counter() - start
+        start = time.perf_counter()
+        results = run()
+        elapsed = time.perf_counter() - start
+        
+        mags = np.array([r['magnetizations'] for r in results])
+        report[backend] = {
+            'first_call_seconds': first,
+            'seconds': elapsed,
+            'chain_sweeps_per_second': len(jobs) * n_sweeps / elapsed,
+            'mean_abs_mag': float(np.mean(np.abs(mags))),
+            'tau_mag': integrated_autocorr_time(mags),
+        }
+    
+    print(f"\n{len(jobs)} chains x {n_sweeps} sweeps, N={config['n_nodes']}, beta={beta}")
+    print(f"{'Backend':<8} {'First call':>11} {'Steady':>9} {'Chain-sweeps/s':>15} {'<|m|>':>7} {'tau(mag)':>9}")
+    for backend, r in report.items():
+        print(f"{backend:<8} {r['first_call_seconds']:>10.2f}s {r['seconds']:>8.2f}s "
+              f"{r['chain_sweeps_per_second']:>15.0f} {r['mean_abs_mag']:>7.3f} {r['tau_mag']:>9.1f}")
+    return report
+
+
+def validate_samplers(config=None, n_nodes=16, beta=0.5, n_chains=8, n_samples=1000,
+                      n_warmup=200, engines=(('gibbs', 'thrml'), ('gibbs', 'numpy'),
+                                             ('swendsen_wang', 'numpy'), ('wolff', 'numpy'))):
+    """
+    Check the batched samplers against exact enumeration (exact_ising).
+    
+    A reduced network of n_nodes (config's k / p_rewire, n_hubs scaled to
+    10%) is sampled through the same batch path as the experiment, with a
+    constant hub field of 0, +quantum_bias and -quantum_bias, and the
+    magnetization, |m|, m^2, energy and hub magnetization are compared with
+    the exact expectations (exact_ising.validate_sampler_series).
+    
+    engines: (sampler, backend) pairs; THRML engines are skipped when it is
+    not installed.
+    
+    Returns dict (sampler, backend) -> condition -> validation result.
+    """
+    from exact_ising import exact_ising, validate_sampler_series
+    
+    if config is None:
+        config = CONFIG
+    
+    edges = create_network(n_nodes, config['k'], config['p_rewire'])
+    hubs = identify_hubs(edges, n_nodes, max(1, n_nodes // 10))
+    conditions = {'none': 0.0, 'positive': config['quantum_bias'],
+                  'negative': -config['quantum_bias']}
+    exact = {}
+    for cond, strength in conditions.items():
+        biases = np.zeros(n_nodes)
+        biases[hubs] = strength
+        exact[cond] = (biases, exact_ising(n_nodes, edges, beta, biases, hubs=hubs))
+    
+    report = {}
+    for sampler, backend in engines:
+        if sampler not in CLUSTER_METHODS and backend == 'thrml' and not THRML_AVAILABLE:
+            print(f"  {sampler} ({backend}): not installed, skipped")
+            continue
+        report[(sampler, backend)] = {}
+        for cond, (biases, ex) in exact.items():
+            observed, _ = _observe_batch(
+                n_nodes, edges, hubs, beta, [n_samples],
+                np.broadcast_to(biases, (n_chains, 1, n_nodes)).astype(np.float32),
+                seeds=[run_seed(cond, run) for run in range(n_chains)],
+                n_warmup=n_warmup, steps_per_sample=2, graph=None, capture_states=False,
+                sampler=sampler, max_warmup=1000, rhat_threshold=1.1, backend=backend
+            )
+            series = {k: np.asarray(observed[k])
+                      for k in ('magnetization', 'hub_magnetization', 'energy')}
+            report[(sampler, backend)][cond] = validate_sampler_series(ex, series)
+    
+    print(f"\nExact check, N={n_nodes}, beta={beta}, {n_chains} chains x {n_samples} samples")
+    print(f"{'Engine':<22} " + " ".join(f"{c + ' max|z|':>16}" for c in conditions))
+    for (sampler, backend), checks in report.items():
+        cells = " ".join(f"{checks[c]['max_abs_z']:>12.2f} {'ok' if checks[c]['passed'] else 'FAIL':>3}"
+                         for c in conditions)
+        print(f"{sampler + ' (' + backend + ')':<22} {cells}")
+    return report
+
+
 # =============================================================================
 # MAIN
 # =============================================================================
@@ -700,18 +1373,26 @@ if __name__ == "__main__":
     print("True Gibbs Sampling + Epoch-Based Dynamics + Real Data Calibration")
     print("="*70 + "\n")
     
-    if not THRML_AVAILABLE:
-        print("ERROR: THRML library required.")
-        print("Install with: pip install thrml jax jaxlib")
-        exit(1)
-    
-    # Run the test
-    data = run_unified_test()
+    # SIM_BACKEND=thrml/numpy overrides CONFIG['backend'] ('auto' falls
+    # back to the NumPy engine when THRML is not installed)
+    backend = resolve_backend(os.environ.get("SIM_BACKEND", CONFIG['backend']))
+    if backend == 'numpy':
+        print("Using the NumPy block Gibbs backend (numpy_gibbs)\n")
+    if backend == 'thrml':
+        # Persist compiled samplers across runs (see thrml_sampling)
+        from thrml_sampling import enable_compilation_cache
+        enable_compilation_cache()
+    
+    # Run the test (SIM_NODES=10000 etc. selects the large-network mode)
+    n_nodes = int(os.environ.get("SIM_NODES", CONFIG['n_nodes']))
+    config = large_network_config(n_nodes) if n_nodes > CONFIG['n_nodes'] else CONFIG
+    config = {**config, 'backend': backend}
+    data = run_unified_test(config)
     
     if data is not None:
         # Print and save results
         verdict = print_results(data)
-        timestamp = save_results(data, verdict)
+        timestamp = save_results(data, verdict, store=config.get('results_store'), config=config)
         
         print(f"\n[Complete] Results saved with timestamp: {timestamp}")
 
@@ -0,0 +1,99 @@
+"""
+Visualization Layers
+====================
+
+Shared rendering helpers for the brain cascade animations.
+
+edge_segments() turns a layout and an edge list into one (E, 2, dim)
+segment array. A single LineCollection (2D) or Line3DCollection (3D)
+built from it replaces one Line2D artist per edge. Setup then creates one
+artist instead of thousands, and each redraw is one collection draw.
+
+cache_static_layers() renders everything that does not change between
+frames once: figure and axes backgrounds, brain outline, edges and titles.
+It keeps the pixels as a single background artist, which is copied to the
+canvas without resampling, and hides the artists it replaces. Every frame
+the animation writers save then draws that image plus the node scatters
+and labels that actually change. This is the
+same background caching as blitting, but it also applies to
+Animation.save, which always redraws whole frames.
+
+Pure Matplotlib - no THRML required.
+"""
+
+import numpy as np
+from matplotlib.artist import Artist
+
+# =============================================================================
+# EDGES
+# =============================================================================
+
+def edge_segments(pos, edges):
+    """
+    Segment array for a LineCollection / Line3DCollection.
+
+    Parameters:
+    - pos: dict node -> coordinates (2D or 3D)
+    - edges: iterable of (u, v) node pairs, e.g. G.edges()
+
+    Returns (n_edges, 2, dim) float array of segment endpoints.
+    """
+    nodes = list(pos)
+    index = {n: i for i, n in enumerate(nodes)}
+    coords = np.array([pos[n] for n in nodes], dtype=float)
+    pairs = np.array([(index[u], index[v]) for u, v in edges], dtype=np.int64).reshape(-1, 2)
+    return coords[pairs]
+
+
+# =============================================================================
+# STATIC BACKGROUND CACHE
+# =============================================================================
+
+class CachedBackground(Artist):
+    """Pre-rendered RGBA frame, copied to the canvas unscaled on every draw."""
+
+    def __init__(self, rgba):
+        super().__init__()
+        self.rgba = rgba
+        self.set_zorder(-1)  # Before the axes, which draw the dynamic artists
+
+    def draw(self, renderer):
+        if not self.get_visible():
+            return
+        gc = renderer.new_gc()
+        renderer.draw_image(gc, 0, 0, self.rgba)
+        gc.restore()
+        self.stale = False
+
+
+def cache_static_layers(fig, dynamic, dpi):
+    """
+    Replace every static artist of fig by one pre-rendered background image.
+
+    Parameters:
+    - fig: 2D figure, fully set up for the first frame
+    - dynamic: artists that change per frame (scatters, texts); artists
+      added later (e.g. pulse rings) are drawn normally on top
+    - dpi: dpi the frames will be saved at (the cache is pixel-exact for
+      that dpi only)
+
+    Returns the CachedBackground artist.
+    """
+    dynamic = set(dynamic)
+    static = [a for ax in fig.axes for a in ax.get_children() if a not in dynamic]
+    static += [t for t in fig.texts if t not in dynamic]
+
+    # Render the static layers alone, at the frame resolution
+    visible = [(a, a.get_visible()) for a in dynamic]
+    for a in dynamic:
+        a.set_visible(False)
+    fig.set_dpi(dpi)
+    fig.canvas.draw()
+    # Canvas buffers are top row first, renderer images bottom row first
+    background = np.ascontiguousarray(np.asarray(fig.canvas.buffer_rgba())[::-1])
+    for a, was_visible in visible:
+        a.set_visible(was_visible)
+
+    for a in static:
+        a.set_visible(False)
+    return fig.add_artist(CachedBackground(background))